@@ -0,0 +1,140 @@
+"""
+Cachés de la aplicación
+
+Define la interfaz `CacheBackend` y una implementación en memoria con
+expiración (TTL) y desalojo LRU. Cada caché tiene un nombre; por defecto se
+crea en memoria (por proceso), pero se puede registrar otro backend con
+`set_cache()` (p. ej. uno compartido entre réplicas) sin tocar los servicios.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheBackend:
+    """Interfaz mínima que deben implementar los backends de caché"""
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Devuelve el valor o None si no existe o expiró"""
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class TTLCache(CacheBackend):
+    """
+    Caché en memoria thread-safe con TTL y desalojo LRU
+
+    Args:
+        max_entries: Máximo de claves; al superarlo se desaloja la menos usada
+        ttl: Segundos de vida por defecto de cada entrada
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# ============================================
+# REGISTRO DE CACHÉS
+# ============================================
+
+_caches: Dict[str, CacheBackend] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, max_entries: int = 256, ttl: float = 60.0) -> CacheBackend:
+    """
+    Devuelve la caché registrada con `name`
+
+    Si no se registró ningún backend, crea un TTLCache en memoria con los
+    parámetros indicados.
+    """
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = TTLCache(max_entries=max_entries, ttl=ttl)
+                _caches[name] = cache
+    return cache
+
+
+def set_cache(name: str, backend: CacheBackend) -> None:
+    """Registra un backend para la caché `name` (p. ej. uno compartido)"""
+    with _caches_lock:
+        _caches[name] = backend
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Métricas de todas las cachés registradas"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,290 @@
+"""
+Motor analítico columnar para reportes de cierre de mes
+
+`VentasColumnar` toma una foto de `registro_venta` unida a
+`autos_disponibles` y la guarda como arreglos NumPy, una columna por campo:
+las columnas de texto (provincia, distrito, vendedor, marca, modelo, tipo de
+compra) se codifican con diccionario como enteros pequeños. Las consultas de
+agrupación, suma y top-N se resuelven con operaciones vectorizadas
+(`np.bincount` sobre claves compuestas) sin iterar filas en Python.
+
+La foto se puede guardar en un archivo .npz y volver a cargar sin tocar la
+base de datos:
+
+    snapshot = VentasColumnar.desde_sqlite(conn)
+    snapshot.guardar("ventas.npz")
+    VentasColumnar.cargar("ventas.npz").top_n("provincia", "modelo", n=10, ultimos_dias=90)
+"""
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+CATEGORICAS = ("provincia", "distrito", "vendedor", "marca", "modelo", "tipo_compra")
+DERIVADAS = ("dia", "mes", "anio")
+
+_EPOCH = date(1970, 1, 1)
+
+# Por encima de este número de claves posibles se agrupa con np.unique en
+# lugar de un bincount denso
+_MAX_CLAVES_DENSAS = 10_000_000
+
+
+def _a_dias(valor: date) -> int:
+    return (valor - _EPOCH).days
+
+
+class VentasColumnar:
+    """Foto columnar de las ventas con columnas categóricas codificadas"""
+
+    def __init__(
+        self,
+        dia: np.ndarray,
+        monto_centimos: np.ndarray,
+        anio: np.ndarray,
+        codigos: Dict[str, np.ndarray],
+        diccionarios: Dict[str, List[str]]
+    ):
+        self.dia = dia                          # int32, días desde 1970-01-01
+        self.monto_centimos = monto_centimos    # int64
+        self.anio = anio                        # int16, año del modelo
+        self.diccionarios = diccionarios        # columna -> valores por código
+        # Códigos con el entero más pequeño que alcance (uint8 casi siempre)
+        self.codigos = {
+            nombre: valores.astype(np.min_scalar_type(max(len(diccionarios[nombre]) - 1, 0)), copy=False)
+            for nombre, valores in codigos.items()
+        }
+        self._derivadas: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.dia)
+
+    # ============================================
+    # CONSTRUCCIÓN Y PERSISTENCIA
+    # ============================================
+
+    @classmethod
+    def desde_sqlite(cls, conn: sqlite3.Connection, batch_size: int = 100_000) -> "VentasColumnar":
+        """Lee las ventas por lotes y las codifica columna por columna"""
+        cursor = conn.execute('''
+            SELECT
+                substr(rv.fecha_venta, 1, 10),
+                COALESCE(rv.monto_centimos, 0),
+                a.anio,
+                rv.sucursal_provincia,
+                rv.sucursal_distrito,
+                rv.nombre_vendedor,
+                a.marca,
+                a.marca || ' ' || a.modelo,
+                rv.tipo_compra
+            FROM registro_venta rv
+            JOIN autos_disponibles a ON a.id = rv.auto_id
+        ''')
+
+        tablas: Dict[str, Dict[str, int]] = {c: {} for c in CATEGORICAS}
+        dias, montos, anios = [], [], []
+        codigos: Dict[str, List[np.ndarray]] = {c: [] for c in CATEGORICAS}
+
+        while True:
+            filas = cursor.fetchmany(batch_size)
+            if not filas:
+                break
+            columnas = list(zip(*filas))
+            dias.append(np.array(columnas[0], dtype="datetime64[D]").astype(np.int32))
+            montos.append(np.array(columnas[1], dtype=np.int64))
+            anios.append(np.array(columnas[2], dtype=np.int16))
+            for nombre, valores in zip(CATEGORICAS, columnas[3:]):
+                tabla = tablas[nombre]
+                codigos[nombre].append(np.fromiter(
+                    (tabla.setdefault(v, len(tabla)) for v in valores),
+                    dtype=np.int32,
+                    count=len(valores)
+                ))
+
+        def unir(partes: List[np.ndarray], dtype) -> np.ndarray:
+            return np.concatenate(partes) if partes else np.empty(0, dtype=dtype)
+
+        return cls(
+            dia=unir(dias, np.int32),
+            monto_centimos=unir(montos, np.int64),
+            anio=unir(anios, np.int16),
+            codigos={c: unir(codigos[c], np.int32) for c in CATEGORICAS},
+            diccionarios={c: list(tablas[c]) for c in CATEGORICAS}
+        )
+
+    def guardar(self, path: str, comprimir: bool = False) -> None:
+        """Guarda la foto en un archivo .npz (`comprimir` ahorra espacio, pero es mucho más lento)"""
+        arrays = {"dia": self.dia, "monto_centimos": self.monto_centimos, "anio": self.anio}
+        for nombre in CATEGORICAS:
+            arrays[f"cod_{nombre}"] = self.codigos[nombre]
+            arrays[f"dic_{nombre}"] = np.array(self.diccionarios[nombre], dtype=str)
+        (np.savez_compressed if comprimir else np.savez)(path, **arrays)
+
+    @classmethod
+    def cargar(cls, path: str) -> "VentasColumnar":
+        with np.load(path) as data:
+            return cls(
+                dia=data["dia"],
+                monto_centimos=data["monto_centimos"],
+                anio=data["anio"],
+                codigos={c: data[f"cod_{c}"] for c in CATEGORICAS},
+                diccionarios={c: data[f"dic_{c}"].tolist() for c in CATEGORICAS}
+            )
+
+    # ============================================
+    # CONSULTAS
+    # ============================================
+
+    def mascara(
+        self,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        ultimos_dias: Optional[int] = None,
+        referencia: Optional[date] = None,
+        **igualdades: str
+    ) -> np.ndarray:
+        """
+        Filtro booleano por rango de fechas y por valores de columnas categóricas
+
+        `ultimos_dias` cuenta hacia atrás desde `referencia` (hoy en UTC, como
+        `fecha_venta`, por defecto).
+        Ejemplo: snapshot.mascara(ultimos_dias=90, provincia="LIMA")
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if ultimos_dias is not None:
+            fin = referencia or datetime.utcnow().date()
+            desde = max(desde, fin - timedelta(days=ultimos_dias)) if desde else fin - timedelta(days=ultimos_dias)
+            hasta = min(hasta, fin) if hasta else fin
+        if desde is not None:
+            mask &= self.dia >= _a_dias(desde)
+        if hasta is not None:
+            mask &= self.dia <= _a_dias(hasta)
+        for columna, valor in igualdades.items():
+            if columna not in CATEGORICAS:
+                raise ValueError(f"Columna no válida: {columna}")
+            try:
+                codigo = self.diccionarios[columna].index(valor)
+            except ValueError:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.codigos[columna] == codigo
+        return mask
+
+    def _columna(self, nombre: str):
+        """Devuelve (códigos 0..n-1, etiquetas) de una columna agrupable"""
+        if nombre in CATEGORICAS:
+            return self.codigos[nombre], self.diccionarios[nombre]
+        if nombre not in self._derivadas:
+            self._derivadas[nombre] = self._derivar(nombre)
+        return self._derivadas[nombre]
+
+    def _derivar(self, nombre: str):
+        # Columnas calculadas (día, mes, año del modelo): se codifican una
+        # sola vez por foto como desplazamiento desde su valor mínimo
+        if nombre == "dia":
+            base = int(self.dia.min()) if len(self) else 0
+            dias = np.arange(base, int(self.dia.max()) + 1 if len(self) else base)
+            return self.dia - base, [str(np.datetime64(int(d), "D")) for d in dias]
+        if nombre == "mes":
+            meses = self.dia.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+            base = int(meses.min()) if len(self) else 0
+            rango = np.arange(base, int(meses.max()) + 1 if len(self) else base)
+            return meses - base, [str(np.datetime64(int(m), "M")) for m in rango]
+        if nombre == "anio":
+            base = int(self.anio.min()) if len(self) else 0
+            rango = range(base, int(self.anio.max()) + 1 if len(self) else base)
+            return self.anio.astype(np.int32) - base, [str(a) for a in rango]
+        raise ValueError(f"Columna no válida: {nombre}")
+
+    def agrupar(self, por: Sequence[str], mascara: Optional[np.ndarray] = None) -> List[Dict]:
+        """
+        Número de ventas y monto total por combinación de columnas
+
+        Returns:
+            Filas con las columnas de `por`, num_ventas y monto_centimos_total,
+            ordenadas por monto descendente
+        """
+        columnas = [self._columna(nombre) for nombre in por]
+        tamanios = [max(len(etiquetas), 1) for _, etiquetas in columnas]
+
+        clave = np.zeros(len(self), dtype=np.int64)
+        for (codigos, _), tamanio in zip(columnas, tamanios):
+            clave = clave * tamanio + codigos
+        montos = self.monto_centimos
+        if mascara is not None:
+            clave, montos = clave[mascara], montos[mascara]
+
+        total_claves = int(np.prod(tamanios, dtype=np.int64))
+        if total_claves <= _MAX_CLAVES_DENSAS:
+            conteos = np.bincount(clave, minlength=total_claves)
+            sumas = np.bincount(clave, weights=montos, minlength=total_claves)
+            claves = np.flatnonzero(conteos)
+            conteos, sumas = conteos[claves], sumas[claves]
+        else:
+            claves, inversa = np.unique(clave, return_inverse=True)
+            conteos = np.bincount(inversa)
+            sumas = np.bincount(inversa, weights=montos)
+
+        orden = np.argsort(-sumas, kind="stable")
+        filas = []
+        for k in orden:
+            fila = {}
+            resto = int(claves[k])
+            for nombre, (_, etiquetas), tamanio in reversed(list(zip(por, columnas, tamanios))):
+                resto, codigo = divmod(resto, tamanio)
+                fila[nombre] = etiquetas[codigo]
+            fila = {nombre: fila[nombre] for nombre in por}
+            fila["num_ventas"] = int(conteos[k])
+            fila["monto_centimos_total"] = int(round(sumas[k]))
+            filas.append(fila)
+        return filas
+
+    def top_n(
+        self,
+        grupo: str,
+        item: str,
+        n: int = 10,
+        metrica: str = "monto",
+        mascara: Optional[np.ndarray] = None,
+        **filtros
+    ) -> Dict[str, List[Dict]]:
+        """
+        Los `n` valores de `item` con más monto (o ventas) dentro de cada `grupo`
+
+        Ejemplo: top 10 modelos por provincia en los últimos 90 días:
+            snapshot.top_n("provincia", "modelo", n=10, ultimos_dias=90)
+
+        Los filtros extra se pasan a `mascara`.
+        """
+        if metrica not in ("monto", "ventas"):
+            raise ValueError("metrica debe ser 'monto' o 'ventas'")
+        if mascara is None:
+            mascara = self.mascara(**filtros)
+
+        cod_grupo, etiquetas_grupo = self._columna(grupo)
+        cod_item, etiquetas_item = self._columna(item)
+        num_grupos, num_items = max(len(etiquetas_grupo), 1), max(len(etiquetas_item), 1)
+
+        clave = (cod_grupo.astype(np.int64) * num_items + cod_item)[mascara]
+        conteos = np.bincount(clave, minlength=num_grupos * num_items).reshape(num_grupos, num_items)
+        sumas = np.bincount(
+            clave, weights=self.monto_centimos[mascara], minlength=num_grupos * num_items
+        ).reshape(num_grupos, num_items)
+
+        valores = sumas if metrica == "monto" else conteos
+        k = min(n, num_items)
+        # argpartition deja los k mayores de cada fila sin ordenar todo
+        candidatos = np.argpartition(-valores, k - 1, axis=1)[:, :k]
+
+        resultado: Dict[str, List[Dict]] = {}
+        for g in np.flatnonzero(conteos.sum(axis=1)):
+            fila_top = sorted(candidatos[g], key=lambda i: (-valores[g, i], i))
+            resultado[etiquetas_grupo[g]] = [
+                {
+                    item: etiquetas_item[i],
+                    "num_ventas": int(conteos[g, i]),
+                    "monto_centimos_total": int(round(sumas[g, i]))
+                }
+                for i in fila_top if conteos[g, i] > 0
+            ]
+        return resultado
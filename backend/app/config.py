@@ -18,9 +18,115 @@ class Settings(BaseSettings):
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000"
     
-    # Base de datos
+    # Base de datos: sqlite (archivo local, camino nativo) o postgres, mysql,
+    # azure y sqlalchemy (repositorio SQLAlchemy, ver app/repository.py).
+    # DATABASE_URL se usa con postgres/mysql/sqlalchemy; azure usa AZURE_SQL_*
+    DB_TYPE: str = "sqlite"
     DATABASE_URL: str = "sqlite:///./automotriz_jj.db"
     
+    # Migraciones de esquema al arrancar. En Kubernetes va en false: las
+    # aplica una vez por despliegue el Job de 08-job-migraciones.yaml y cada
+    # worker solo verifica la versión (una consulta)
+    DB_MIGRAR_AL_INICIAR: bool = True
+    
+    # Pool de conexiones (el de SQLite y el del repositorio SQLAlchemy).
+    # El reciclado solo aplica al repositorio: los servidores remotos cierran
+    # conexiones inactivas, un archivo SQLite local no
+    DB_POOL_SIZE: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_HEALTH_CHECK_INTERVAL: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+
+    # Réplicas de lectura separadas por comas (vacío = todo va al primario):
+    # rutas de archivo con DB_TYPE=sqlite, URLs de SQLAlchemy con el repositorio
+    DB_READ_REPLICAS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL: float = 1.0
+    # Solo SQLite: copia el primario a las réplicas locales en cada
+    # verificación (False = la replicación la hace una herramienta externa)
+    SQLITE_REPLICA_SYNC: bool = False
+
+    # Hilos dedicados a consultas de BD (0 = mismo tamaño que el pool)
+    DB_EXECUTOR_WORKERS: int = 0
+    
+    # SQLite (WAL y PRAGMAs aplicados una vez por conexión)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 20000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Escritor único de SQLite (group commit)
+    DB_WRITER_BATCH_SIZE: int = 64
+    DB_WRITER_QUEUE_SIZE: int = 1000
+    
+    # Caché del catálogo de autos
+    CATALOG_CACHE_TTL_SECONDS: float = 60.0
+    CATALOG_CACHE_MAX_ENTRIES: int = 256
+    # Cache-Control max-age de GET /venta/autos en el navegador (luego
+    # revalida con If-None-Match y recibe 304 si el catálogo no cambió)
+    CATALOG_HTTP_MAX_AGE_SECONDS: int = 15
+    
+    # Caché de perfiles de vendedor
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Caché de JWT verificados (0 = desactivada) y copia local de los revocados
+    # (la lista completa está en la tabla tokens_revocados)
+    TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_REVOCATION_MAX_ENTRIES: int = 100000
+    
+    # Límite de intentos de /auth/login (token bucket): ráfaga máxima y
+    # recarga por minuto, por IP de cliente y por usuario. Detrás de un
+    # ingress, uvicorn --proxy-headers pone la IP real en el request
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_IP_BURST: int = 30
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: float = 30.0
+    LOGIN_RATE_LIMIT_USER_BURST: int = 5
+    LOGIN_RATE_LIMIT_USER_PER_MINUTE: float = 5.0
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Backend compartido entre réplicas (vacío = en memoria por proceso)
+    RATE_LIMIT_REDIS_URL: str = ""
+    
+    # Contraseñas: bcrypt en un pool de procesos fuera del event loop.
+    # PASSWORD_HASH_WORKERS = 0 usa un hilo del propio proceso. A lo sumo
+    # PASSWORD_HASH_MAX_CONCURRENT hashes corren a la vez (el resto espera
+    # hasta PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS y recibe 503) para dejar CPU
+    # a las ventas
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENT: int = 2
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    
+    # Idempotency-Key de POST /venta/registrar: cuánto se recuerda el
+    # venta_id de cada clave (tabla idempotencia) y máximo de claves
+    # completadas en la caché de cada proceso
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_MAX_KEYS: int = 50000
+    
+    # Backfill en línea de registro_venta.monto_centimos
+    MONTO_BACKFILL_CHUNK_SIZE: int = 1000
+    MONTO_BACKFILL_PAUSE_SECONDS: float = 0.05
+    
+    # Filas por consulta al exportar el historial de ventas en streaming
+    VENTAS_EXPORT_BATCH_SIZE: int = 500
+    
+    # Registro de ventas por lote: filas por request y por executemany
+    VENTAS_LOTE_MAX_FILAS: int = 5000
+    VENTAS_LOTE_CHUNK_SIZE: int = 500
+    
+    # Logging (cola acotada + hilo escritor)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_FILE: str = "aplicacion.log"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_ROTATION: str = "size"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_ROTATE_WHEN: str = "midnight"
+    LOG_BACKUP_COUNT: int = 5
+    LOG_HEALTH_SAMPLE_RATE: float = 0.01
+    
     # Usuarios por defecto
     DEFAULT_USERNAME: str = "admin"
     DEFAULT_PASSWORD: str = "admin123"
@@ -33,6 +139,11 @@ class Settings(BaseSettings):
     def cors_origins(self) -> List[str]:
         """Convierte string de origenes en lista"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
+    
+    @property
+    def read_replicas(self) -> List[str]:
+        """Convierte DB_READ_REPLICAS en lista, sin entradas vacías"""
+        return [replica.strip() for replica in self.DB_READ_REPLICAS.split(",") if replica.strip()]
 
 
 # Instancia global de configuración
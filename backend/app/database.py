@@ -1,22 +1,350 @@
+import os
 import sqlite3
 import logging
-import random
-from datetime import datetime, timedelta
+import threading
+import time
+from contextlib import nullcontext
+from functools import partial
+from typing import List, Optional, Tuple
+from app.config import settings
+from app.db_pool import ConnectionPool
+from app.db_writer import DatabaseWriter
+from app.migrations import Migracion, aplicar_migraciones, ensure_monto_centimos, version_esquema
+from app.replicas import PRIMARIO, Replica, RouterReplicas
+from app.rollups import init_rollups
+from app.search import init_search_index
+from app.seed import generar_datos
 
 logger = logging.getLogger(__name__)
 
 DATABASE_PATH = "automotriz_jj.db"
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
+_pool = None
+_writer = None
+_repositorio = None
+_router = None
+_pool_lock = threading.Lock()
+
+
+def get_db_connection(path: Optional[str] = None):
+    # check_same_thread=False: las conexiones del pool cambian de hilo entre checkouts
+    conn = sqlite3.connect(
+        path or DATABASE_PATH,
+        timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False
+    )
     conn.row_factory = sqlite3.Row
     # IMPORTANTE: Habilitar foreign keys en SQLite
     conn.execute("PRAGMA foreign_keys = ON")
+    apply_sqlite_pragmas(conn)
+    return conn
+
+
+def apply_sqlite_pragmas(conn):
+    """
+    Aplica los PRAGMAs de rendimiento a una conexión SQLite
+
+    - journal_mode=WAL: los lectores no se bloquean mientras hay una escritura
+    - synchronous=NORMAL: fsync solo en checkpoints (seguro con WAL)
+    - cache_size/mmap_size: páginas en memoria y lectura mapeada por conexión
+    - busy_timeout: espera al lock de escritura en vez de fallar con
+      "database is locked" (p. ej. entre los workers de uvicorn)
+    """
+    conn.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+
+
+def get_azure_connection_string() -> str:
+    """
+    Construye el connection string ODBC de Azure SQL desde variables de entorno
+
+    Lo usa el engine del repositorio (DB_TYPE=azure, `mssql+pyodbc`): Azure
+    SQL pasa por el pool de SQLAlchemy, no por `ConnectionPool`.
+    """
+    server = os.getenv('AZURE_SQL_SERVER')
+    database = os.getenv('AZURE_SQL_DATABASE')
+    username = os.getenv('AZURE_SQL_USERNAME')
+    password = os.getenv('AZURE_SQL_PASSWORD')
+    driver = os.getenv('AZURE_SQL_DRIVER', '{ODBC Driver 18 for SQL Server}')
+
+    return (
+        f'DRIVER={driver};'
+        f'SERVER={server};'
+        f'DATABASE={database};'
+        f'UID={username};'
+        f'PWD={password};'
+        f'Encrypt=yes;'
+        f'TrustServerCertificate=no;'
+        f'Connection Timeout=30;'
+    )
+
+
+def create_pool(factory=get_db_connection, name: str = "sqlite") -> ConnectionPool:
+    """Crea un pool de conexiones con la configuración de la aplicación"""
+    return ConnectionPool(
+        factory,
+        max_size=settings.DB_POOL_SIZE,
+        timeout=settings.DB_POOL_TIMEOUT,
+        health_check_interval=settings.DB_POOL_HEALTH_CHECK_INTERVAL,
+        name=name
+    )
+
+
+def get_pool() -> ConnectionPool:
+    """Devuelve el pool global de conexiones, creándolo en el primer uso"""
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_pool()
+                logger.info(f"🔌 Pool de conexiones creado (máximo {settings.DB_POOL_SIZE} conexiones)")
+    return _pool
+
+
+def get_connection():
+    """
+    Context manager que presta una conexión del pool global
+
+    Uso:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+    """
+    return get_pool().connection()
+
+
+def close_pool():
+    """Cierra el pool global de conexiones"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_writer() -> DatabaseWriter:
+    """Devuelve el escritor único de SQLite, creándolo en el primer uso"""
+    global _writer
+
+    if _writer is None:
+        with _pool_lock:
+            if _writer is None:
+                _writer = DatabaseWriter(
+                    get_db_connection,
+                    batch_size=settings.DB_WRITER_BATCH_SIZE,
+                    max_queue=settings.DB_WRITER_QUEUE_SIZE
+                )
+    return _writer
+
+
+def close_writer():
+    """Confirma las escrituras pendientes y detiene el escritor"""
+    global _writer
+
+    with _pool_lock:
+        writer, _writer = _writer, None
+
+    if writer is not None:
+        writer.stop()
+
+
+def usa_repositorio() -> bool:
+    """
+    True si la base configurada no es el SQLite local
+
+    Con DB_TYPE=postgres, mysql, azure o sqlalchemy los servicios leen y
+    escriben a través del repositorio SQLAlchemy (app/repository.py).
+    """
+    return settings.DB_TYPE.lower() != "sqlite"
+
+
+def get_repositorio():
+    """Devuelve el repositorio SQLAlchemy, creando su engine en el primer uso"""
+    global _repositorio
+
+    if _repositorio is None:
+        with _pool_lock:
+            if _repositorio is None:
+                # SQLAlchemy solo se importa si se usa un backend distinto de SQLite
+                from app.repository import crear_repositorio
+
+                _repositorio = crear_repositorio()
+    return _repositorio
+
+
+def close_repositorio():
+    """Cierra las conexiones del engine del repositorio"""
+    global _repositorio
+
+    with _pool_lock:
+        repositorio, _repositorio = _repositorio, None
+
+    if repositorio is not None:
+        repositorio.close()
+
+
+# ============================================
+# RÉPLICAS DE LECTURA
+# ============================================
+
+def get_router() -> Optional[RouterReplicas]:
+    """Router de réplicas de lectura, o None si DB_READ_REPLICAS está vacío"""
+    global _router
+
+    if _router is None and settings.read_replicas:
+        with _pool_lock:
+            if _router is None:
+                _router = _crear_router()
+    return _router
+
+
+def _crear_router() -> RouterReplicas:
+    replicas = []
+    for numero, destino in enumerate(settings.read_replicas, start=1):
+        nombre = f"replica-{numero}"
+        if usa_repositorio():
+            from app.repository import crear_repositorio
+
+            repositorio = crear_repositorio(url=destino)
+            replicas.append(Replica(
+                nombre,
+                partial(nullcontext, repositorio),
+                repositorio.leer_latido,
+                cerrar=repositorio.close
+            ))
+        else:
+            pool = create_pool(partial(_conectar_replica, destino), name=nombre)
+            replicas.append(Replica(
+                nombre,
+                pool.connection,
+                partial(_leer_latido, pool),
+                sincronizar=partial(_sincronizar_replica, destino) if settings.SQLITE_REPLICA_SYNC else None,
+                cerrar=pool.close
+            ))
+
+    logger.info(
+        f"🔌 {len(replicas)} réplica(s) de lectura configuradas "
+        f"(lag máximo {settings.DB_REPLICA_MAX_LAG_SECONDS}s)"
+    )
+    return RouterReplicas(
+        replicas,
+        _latir_primario,
+        max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+        intervalo=settings.DB_REPLICA_CHECK_INTERVAL
+    )
+
+
+def _conectar_replica(path: str):
+    conn = get_db_connection(path)
+    # Una réplica nunca recibe escrituras de la aplicación
+    conn.execute("PRAGMA query_only = ON")
     return conn
 
-def init_database():
+
+def _leer_latido(pool: ConnectionPool) -> Optional[float]:
+    with pool.connection() as conn:
+        fila = conn.execute("SELECT ts FROM replica_heartbeat WHERE id = 1").fetchone()
+        return fila[0] if fila else None
+
+
+def _sincronizar_replica(path: str) -> None:
+    """Copia el primario SQLite a una réplica local con la API de backup"""
+    origen = get_db_connection()
+    destino = sqlite3.connect(path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    try:
+        origen.backup(destino)
+    finally:
+        destino.close()
+        origen.close()
+
+
+def _latir_primario() -> float:
+    if usa_repositorio():
+        return get_repositorio().latir()
+    return get_writer().execute(_latir)
+
+
+def _latir(conn) -> float:
+    """Operación de escritura: guarda la hora actual como latido del primario"""
+    ahora = time.time()
+    conn.execute('''
+        INSERT INTO replica_heartbeat (id, ts) VALUES (1, ?)
+        ON CONFLICT(id) DO UPDATE SET ts = excluded.ts
+    ''', (ahora,))
+    return ahora
+
+
+def leer(operacion, *args, claves=()):
+    """
+    Ejecuta una lectura en una réplica al día o, si no hay, en el primario
+
+    `operacion(destino, *args)` recibe una conexión SQLite del pool o el
+    repositorio, según DB_TYPE. `claves` son las escrituras propias que la
+    lectura tiene que ver (ver app/replicas.py). Si la réplica falla, la
+    lectura se repite en el primario.
+    """
+    router = get_router()
+    if router is not None:
+        replica = router.elegir(claves)
+        if replica is not None:
+            try:
+                with replica.abrir() as destino:
+                    resultado = operacion(destino, *args)
+            except Exception as e:
+                router.marcar_fallo(replica, e)
+            else:
+                router.contar_lectura(replica.nombre)
+                return resultado
+        router.contar_lectura(PRIMARIO)
+
+    primario = nullcontext(get_repositorio()) if usa_repositorio() else get_connection()
+    with primario as destino:
+        return operacion(destino, *args)
+
+
+def anotar_escritura(*claves) -> None:
+    """Marca `claves` como recién escritas: sus lecturas no irán a una réplica atrasada"""
+    router = get_router()
+    if router is not None:
+        router.anotar_escritura(*claves)
+
+
+def iniciar_replicas() -> None:
+    """Mide el lag de las réplicas y arranca su monitor (si hay réplicas)"""
+    router = get_router()
+    if router is not None:
+        router.iniciar()
+
+
+def close_replicas():
+    """Detiene el monitor y cierra las conexiones de las réplicas"""
+    global _router
+
+    with _pool_lock:
+        router, _router = _router, None
+
+    if router is not None:
+        router.close()
+
+
+def db_stats() -> dict:
+    """Métricas del pool, el escritor y las réplicas (sin crearlos si aún no existen)"""
+    pool, writer, repositorio, router = _pool, _writer, _repositorio, _router
+    return {
+        "pool": pool.stats() if pool is not None else None,
+        "writer": writer.stats() if writer is not None else None,
+        "repositorio": repositorio.stats() if repositorio is not None else None,
+        "replicas": router.stats() if router is not None else None,
+    }
+
+
+def _crear_tablas(conn):
     """
-    Inicializa la base de datos y crea las tablas con sus relaciones
+    Crea las tablas con sus relaciones e índices (migración 1)
     ESTRUCTURA DE RELACIONES:
     ========================
     vendedores (Tabla Principal)
@@ -32,150 +360,257 @@ def init_database():
     ├── vendedor_id (FOREIGN KEY → vendedores.id)
     └── auto_id (FOREIGN KEY → autos_disponibles.id)
     """
-    conn = get_db_connection()
     cursor = conn.cursor()
+    logger.info("📊 Creando estructura de base de datos...")
     
-    try:
-        logger.info("📊 Creando estructura de base de datos...")
-        
-        # ============================================
-        # TABLA 1: vendedores (Tabla Principal)
-        # ============================================
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS vendedores (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                email TEXT,
-                role TEXT DEFAULT 'vendedor',
-                codigo_vendedor TEXT UNIQUE NOT NULL,
-                sucursal_provincia TEXT NOT NULL,
-                sucursal_distrito TEXT NOT NULL,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                
-                -- Constraints adicionales
-                CONSTRAINT chk_username_length CHECK(length(username) >= 3),
-                CONSTRAINT chk_codigo_vendedor_format CHECK(codigo_vendedor LIKE 'VEN%')
-            )
-        ''')
-        
-        # Índices para vendedores
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_username ON vendedores(username)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_codigo ON vendedores(codigo_vendedor)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_provincia ON vendedores(sucursal_provincia)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_distrito ON vendedores(sucursal_distrito)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_active ON vendedores(is_active)')
-        
-        logger.info("✅ Tabla 'vendedores' creada con PRIMARY KEY: id")
-        
-        # ============================================
-        # TABLA 2: autos_disponibles (Tabla Principal)
-        # ============================================
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS autos_disponibles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                marca TEXT NOT NULL,
-                modelo TEXT NOT NULL,
-                anio INTEGER NOT NULL,
-                precio_referencial REAL,
-                stock INTEGER DEFAULT 25,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                
-                -- Constraints adicionales
-                CONSTRAINT chk_anio_valido CHECK(anio >= 2020 AND anio <= 2030),
-                CONSTRAINT chk_precio_positivo CHECK(precio_referencial > 0),
-                CONSTRAINT chk_stock_positivo CHECK(stock >= 0),
-                CONSTRAINT uq_auto UNIQUE(marca, modelo, anio)
-            )
-        ''')
-        
-        # Índices para autos_disponibles
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_marca ON autos_disponibles(marca)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_modelo ON autos_disponibles(modelo)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_anio ON autos_disponibles(anio)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_active ON autos_disponibles(is_active)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_marca_modelo ON autos_disponibles(marca, modelo)')
-        
-        logger.info("✅ Tabla 'autos_disponibles' creada con PRIMARY KEY: id")
-        
-        # ============================================
-        # TABLA 3: registro_venta (Tabla con Foreign Keys)
-        # ============================================
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS registro_venta (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fecha_venta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                
-                -- FOREIGN KEY 1: Relación con vendedores
-                vendedor_id INTEGER NOT NULL,
-                
-                -- FOREIGN KEY 2: Relación con autos_disponibles
-                auto_id INTEGER NOT NULL,
-                
-                tipo_compra TEXT NOT NULL CHECK(tipo_compra IN ('Cash', 'Crédito')),
-                monto_fisco TEXT NOT NULL,
-                nombre_comprador TEXT NOT NULL,
-                dni_comprador TEXT NOT NULL,
-                contacto_comprador TEXT NOT NULL,
-                sucursal_provincia TEXT NOT NULL,
-                sucursal_distrito TEXT NOT NULL,
-                nombre_vendedor TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                
-                -- Definición explícita de FOREIGN KEYS
-                CONSTRAINT fk_venta_vendedor 
-                    FOREIGN KEY (vendedor_id) 
-                    REFERENCES vendedores(id) 
-                    ON DELETE CASCADE 
-                    ON UPDATE CASCADE,
-                    
-                CONSTRAINT fk_venta_auto 
-                    FOREIGN KEY (auto_id) 
-                    REFERENCES autos_disponibles(id) 
-                    ON DELETE CASCADE 
-                    ON UPDATE CASCADE,
+    # ============================================
+    # TABLA 1: vendedores (Tabla Principal)
+    # ============================================
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vendedores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            full_name TEXT NOT NULL,
+            email TEXT,
+            role TEXT DEFAULT 'vendedor',
+            codigo_vendedor TEXT UNIQUE NOT NULL,
+            sucursal_provincia TEXT NOT NULL,
+            sucursal_distrito TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            
+            -- Constraints adicionales
+            CONSTRAINT chk_username_length CHECK(length(username) >= 3),
+            CONSTRAINT chk_codigo_vendedor_format CHECK(codigo_vendedor LIKE 'VEN%')
+        )
+    ''')
+    
+    # Índices para vendedores
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_username ON vendedores(username)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_codigo ON vendedores(codigo_vendedor)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_provincia ON vendedores(sucursal_provincia)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_distrito ON vendedores(sucursal_distrito)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendedores_active ON vendedores(is_active)')
+    
+    logger.info("✅ Tabla 'vendedores' creada con PRIMARY KEY: id")
+    
+    # ============================================
+    # TABLA 2: autos_disponibles (Tabla Principal)
+    # ============================================
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS autos_disponibles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            marca TEXT NOT NULL,
+            modelo TEXT NOT NULL,
+            anio INTEGER NOT NULL,
+            precio_referencial REAL,
+            stock INTEGER DEFAULT 25,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            
+            -- Constraints adicionales
+            CONSTRAINT chk_anio_valido CHECK(anio >= 2020 AND anio <= 2030),
+            CONSTRAINT chk_precio_positivo CHECK(precio_referencial > 0),
+            CONSTRAINT chk_stock_positivo CHECK(stock >= 0),
+            CONSTRAINT uq_auto UNIQUE(marca, modelo, anio)
+        )
+    ''')
+    
+    # Índices para autos_disponibles
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_marca ON autos_disponibles(marca)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_modelo ON autos_disponibles(modelo)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_anio ON autos_disponibles(anio)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_active ON autos_disponibles(is_active)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_autos_marca_modelo ON autos_disponibles(marca, modelo)')
+    
+    logger.info("✅ Tabla 'autos_disponibles' creada con PRIMARY KEY: id")
+    
+    # ============================================
+    # TABLA 3: registro_venta (Tabla con Foreign Keys)
+    # ============================================
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS registro_venta (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_venta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            
+            -- FOREIGN KEY 1: Relación con vendedores
+            vendedor_id INTEGER NOT NULL,
+            
+            -- FOREIGN KEY 2: Relación con autos_disponibles
+            auto_id INTEGER NOT NULL,
+            
+            tipo_compra TEXT NOT NULL CHECK(tipo_compra IN ('Cash', 'Crédito')),
+            monto_fisco TEXT NOT NULL,
+            monto_centimos INTEGER,
+            nombre_comprador TEXT NOT NULL,
+            dni_comprador TEXT NOT NULL,
+            contacto_comprador TEXT NOT NULL,
+            sucursal_provincia TEXT NOT NULL,
+            sucursal_distrito TEXT NOT NULL,
+            nombre_vendedor TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            
+            -- Definición explícita de FOREIGN KEYS
+            CONSTRAINT fk_venta_vendedor 
+                FOREIGN KEY (vendedor_id) 
+                REFERENCES vendedores(id) 
+                ON DELETE CASCADE 
+                ON UPDATE CASCADE,
                 
-                -- Constraints adicionales
-                CONSTRAINT chk_dni_length CHECK(length(dni_comprador) = 8),
-                CONSTRAINT chk_monto_not_empty CHECK(length(monto_fisco) > 0)
-            )
-        ''')
-        
-        # Índices para registro_venta
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_fecha ON registro_venta(fecha_venta)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_vendedor ON registro_venta(vendedor_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_auto ON registro_venta(auto_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_tipo_compra ON registro_venta(tipo_compra)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_dni ON registro_venta(dni_comprador)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_provincia ON registro_venta(sucursal_provincia)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_distrito ON registro_venta(sucursal_distrito)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_fecha_vendedor ON registro_venta(fecha_venta, vendedor_id)')
+            CONSTRAINT fk_venta_auto 
+                FOREIGN KEY (auto_id) 
+                REFERENCES autos_disponibles(id) 
+                ON DELETE CASCADE 
+                ON UPDATE CASCADE,
+            
+            -- Constraints adicionales
+            CONSTRAINT chk_dni_length CHECK(length(dni_comprador) = 8),
+            CONSTRAINT chk_monto_not_empty CHECK(length(monto_fisco) > 0),
+            CONSTRAINT chk_monto_centimos_positivo CHECK(monto_centimos IS NULL OR monto_centimos > 0)
+        )
+    ''')
+    
+    # Índices para registro_venta
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_fecha ON registro_venta(fecha_venta)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_vendedor ON registro_venta(vendedor_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_auto ON registro_venta(auto_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_tipo_compra ON registro_venta(tipo_compra)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_dni ON registro_venta(dni_comprador)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_provincia ON registro_venta(sucursal_provincia)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_distrito ON registro_venta(sucursal_distrito)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_fecha_vendedor ON registro_venta(fecha_venta, vendedor_id)')
+    # Paginación por keyset del historial (por vendedor y por sucursal)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_vendedor_fecha_id ON registro_venta(vendedor_id, fecha_venta, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_venta_sucursal_fecha_id ON registro_venta(sucursal_provincia, sucursal_distrito, fecha_venta, id)')
+    
+    logger.info("✅ Tabla 'registro_venta' creada con FOREIGN KEYS:")
+    logger.info("   - FK: vendedor_id → vendedores(id)")
+    logger.info("   - FK: auto_id → autos_disponibles(id)")
+
+
+def _crear_replica_heartbeat(conn):
+    """Latido del primario para medir el lag de las réplicas de lectura"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS replica_heartbeat (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            ts REAL NOT NULL
+        )
+    ''')
+
+
+def _crear_idempotencia(conn):
+    """
+    Idempotency-Key de POST /venta/registrar (ver app/idempotency.py)
+
+    Cada fila se inserta en la misma transacción que su venta; `expira` es
+    un timestamp Unix y su índice permite borrar las vencidas por tramos.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS idempotencia (
+            clave TEXT PRIMARY KEY,
+            huella TEXT NOT NULL,
+            venta_id INTEGER NOT NULL,
+            expira REAL NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_idempotencia_expira ON idempotencia(expira)')
+
+
+def _crear_tokens_revocados(conn):
+    """
+    Tokens revocados por /auth/logout (ver app/utils/security.py)
+
+    La comparten todos los workers y pods; `expira` es el `exp` del token y
+    su índice permite borrar las filas vencidas por tramos.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tokens_revocados (
+            jti TEXT PRIMARY KEY,
+            expira REAL NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tokens_revocados_expira ON tokens_revocados(expira)')
+
+
+# Pasos del esquema SQLite, en orden. Cada uno es idempotente (IF NOT EXISTS,
+# columnas verificadas antes del ALTER): una base anterior al versionado
+# (versión 0) los recorre todos y queda registrada sin cambiar sus datos.
+MIGRACIONES = [
+    Migracion(1, "Tablas vendedores, autos_disponibles y registro_venta con sus índices", _crear_tablas),
+    Migracion(2, "Columna registro_venta.monto_centimos", ensure_monto_centimos),
+    Migracion(3, "Agregados diarios ventas_diarias", init_rollups),
+    Migracion(4, "Índice de búsqueda autos_fts", init_search_index),
+    Migracion(5, "Latido de réplicas replica_heartbeat", _crear_replica_heartbeat),
+    Migracion(6, "Claves de idempotencia de ventas", _crear_idempotencia),
+    Migracion(7, "Tokens revocados por logout", _crear_tokens_revocados),
+]
+ESQUEMA_VERSION = MIGRACIONES[-1].version
+
+
+def init_database() -> List[int]:
+    """
+    Aplica las migraciones de esquema pendientes
+
+    Con un backend distinto de SQLite el mismo esquema lo crea el
+    repositorio SQLAlchemy con el DDL de su dialecto.
+
+    Returns:
+        List[int]: versiones aplicadas (vacía si el esquema ya estaba al día)
+    """
+    if usa_repositorio():
+        return get_repositorio().migrar()
+    
+    conn = get_db_connection()
+    
+    try:
+        aplicadas = aplicar_migraciones(conn, MIGRACIONES)
+        if not aplicadas:
+            logger.info(f"✅ Esquema al día (versión {ESQUEMA_VERSION})")
+            return aplicadas
         
-        logger.info("✅ Tabla 'registro_venta' creada con FOREIGN KEYS:")
-        logger.info("   - FK: vendedor_id → vendedores(id)")
-        logger.info("   - FK: auto_id → autos_disponibles(id)")
-        conn.commit()
         logger.info("✅ Base de datos inicializada correctamente con todas las relaciones")
         
         # Verificar integridad de foreign keys
-        cursor.execute("PRAGMA foreign_key_check")
-        fk_errors = cursor.fetchall()
+        fk_errors = conn.execute("PRAGMA foreign_key_check").fetchall()
         if fk_errors:
             logger.error(f"❌ Errores de integridad referencial: {fk_errors}")
         else:
             logger.info("✅ Integridad referencial verificada correctamente")
+        return aplicadas
         
     except Exception as e:
         logger.error(f"❌ Error al inicializar la base de datos: {e}")
-        conn.rollback()
         raise
     finally:
         conn.close()
 
-def seed_initial_data():
+
+def estado_esquema() -> Tuple[int, int]:
+    """
+    Versión del esquema en la base y la que espera este código
+
+    Una sola consulta: es lo único que el arranque necesita cuando la base
+    ya está migrada.
+    """
+    if usa_repositorio():
+        from app.repository import ESQUEMA_VERSION as esperada
+        return get_repositorio().version_esquema(), esperada
+    
+    with get_connection() as conn:
+        return version_esquema(conn), ESQUEMA_VERSION
+
+
+def seed_initial_data(**escala):
+    """
+    Inserta los datos de demostración si la base está vacía
+
+    Los argumentos opcionales se pasan a `app.seed.generar_datos` para cargar
+    una escala distinta (vendedores, modelos, años, ventas, seed, ...).
+    """
+    if usa_repositorio():
+        return get_repositorio().sembrar(**escala)
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -184,154 +619,16 @@ def seed_initial_data():
         cursor.execute("SELECT COUNT(*) FROM vendedores")
         if cursor.fetchone()[0] > 0:
             logger.info("Los datos iniciales ya existen, omitiendo seed...")
-            return
-        
-        import hashlib
+            return None
         
         logger.info("📝 Insertando datos iniciales...")
-        
-        # PASO 1: Insertar VENDEDORES (Tabla padre) #
-        vendedores = [
-            ('cmendoza', 'carlos2020', 'Carlos Mendoza', 'cmendoza@automotrizjj.com', 'vendedor', 'VEN001', 'LIMA', 'Miraflores'),
-            ('svargas', 'sofia2020', 'Sofía Vargas', 'svargas@automotrizjj.com', 'vendedor', 'VEN002', 'LIMA', 'Miraflores'),
-            ('mrojas', 'miguel2020', 'Miguel Rojas', 'mrojas@automotrizjj.com', 'vendedor', 'VEN003', 'LIMA', 'San Isidro'),
-            ('ldiaz', 'laura2020', 'Laura Díaz', 'ldiaz@automotrizjj.com', 'vendedor', 'VEN004', 'LIMA', 'San Isidro'),
-            ('dcruz', 'diego2020', 'Diego Cruz', 'dcruz@automotrizjj.com', 'vendedor', 'VEN005', 'LIMA', 'Surco'),
-            ('alopez', 'andrea2020', 'Andrea López', 'alopez@automotrizjj.com', 'vendedor', 'VEN006', 'LIMA', 'Surco'),
-            ('rsilva', 'roberto2020', 'Roberto Silva', 'rsilva@automotrizjj.com', 'vendedor', 'VEN007', 'LIMA', 'La Molina'),
-            ('ptorres', 'patricia2020', 'Patricia Torres', 'ptorres@automotrizjj.com', 'vendedor', 'VEN008', 'LIMA', 'La Molina'),
-            ('fcampos', 'fernando2020', 'Fernando Campos', 'fcampos@automotrizjj.com', 'vendedor', 'VEN009', 'PIURA', 'Piura Centro'),
-            ('vmorales', 'valentina2020', 'Valentina Morales', 'vmorales@automotrizjj.com', 'vendedor', 'VEN010', 'PIURA', 'Piura Centro'),
-            ('mquispe', 'marco2020', 'Marco Quispe', 'mquispe@automotrizjj.com', 'vendedor', 'VEN011', 'AYACUCHO', 'Ayacucho Centro'),
-            ('chuaman', 'carmen2020', 'Carmen Huamán', 'chuaman@automotrizjj.com', 'vendedor', 'VEN012', 'AYACUCHO', 'Ayacucho Centro'),
-        ]
-        
-        for username, password, full_name, email, role, codigo, provincia, distrito in vendedores:
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            cursor.execute('''
-                INSERT INTO vendedores (username, password_hash, full_name, email, role, codigo_vendedor, sucursal_provincia, sucursal_distrito)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (username, password_hash, full_name, email, role, codigo, provincia, distrito))
-        
-        logger.info(f"✅ Insertados {len(vendedores)} vendedores")
-        
-        # PASO 2: Insertar AUTOS (Tabla padre) #
-        autos_base = [
-            ('Toyota', 'Corolla', 85000.00),
-            ('Toyota', 'Yaris', 65000.00),
-            ('Toyota', 'RAV4', 125000.00),
-            ('Honda', 'Civic', 90000.00),
-            ('Honda', 'CR-V', 130000.00),
-            ('Honda', 'Accord', 110000.00),
-            ('Nissan', 'Sentra', 75000.00),
-            ('Nissan', 'Kicks', 80000.00),
-            ('Nissan', 'X-Trail', 120000.00),
-            ('Hyundai', 'Elantra', 78000.00),
-            ('Hyundai', 'Tucson', 115000.00),
-            ('Hyundai', 'Accent', 62000.00),
-            ('Mazda', '3', 88000.00),
-            ('Mazda', 'CX-5', 128000.00),
-            ('Mazda', '2', 68000.00),
-            ('Kia', 'Forte', 76000.00),
-            ('Kia', 'Sportage', 122000.00),
-            ('Kia', 'Rio', 64000.00),
-            ('Chevrolet', 'Cruze', 82000.00),
-            ('Chevrolet', 'Tracker', 95000.00),
-            ('Ford', 'Focus', 79000.00),
-            ('Ford', 'Escape', 118000.00),
-            ('BMW', 'Serie 3', 180000.00),
-            ('BMW', 'X3', 220000.00)
-        ]
-        
-        # Autos 2024
-        for marca, modelo, precio in autos_base:
-            cursor.execute('''
-                INSERT INTO autos_disponibles (marca, modelo, anio, precio_referencial, stock)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (marca, modelo, 2024, precio, 25))
-        # Autos 2025
-        for marca, modelo, precio_2024 in autos_base:
-            incremento = random.randrange(25000, 75001, 10)
-            precio_2025 = precio_2024 + incremento
-            cursor.execute('''
-                INSERT INTO autos_disponibles (marca, modelo, anio, precio_referencial, stock)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (marca, modelo, 2025, precio_2025, 25))
-        
-        logger.info(f"✅ Insertados {len(autos_base) * 2} autos (2024 y 2025)")
-        conn.commit()
-        
-        # PASO 3: Insertar VENTAS (Tabla con FK) #
-        cursor.execute('SELECT id FROM vendedores')
-        vendedor_ids = [row[0] for row in cursor.fetchall()]
-        
-        cursor.execute('SELECT id, marca, modelo, anio, precio_referencial FROM autos_disponibles')
-        autos = cursor.fetchall()
-        
-        tipos_compra = ['Cash', 'Crédito']
-        nombres = ['Juan Pérez', 'María García', 'Carlos López', 'Ana Martínez', 'Luis Rodríguez', 
-                   'Carmen Silva', 'José Torres', 'Elena Flores', 'Pedro Ramírez', 'Isabel Castro']
-        
-        ventas_por_auto = {}
-        for auto in autos:
-            auto_id = auto[0]
-            num_ventas = random.randint(5, 20)
-            ventas_por_auto[auto_id] = (num_ventas, auto)
-        
-        total_ventas = 0
-        fecha_inicio = datetime.now() - timedelta(days=180)
-        
-        for auto_id, (num_ventas, auto_info) in ventas_por_auto.items():
-            for _ in range(num_ventas):
-                if total_ventas >= 432:
-                    break
-                
-                vendedor_id = random.choice(vendedor_ids)
-                
-                cursor.execute('''
-                    SELECT full_name, sucursal_provincia, sucursal_distrito 
-                    FROM vendedores WHERE id = ?
-                ''', (vendedor_id,))
-                vendedor_data = cursor.fetchone()
-                
-                tipo_compra = random.choice(tipos_compra)
-                nombre_comprador = random.choice(nombres)
-                dni_comprador = str(random.randint(10000000, 99999999))
-                contacto_comprador = f"9{random.randint(10000000, 99999999)}"
-                
-                precio_base = auto_info[4]
-                variacion = random.uniform(0.9, 1.1)
-                monto = int(precio_base * variacion)
-                monto_texto = f"S/. {monto:,.2f}"
-                
-                dias_atras = random.randint(0, 180)
-                fecha_venta = fecha_inicio + timedelta(days=dias_atras)
-                
-                cursor.execute('''
-                    INSERT INTO registro_venta (
-                        fecha_venta, vendedor_id, auto_id, tipo_compra, monto_fisco,
-                        nombre_comprador, dni_comprador, contacto_comprador,
-                        sucursal_provincia, sucursal_distrito, nombre_vendedor
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    fecha_venta, vendedor_id, auto_id, tipo_compra, monto_texto,
-                    nombre_comprador, dni_comprador, contacto_comprador,
-                    vendedor_data[1], vendedor_data[2], vendedor_data[0]
-                ))
-                
-                total_ventas += 1
-            
-            if total_ventas >= 432:
-                break
-        
-        conn.commit()
-        
-        logger.info(f"✅ Insertados {total_ventas} registros de ventas")
+        stats = generar_datos(conn, **escala)
         logger.info("✅ Datos iniciales cargados correctamente respetando integridad referencial")
+        return stats
         
     except Exception as e:
         logger.error(f"❌ Error al insertar datos iniciales: {e}")
         conn.rollback()
         raise
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
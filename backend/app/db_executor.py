@@ -0,0 +1,67 @@
+"""
+Capa de acceso asíncrono a base de datos
+
+Los servicios usan drivers síncronos (sqlite3 o los de SQLAlchemy). Para no bloquear el
+event loop de uvicorn, las rutas ejecutan cada función de servicio en un
+pool de hilos dedicado y acotado, separado del threadpool por defecto de
+Starlette, con tantos hilos como conexiones tiene el pool de BD.
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from app.config import settings
+from app.metrics import observe_db
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Devuelve el executor de BD, creándolo en el primer uso"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = settings.DB_EXECUTOR_WORKERS or settings.DB_POOL_SIZE
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+                logger.info(f"🧵 Executor de base de datos creado ({workers} hilos)")
+    return _executor
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta una función de servicio síncrona en el executor de BD
+
+    Uso:
+        autos = await run_db(get_autos_disponibles, search)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(_timed, func, args, kwargs))
+
+
+def _timed(func: Callable[..., T], args: tuple, kwargs: dict) -> T:
+    # Se mide dentro del hilo: excluye la espera en la cola del executor
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        observe_db(func.__name__, time.perf_counter() - start)
+
+
+def shutdown_executor() -> None:
+    """Detiene el executor de BD esperando las consultas en curso"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,235 @@
+"""
+Pool de conexiones a base de datos
+
+Mantiene un número acotado de conexiones abiertas y las reutiliza entre
+requests. Cada conexión se configura una sola vez al crearse (PRAGMAs,
+row_factory, etc.) mediante la fábrica que recibe el pool.
+
+Lo usan el SQLite nativo y sus réplicas locales. Con DB_TYPE=postgres,
+mysql, azure o sqlalchemy las conexiones son del pool de SQLAlchemy del
+repositorio (app/repository.py), que aplica DB_POOL_RECYCLE_SECONDS; un
+archivo SQLite local no cierra conexiones inactivas y aquí no hace falta
+reciclarlas.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión del pool dentro del tiempo de espera"""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe con tamaño máximo y health checks
+
+    Uso:
+        with pool.connection() as conn:
+            conn.execute(...)
+
+    Args:
+        factory: Función sin argumentos que abre y configura una conexión
+        max_size: Número máximo de conexiones abiertas simultáneamente
+        timeout: Segundos máximos de espera por una conexión libre
+        health_check_interval: Segundos de inactividad tras los cuales se
+            valida la conexión con `health_check_query` antes de entregarla
+        health_check_query: Consulta usada para validar la conexión
+        name: Nombre del pool (para logs y métricas)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 10,
+        timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+        health_check_query: str = "SELECT 1",
+        name: str = "default"
+    ):
+        if max_size < 1:
+            raise ValueError("max_size debe ser mayor o igual a 1")
+
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.health_check_query = health_check_query
+        self.name = name
+
+        self._idle: deque = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        # Métricas
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+
+    # ============================================
+    # CHECKOUT / RETURN
+    # ============================================
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Obtiene una conexión del pool, esperando si están todas en uso"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        conn = None
+        last_used = 0.0
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"El pool '{self.name}' está cerrado")
+                if self._idle:
+                    # LIFO: la conexión usada más recientemente está "caliente"
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reservar el cupo; la conexión se abre fuera del lock
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timeout de {timeout}s esperando conexión del pool '{self.name}'"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            wait_time = time.monotonic() - start
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_time_total += wait_time
+                self._wait_time_max = max(self._wait_time_max, wait_time)
+
+        if conn is None:
+            return self._open()
+
+        if time.monotonic() - last_used >= self.health_check_interval and not self._is_healthy(conn):
+            logger.warning(f"⚠️ Conexión inválida descartada del pool '{self.name}'")
+            self._close_quietly(conn)
+            with self._cond:
+                self._discarded += 1
+            return self._open()
+
+        return conn
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Devuelve una conexión al pool (o la descarta si quedó inutilizable)"""
+        if not discard:
+            try:
+                # Nunca devolver al pool una transacción a medias
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                if discard:
+                    self._discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Context manager de checkout/return de una conexión"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    # ============================================
+    # ADMINISTRACIÓN
+    # ============================================
+
+    def close(self) -> None:
+        """Cierra todas las conexiones libres y rechaza nuevos checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+        logger.info(f"🔌 Pool '{self.name}' cerrado ({len(idle)} conexiones)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Devuelve las métricas actuales del pool"""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "name": self.name,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_total": self._wait_time_total,
+                "wait_time_max": self._wait_time_max,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+            }
+
+    # ============================================
+    # INTERNOS
+    # ============================================
+
+    def _open(self) -> Any:
+        try:
+            conn = self.factory()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _is_healthy(self, conn: Any) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.health_check_query)
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,184 @@
+"""
+Escritor único de SQLite con group commit
+
+SQLite admite un solo escritor a la vez. En lugar de que cada request abra
+su propia transacción y compita por el lock, todas las escrituras se encolan
+y un hilo dedicado las ejecuta en lotes: varias operaciones comparten una
+misma transacción (un solo fsync), y cada una corre dentro de un SAVEPOINT
+para que el fallo de una no descarte las demás del lote.
+
+Las operaciones son funciones `fn(conn, *args)` que NO deben llamar a
+commit/rollback; el resultado se entrega al llamador cuando el lote ya fue
+confirmado.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """
+    Hilo escritor con cola acotada y commits agrupados
+
+    Args:
+        connect: Función que abre la conexión de escritura
+        batch_size: Máximo de operaciones por transacción
+        max_queue: Máximo de operaciones en espera (backpressure)
+        name: Nombre del hilo (para logs)
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        batch_size: int = 64,
+        max_queue: int = 1000,
+        name: str = "db-writer"
+    ):
+        self.connect = connect
+        self.batch_size = batch_size
+        self.name = name
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._batches = 0
+        self._operations = 0
+        self._failed = 0
+        self._max_batch = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Encola una operación de escritura y devuelve su Future"""
+        self.start()
+        future: Future = Future()
+        self._queue.put((fn, args, future))
+        return future
+
+    def execute(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Encola una operación y espera su resultado (ya confirmado)"""
+        return self.submit(fn, *args).result(timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Procesa lo pendiente y detiene el hilo escritor"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "queued": self._queue.qsize(),
+            "batches": self._batches,
+            "operations": self._operations,
+            "failed": self._failed,
+            "max_batch": self._max_batch,
+            "avg_batch": self._operations / self._batches if self._batches else 0.0,
+        }
+
+    # ============================================
+    # HILO ESCRITOR
+    # ============================================
+
+    def _run(self) -> None:
+        conn = self.connect()
+        # Transacciones manuales: BEGIN/SAVEPOINT/COMMIT explícitos
+        conn.isolation_level = None
+        logger.info(f"✍️ Escritor de base de datos '{self.name}' iniciado")
+
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+
+                batch = [item]
+                stop = False
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                try:
+                    self._process(conn, batch)
+                except Exception as e:
+                    logger.error(f"❌ Error inesperado en el escritor de base de datos: {e}")
+                    try:
+                        conn.execute("ROLLBACK")
+                    except Exception:
+                        pass
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                if stop:
+                    break
+        finally:
+            conn.close()
+            logger.info(f"✍️ Escritor de base de datos '{self.name}' detenido")
+
+    def _process(self, conn: Any, batch: List[Tuple[Callable[..., Any], tuple, Future]]) -> None:
+        outcomes: List[Tuple[Future, bool, Any]] = []
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            logger.error(f"❌ No se pudo iniciar la transacción de escritura: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            self._failed += len(batch)
+            return
+
+        for fn, args, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT operacion")
+            try:
+                result = fn(conn, *args)
+                conn.execute("RELEASE SAVEPOINT operacion")
+                outcomes.append((future, True, result))
+            except Exception as e:
+                conn.execute("ROLLBACK TO SAVEPOINT operacion")
+                conn.execute("RELEASE SAVEPOINT operacion")
+                outcomes.append((future, False, e))
+
+        try:
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"❌ Error al confirmar lote de escrituras: {e}")
+            try:
+                conn.execute("ROLLBACK")
+            except Exception:
+                pass
+            outcomes = [(future, False, e) for future, _, _ in outcomes]
+
+        self._batches += 1
+        self._operations += len(outcomes)
+        self._max_batch = max(self._max_batch, len(outcomes))
+
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                self._failed += 1
+                future.set_exception(value)
@@ -0,0 +1,22 @@
+"""
+Errores de negocio compartidos por los servicios y el acceso a datos
+
+Los lanzan tanto el camino SQLite de los servicios como el repositorio
+SQLAlchemy (app/repository.py), y las rutas los traducen a códigos HTTP.
+"""
+
+
+class VentaRechazadaError(Exception):
+    """La venta no se registró por una regla de negocio (no por un fallo)"""
+
+
+class AutoNoDisponibleError(VentaRechazadaError):
+    """El auto no existe o está desactivado"""
+
+
+class StockAgotadoError(VentaRechazadaError):
+    """No quedan unidades del auto"""
+
+
+class IdempotencyKeyReutilizadaError(VentaRechazadaError):
+    """La Idempotency-Key ya se usó con otros datos de venta"""
@@ -0,0 +1,66 @@
+"""
+Respuestas condicionales HTTP (ETag / If-None-Match / 304)
+
+El ETag no se calcula sobre el cuerpo: sale de un contador de versión por
+recurso ("catalogo", "perfiles") que se incrementa en los mismos puntos en
+que se invalida su caché en memoria. Comparar el If-None-Match del cliente
+con la versión actual no toca la base de datos, así que un 304 cuesta lo
+mismo que verificar el JWT.
+
+Los contadores son por proceso. Para que una escritura hecha en otro worker
+o pod llegue al cliente a tiempo, el ETag incluye además la ventana de
+tiempo actual (`ventana` segundos, la misma TTL de la caché del recurso):
+un ETag nunca sigue siendo válido más de lo que la caché en memoria
+serviría el dato antiguo.
+"""
+import threading
+import time
+from typing import Dict
+
+from fastapi import Request, Response
+
+_versiones: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def version(recurso: str) -> int:
+    return _versiones.get(recurso, 0)
+
+
+def nueva_version(recurso: str) -> int:
+    """Marca `recurso` como modificado: los ETag emitidos dejan de coincidir"""
+    with _lock:
+        _versiones[recurso] = _versiones.get(recurso, 0) + 1
+        return _versiones[recurso]
+
+
+def etag(recurso: str, *partes, ventana: float = 60.0) -> str:
+    """ETag débil: recurso, partes (p. ej. el id del vendedor), versión y ventana"""
+    epoca = int(time.time() // ventana) if ventana > 0 else 0
+    segmentos = [recurso, *(str(p) for p in partes), str(version(recurso)), str(epoca)]
+    return 'W/"' + "-".join(segmentos) + '"'
+
+
+def _sin_debil(valor: str) -> str:
+    return valor[2:] if valor.startswith("W/") else valor
+
+
+def coincide(request: Request, etiqueta: str) -> bool:
+    """Comparación débil del If-None-Match del request con `etiqueta`"""
+    cabecera = request.headers.get("if-none-match")
+    if not cabecera:
+        return False
+    if cabecera.strip() == "*":
+        return True
+    buscada = _sin_debil(etiqueta)
+    return any(_sin_debil(valor.strip()) == buscada for valor in cabecera.split(","))
+
+
+def cabeceras_cache(etiqueta: str, cache_control: str) -> Dict[str, str]:
+    # Vary: Authorization porque el cuerpo depende del token
+    return {"ETag": etiqueta, "Cache-Control": cache_control, "Vary": "Authorization"}
+
+
+def no_modificado(cabeceras: Dict[str, str]) -> Response:
+    """304 sin cuerpo, con las mismas cabeceras de caché que el 200"""
+    return Response(status_code=304, headers=cabeceras)
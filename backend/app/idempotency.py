@@ -0,0 +1,120 @@
+"""
+Claves de idempotencia (cabecera Idempotency-Key)
+
+Cuando el backend tarda, el frontend y las integraciones de sucursal
+reintentan POST /venta/registrar. Con una Idempotency-Key:
+
+- un reintento con la misma clave y el mismo cuerpo recibe el venta_id
+  original sin pasar por el escritor
+- un duplicado que llega mientras el primero sigue en curso espera su
+  resultado (o su error) en vez de competir con él
+- la misma clave con otro cuerpo es un error del cliente
+  (`IdempotencyKeyReutilizadaError`)
+
+La fuente de verdad es la tabla `idempotencia`: cada clave se inserta en la
+misma transacción que su venta (ver `registrar_venta_idempotente` en
+app/services/venta_service.py), así que todos los workers y réplicas la ven
+y una venta confirmada siempre tiene su clave. Delante hay dos atajos por
+proceso:
+
+- una caché (app/cache.py) con las claves ya completadas, que responde los
+  reintentos sin consultar la base
+- los intentos en curso: un duplicado que llega al mismo proceso espera el
+  futuro del primero. Entre procesos distintos decide la transacción de
+  escritura: el segundo intento encuentra la clave y devuelve esa venta.
+
+El intento original corre en su propia tarea: si el cliente se desconecta a
+mitad del registro, la venta y su clave se confirman igual y el reintento
+recibe esa venta.
+"""
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Tuple
+
+import orjson
+
+from app.cache import get_cache
+from app.config import settings
+from app.errors import IdempotencyKeyReutilizadaError
+
+IDEMPOTENCIA_CACHE = "idempotencia"
+
+
+class ClaveIdempotencia(NamedTuple):
+    """Clave a guardar junto con la venta; `expira` es un timestamp Unix"""
+    clave: str
+    huella: str
+    expira: float
+
+
+def get_idempotencia_cache():
+    """Caché de claves completadas (clave → (huella, venta_id))"""
+    return get_cache(
+        IDEMPOTENCIA_CACHE,
+        max_entries=settings.IDEMPOTENCY_MAX_KEYS,
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS
+    )
+
+
+def huella(cuerpo: Dict[str, Any]) -> str:
+    """Huella de 32 caracteres del cuerpo del request (independiente del orden de los campos)"""
+    return hashlib.blake2b(orjson.dumps(cuerpo, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+# Intentos en curso en este proceso: clave → (huella, tarea del intento original)
+_en_curso: Dict[str, Tuple[str, "asyncio.Task[Tuple[int, bool]]"]] = {}
+
+
+def _comprobar_huella(original: str, huella_cuerpo: str) -> None:
+    if original != huella_cuerpo:
+        raise IdempotencyKeyReutilizadaError("La Idempotency-Key ya se usó con otros datos de venta")
+
+
+async def ejecutar_idempotente(
+    clave: str,
+    huella_cuerpo: str,
+    operacion: Callable[[ClaveIdempotencia], Awaitable[Tuple[int, bool]]]
+) -> Tuple[int, bool]:
+    """
+    Ejecuta `operacion` una sola vez por `clave`
+
+    `operacion` recibe la `ClaveIdempotencia` que debe guardar con la venta y
+    devuelve (venta_id, repetida), con repetida True si la base ya tenía la
+    clave.
+
+    Returns:
+        (venta_id, repetida): repetida es True si el resultado es el de un
+        intento anterior (o del intento en curso al que se esperó)
+
+    Raises:
+        IdempotencyKeyReutilizadaError: la clave se usó con otro cuerpo
+        Cualquier error de `operacion`, también para quienes esperaban
+    """
+    cache = get_idempotencia_cache()
+    completada = cache.get(clave)
+    if completada is not None:
+        _comprobar_huella(completada[0], huella_cuerpo)
+        return completada[1], True
+
+    en_curso = _en_curso.get(clave)
+    if en_curso is not None:
+        _comprobar_huella(en_curso[0], huella_cuerpo)
+        # shield: si este cliente se desconecta, el intento original sigue
+        venta_id, _ = await asyncio.shield(en_curso[1])
+        return venta_id, True
+
+    async def intento() -> Tuple[int, bool]:
+        try:
+            expira = time.time() + settings.IDEMPOTENCY_TTL_SECONDS
+            venta_id, repetida = await operacion(ClaveIdempotencia(clave, huella_cuerpo, expira))
+            cache.set(clave, (huella_cuerpo, venta_id))
+            return venta_id, repetida
+        finally:
+            _en_curso.pop(clave, None)
+
+    tarea = asyncio.create_task(intento())
+    _en_curso[clave] = (huella_cuerpo, tarea)
+    # Sin duplicados esperando, evita el aviso de excepción no leída
+    tarea.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return await asyncio.shield(tarea)
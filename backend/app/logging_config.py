@@ -0,0 +1,194 @@
+"""
+Pipeline de logging no bloqueante
+
+Los handlers de la aplicación solo encolan registros en una cola acotada;
+un hilo (QueueListener) los formatea y los escribe a consola y a un archivo
+rotativo. Así la latencia de disco nunca aparece en la latencia de un
+request. Si la cola se llena, el registro se descarta y se cuenta en
+`log_records_dropped_total` en lugar de frenar al llamador.
+
+Además:
+- Formato JSON estructurado (LOG_FORMAT="json") o texto plano
+- Rotación por tamaño (LOG_ROTATION="size") o por tiempo ("time")
+- Muestreo por ruta: los logs de acceso de /health se registran solo en una
+  fracción LOG_HEALTH_SAMPLE_RATE de los requests
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from app.config import settings
+
+# Atributos estándar de LogRecord: todo lo demás se considera campo "extra"
+_CAMPOS_ESTANDAR = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+_lock = threading.Lock()
+
+access_logger = logging.getLogger("app.access")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _CAMPOS_ESTANDAR and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que nunca bloquea: descarta y cuenta si la cola está llena"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Solo se resuelve el mensaje; el formateo lo hace el hilo del listener
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class PathSamplingFilter(logging.Filter):
+    """Deja pasar solo una fracción de los registros con `path` muestreado"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        path = getattr(record, "path", None)
+        if path is None or path not in self.rates:
+            return True
+        return random.random() < self.rates[path]
+
+
+def _build_file_handler() -> logging.Handler:
+    if settings.LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            settings.LOG_FILE,
+            when=settings.LOG_ROTATE_WHEN,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        settings.LOG_FILE,
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+
+
+def setup_logging() -> None:
+    """Configura el logging raíz con la cola acotada y el hilo escritor"""
+    global _listener, _queue_handler
+
+    with _lock:
+        if _listener is not None:
+            return
+
+        if settings.LOG_FORMAT == "json":
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+        handlers = [logging.StreamHandler()]
+        if settings.LOG_FILE:
+            handlers.append(_build_file_handler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _queue_handler = BoundedQueueHandler(log_queue)
+        _queue_handler.addFilter(PathSamplingFilter({"/health": settings.LOG_HEALTH_SAMPLE_RATE}))
+
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Vaciar la cola también si el proceso termina sin evento shutdown
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Vacía la cola y detiene el hilo escritor de logs"""
+    global _listener
+
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def dropped_records() -> int:
+    """Registros descartados por cola llena desde el arranque"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+class AccessLogMiddleware:
+    """
+    Middleware ASGI de log de acceso: un único registro estructurado por
+    request (método, ruta, status, duración, IP del cliente)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            client = scope.get("client")
+            access_logger.info(
+                f"{scope['method']} {scope['path']} - Status: {status_code} - Time: {duration_ms:.1f}ms",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "client_ip": client[0] if client else None,
+                }
+            )
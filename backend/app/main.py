@@ -1,39 +1,55 @@
-import logging
-import os
 import time
-from datetime import datetime
-from fastapi import FastAPI, Request
+
+# Referencia para app_startup_seconds: se toma antes de importar FastAPI y la app
+_INICIO_ARRANQUE = time.perf_counter()
+
+import asyncio
+import logging
+import threading
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routes import auth, venta
+from app.routes import analytics, auth, venta
+from app.db_executor import shutdown_executor
+from app.cache import cache_stats
+from app.metrics import PrometheusMiddleware, observe_startup, render_metrics, set_process_start
+from app.logging_config import AccessLogMiddleware, setup_logging, shutdown_logging
+from app.migrations import start_backfill_monto_centimos, stop_backfill_monto_centimos
+from app.passwords import iniciar_hashing, shutdown_hashing
 
 # Importar funciones de database para inicialización
 try:
-    from app.database import init_database, seed_initial_data
+    from app.database import (
+        init_database, seed_initial_data, close_pool, close_replicas, close_repositorio, close_writer,
+        estado_esquema, get_repositorio, iniciar_replicas, usa_repositorio
+    )
     DATABASE_AVAILABLE = True
 except ImportError:
     DATABASE_AVAILABLE = False
     logging.warning("No se pudieron importar funciones de database")
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('aplicacion.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Configurar logging (cola acotada + hilo escritor, ver app/logging_config.py)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
+set_process_start(_INICIO_ARRANQUE)
+
+# Estado de la preparación de la base; /ready responde 200 solo con "listo"
+_arranque = {"estado": "iniciando", "esquema": None, "detalle": None}
+_detener_arranque = threading.Event()
+_tarea_arranque = None
+
 # Crear instancia de FastAPI
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="API para el sistema de gestión de Automotriz JJ",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson escribe el cuerpo; ver app/utils/respuestas.py
+    default_response_class=ORJSONResponse
 )
 
 # Configurar CORS
@@ -45,28 +61,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middleware para logging de requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = datetime.now()
-    
-    # Log de entrada
-    logger.info(f"Incoming request: {request.method} {request.url.path}")
-    logger.info(f"Client IP: {request.client.host}")
-    
-    response = await call_next(request)
-    
-    # Calcular tiempo de procesamiento
-    process_time = (datetime.now() - start_time).total_seconds()
-    
-    # Log de salida
-    logger.info(f"Completed: {request.method} {request.url.path} - Status: {response.status_code} - Time: {process_time:.2f}s")
-    
-    return response
+# Métricas Prometheus por request
+app.add_middleware(PrometheusMiddleware)
+
+# Log de acceso estructurado (un registro por request, sin bloquear)
+app.add_middleware(AccessLogMiddleware)
 
 # Incluir routers
 app.include_router(auth.router)
 app.include_router(venta.router)
+app.include_router(analytics.router)
 
 
 @app.get("/")
@@ -84,14 +88,38 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Endpoint para verificar el estado del servidor"""
-    logger.info("Health check accessed")
     return {
         "status": "healthy",
         "service": settings.APP_NAME,
-        "version": settings.APP_VERSION
+        "version": settings.APP_VERSION,
+        "cache": cache_stats()
+    }
+
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """
+    Sonda de disponibilidad: 503 hasta que la base esté verificada
+
+    /health solo dice que el proceso responde; /ready dice que puede
+    atender tráfico (esquema al día y réplicas iniciadas).
+    """
+    if _arranque["estado"] != "listo":
+        response.status_code = 503
+    return {
+        "status": _arranque["estado"],
+        "schema_version": _arranque["esquema"],
+        "detail": _arranque["detalle"]
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas en formato Prometheus (scrape según anotaciones del pod)"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
 # ============================================
 # FUNCIONES DE INICIALIZACIÓN DE BASE DE DATOS
 # ============================================
@@ -111,45 +139,27 @@ def wait_for_database(max_retries=10, retry_delay=5):
         logger.error("Funciones de database no disponibles")
         return False
     
-    # Solo esperar si estamos usando Azure SQL
-    db_type = os.getenv('DB_TYPE', 'sqlite').lower()
-    if db_type != 'azure':
+    # Solo esperar si la base es remota (PostgreSQL, MySQL, Azure SQL)
+    if not usa_repositorio():
         logger.info("Usando SQLite, no es necesario esperar")
         return True
     
-    import pyodbc
-    
-    server = os.getenv('AZURE_SQL_SERVER')
-    database = os.getenv('AZURE_SQL_DATABASE')
-    username = os.getenv('AZURE_SQL_USERNAME')
-    password = os.getenv('AZURE_SQL_PASSWORD')
-    driver = os.getenv('AZURE_SQL_DRIVER', '{ODBC Driver 18 for SQL Server}')
-    
-    connection_string = (
-        f'DRIVER={driver};'
-        f'SERVER={server};'
-        f'DATABASE={database};'
-        f'UID={username};'
-        f'PWD={password};'
-        f'Encrypt=yes;'
-        f'TrustServerCertificate=no;'
-        f'Connection Timeout=30;'
-    )
-    
-    logger.info("🔄 Esperando a que Azure SQL Database esté disponible...")
+    logger.info(f"🔄 Esperando a que la base de datos ({settings.DB_TYPE}) esté disponible...")
     
     for attempt in range(1, max_retries + 1):
         try:
-            logger.info(f"Intento {attempt}/{max_retries} de conexión a {server}/{database}")
-            conn = pyodbc.connect(connection_string)
-            conn.close()
+            logger.info(f"Intento {attempt}/{max_retries} de conexión")
+            # Mismo engine (y pool) que usan los servicios
+            get_repositorio().ping()
             logger.info("✅ Base de datos disponible!")
             return True
         except Exception as e:
             logger.warning(f"⚠️ Intento {attempt} falló: {e}")
             if attempt < max_retries:
                 logger.info(f"Reintentando en {retry_delay} segundos...")
-                time.sleep(retry_delay)
+                # Corre en un hilo: el apagado corta la espera en vez de dormir
+                if _detener_arranque.wait(retry_delay):
+                    return False
             else:
                 logger.error("❌ No se pudo conectar a la base de datos después de múltiples intentos")
                 return False
@@ -157,31 +167,63 @@ def wait_for_database(max_retries=10, retry_delay=5):
     return False
 
 
-def initialize_database():
+def prepare_database():
     """
-    Inicializa la base de datos: crea tablas e inserta datos iniciales
+    Deja la base lista para atender requests
+
+    En un arranque normal (esquema ya migrado) cuesta una sola consulta a
+    `schema_version`. Si el esquema está atrasado lo migra solo con
+    DB_MIGRAR_AL_INICIAR; si no, el proceso queda fuera de servicio (/ready
+    en 503) hasta que corra `python -m app.manage migrate`.
     
     Returns:
-        bool: True si la inicialización fue exitosa, False si no
+        bool: True si la base quedó lista, False si no
     """
     if not DATABASE_AVAILABLE:
         logger.error("Funciones de database no disponibles")
         return False
     
     try:
-        logger.info("📊 Inicializando base de datos...")
+        # Esperar a que la base de datos esté disponible (solo bases remotas)
+        if usa_repositorio() and not wait_for_database():
+            _arranque["detalle"] = "base de datos no disponible"
+            return False
         
-        # Crear tablas
-        logger.info("🔨 Creando tablas si no existen...")
-        init_database()
-        logger.info("✅ Tablas verificadas/creadas")
+        actual, esperada = estado_esquema()
+        if actual < esperada:
+            if not settings.DB_MIGRAR_AL_INICIAR:
+                logger.error(
+                    f"❌ Esquema en versión {actual}, se espera {esperada}: "
+                    f"ejecute 'python -m app.manage migrate'"
+                )
+                _arranque["esquema"] = actual
+                _arranque["detalle"] = f"esquema {actual} < {esperada}, falta migrar"
+                return False
+            
+            logger.info(f"🔨 Migrando esquema de la versión {actual} a la {esperada}...")
+            aplicadas = init_database()
+            
+            # Base recién creada: datos de demostración (el seed se omite si ya hay datos)
+            if 1 in aplicadas:
+                logger.info("📝 Verificando/insertando datos iniciales...")
+                seed_initial_data()
+            actual = esperada
+        elif actual > esperada:
+            logger.warning(f"⚠️ Esquema en versión {actual}, más nueva que la de este código ({esperada})")
+        else:
+            logger.info(f"✅ Esquema al día (versión {actual})")
+        _arranque["esquema"] = actual
         
-        # Insertar datos iniciales
-        logger.info("📝 Verificando/insertando datos iniciales...")
-        seed_initial_data()
-        logger.info("✅ Datos iniciales verificados/insertados")
+        # Completar montos numéricos de ventas antiguas sin bloquear el arranque
+        # (solo SQLite: el esquema del repositorio nace con monto_centimos)
+        if not usa_repositorio():
+            start_backfill_monto_centimos(
+                chunk_size=settings.MONTO_BACKFILL_CHUNK_SIZE,
+                pausa=settings.MONTO_BACKFILL_PAUSE_SECONDS
+            )
         
-        logger.info("✅ Inicialización de base de datos completada exitosamente")
+        # Réplicas de lectura (si DB_READ_REPLICAS está configurado)
+        iniciar_replicas()
         return True
         
     except Exception as e:
@@ -189,9 +231,24 @@ def initialize_database():
         logger.error(f"Tipo de error: {type(e).__name__}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
+        _arranque["detalle"] = f"{type(e).__name__}: {e}"
         return False
 
 
+async def _preparar_en_segundo_plano():
+    """Prepara la base en un hilo; el servidor ya acepta conexiones (/health)"""
+    # Los procesos de hashing arrancan mientras se prepara la base
+    await asyncio.to_thread(iniciar_hashing)
+    listo = await asyncio.to_thread(prepare_database)
+    if listo:
+        _arranque["estado"] = "listo"
+        logger.info(f"✅ Base de datos lista en {observe_startup('ready'):.3f}s desde el arranque")
+    else:
+        _arranque["estado"] = "error"
+        logger.error("❌ Error al inicializar base de datos")
+        logger.error("⚠️ /ready responderá 503 hasta reiniciar con la base disponible y migrada")
+
+
 # ============================================
 # EVENTOS DE INICIO Y CIERRE
 # ============================================
@@ -199,34 +256,22 @@ def initialize_database():
 @app.on_event("startup")
 async def startup_event():
     """Se ejecuta cuando la aplicación inicia"""
+    global _tarea_arranque
+    
     logger.info("=" * 70)
     logger.info(f"🚀 Iniciando {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info("=" * 70)
     
     # Verificar tipo de base de datos
-    db_type = os.getenv('DB_TYPE', 'sqlite').lower()
-    logger.info(f"📊 Tipo de base de datos: {db_type.upper()}")
+    logger.info(f"📊 Tipo de base de datos: {settings.DB_TYPE.upper()}")
     
-    # Inicializar base de datos
-    try:
-        if DATABASE_AVAILABLE:
-            # Esperar a que la base de datos esté disponible (solo para Azure SQL)
-            if db_type == 'azure':
-                if not wait_for_database():
-                    logger.error("❌ Base de datos no disponible, pero continuando...")
-                    logger.error("⚠️ La aplicación puede no funcionar correctamente")
-            
-            # Inicializar base de datos
-            if initialize_database():
-                logger.info("✅ Base de datos lista")
-            else:
-                logger.error("❌ Error al inicializar base de datos")
-                logger.error("⚠️ La aplicación puede no funcionar correctamente")
-        else:
-            logger.warning("⚠️ Funciones de database no disponibles, omitiendo inicialización")
-    except Exception as e:
-        logger.error(f"❌ Error crítico al inicializar base de datos: {e}")
-        logger.error("⚠️ La aplicación continuará pero puede no funcionar correctamente")
+    # La verificación del esquema (y la espera a bases remotas) no bloquea
+    # el event loop: uvicorn empieza a escuchar y /ready indica cuándo entra
+    # tráfico
+    if DATABASE_AVAILABLE:
+        _tarea_arranque = asyncio.create_task(_preparar_en_segundo_plano())
+    else:
+        logger.warning("⚠️ Funciones de database no disponibles, omitiendo inicialización")
     
     logger.info("")
     logger.info(f"📝 Documentación disponible en: /docs")
@@ -240,4 +285,20 @@ async def shutdown_event():
     """Se ejecuta cuando la aplicación se cierra"""
     logger.info("=" * 70)
     logger.info(f"👋 Cerrando {settings.APP_NAME}")
-    logger.info("=" * 70)
\ No newline at end of file
+    
+    if DATABASE_AVAILABLE:
+        # Corta la espera a la base y deja terminar una migración en curso
+        _detener_arranque.set()
+        if _tarea_arranque is not None:
+            await asyncio.gather(_tarea_arranque, return_exceptions=True)
+        stop_backfill_monto_centimos()
+        shutdown_executor()
+        shutdown_hashing()
+        # El monitor de réplicas escribe latidos con el escritor
+        close_replicas()
+        close_writer()
+        close_pool()
+        close_repositorio()
+    
+    logger.info("=" * 70)
+    shutdown_logging()
\ No newline at end of file
@@ -0,0 +1,329 @@
+"""
+Comandos de mantenimiento
+
+Uso (desde backend/):
+    python -m app.manage migrate [--sin-datos] [--estado]
+    python -m app.manage backfill-montos [--chunk-size 1000] [--pausa 0.05]
+    python -m app.manage rebuild-rollups
+    python -m app.manage seed [--ventas 1000000] [--vendedores 200] [--modelos 300] [--seed 42] [--rapido] [--reset]
+    python -m app.manage snapshot-ventas --salida ventas.npz
+    python -m app.manage top-modelos [--snapshot ventas.npz] [--dias 90] [--n 10]
+    python -m app.manage schema-sql [--dialecto postgresql|mysql|mssql|sqlite]
+    python -m app.manage auto AUTO_ID [--stock N] [--activar|--desactivar]
+    python -m app.manage vendedor USERNAME [--nombre ...] [--email ...] [--rol ...] [--provincia ...] [--distrito ...] [--activar|--desactivar]
+
+migrate aplica las migraciones de esquema pendientes; en Kubernetes lo corre
+el Job de 08-job-migraciones.yaml una vez por despliegue.
+
+backfill-montos, rebuild-rollups y la foto columnar leída de la base son
+propios de SQLite (DB_TYPE=sqlite).
+
+auto repone stock o retira un auto del catálogo; los workers de la API lo
+ven cuando vence su caché del catálogo (CATALOG_CACHE_TTL_SECONDS).
+
+vendedor edita el perfil de un vendedor. Los workers de la API leen nombre,
+sucursal y estado de su caché de perfiles, así que el cambio (incluida una
+desactivación) vale en todos a más tardar en USER_CACHE_TTL_SECONDS.
+"""
+import argparse
+import logging
+import sys
+from datetime import date
+from app.config import settings
+from app.database import (
+    close_pool, close_repositorio, close_writer, estado_esquema, get_db_connection,
+    get_repositorio, init_database, seed_initial_data, usa_repositorio
+)
+from app.migrations import backfill_monto_centimos
+from app.rollups import drop_rollup_triggers, init_rollups
+from app.seed import generar_datos
+from app.services.analytics_service import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+
+def _requiere_sqlite(comando: str) -> bool:
+    if usa_repositorio():
+        print(f"{comando} solo está disponible con DB_TYPE=sqlite (actual: {settings.DB_TYPE})")
+        return True
+    return False
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    actual, esperada = estado_esquema()
+    if args.estado:
+        print(f"Esquema en versión {actual} (este código espera la {esperada})")
+        return 0 if actual >= esperada else 1
+
+    aplicadas = init_database()
+    if not aplicadas:
+        print(f"Esquema al día (versión {actual})")
+        return 0
+    print(f"Migraciones aplicadas: {', '.join(map(str, aplicadas))} (versión {aplicadas[-1]})")
+
+    # Base recién creada: datos de demostración, como hacía el arranque
+    if 1 in aplicadas and not args.sin_datos:
+        seed_initial_data()
+    if not usa_repositorio():
+        actualizadas = backfill_monto_centimos(
+            chunk_size=settings.MONTO_BACKFILL_CHUNK_SIZE,
+            pausa=settings.MONTO_BACKFILL_PAUSE_SECONDS
+        )
+        if actualizadas:
+            print(f"Montos completados: {actualizadas}")
+    return 0
+
+
+def cmd_backfill_montos(args: argparse.Namespace) -> int:
+    if _requiere_sqlite("backfill-montos"):
+        return 2
+    init_database()
+    actualizadas = backfill_monto_centimos(chunk_size=args.chunk_size, pausa=args.pausa)
+    print(f"Filas actualizadas: {actualizadas}")
+    return 0
+
+
+def cmd_rebuild_rollups(args: argparse.Namespace) -> int:
+    if _requiere_sqlite("rebuild-rollups"):
+        return 2
+    init_database()
+    filas = rebuild_rollups()
+    print(f"Filas de rollup: {filas}")
+    return 0
+
+
+def cmd_seed(args: argparse.Namespace) -> int:
+    init_database()
+    if usa_repositorio():
+        return _seed_repositorio(args)
+    
+    conn = get_db_connection()
+    try:
+        if args.reset:
+            # Sin triggers de rollups el borrado no toca ventas_diarias fila por fila
+            drop_rollup_triggers(conn)
+            # Las claves de idempotencia apuntan a ventas que se borran; los
+            # tokens revocados se conservan: el seed vuelve a crear los mismos
+            # usernames y un token cerrado con logout no debe revivir
+            for tabla in ("idempotencia", "registro_venta", "autos_disponibles", "vendedores", "ventas_diarias"):
+                conn.execute(f"DELETE FROM {tabla}")
+            init_rollups(conn)
+            conn.commit()
+        elif conn.execute("SELECT COUNT(*) FROM vendedores").fetchone()[0]:
+            print("La base ya tiene datos; use --reset para reemplazarlos")
+            return 1
+
+        stats = generar_datos(
+            conn,
+            vendedores=args.vendedores,
+            modelos=args.modelos,
+            anios=args.anios,
+            ventas=args.ventas,
+            dias=args.dias,
+            hasta=args.hasta,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            transaccion=args.transaccion,
+            rapido=args.rapido
+        )
+    finally:
+        conn.close()
+
+    print(
+        f"{stats['ventas']:,} ventas, {stats['autos']} autos y {stats['vendedores']} vendedores "
+        f"en {stats['segundos']}s ({stats['ventas_por_segundo']:,} ventas/s)"
+    )
+    return 0
+
+
+def _seed_repositorio(args: argparse.Namespace) -> int:
+    if args.reset or args.rapido:
+        print("--reset y --rapido solo están disponibles con DB_TYPE=sqlite")
+        return 2
+    stats = get_repositorio().sembrar(
+        vendedores=args.vendedores,
+        modelos=args.modelos,
+        anios=args.anios,
+        ventas=args.ventas,
+        dias=args.dias,
+        hasta=args.hasta,
+        seed=args.seed,
+        batch_size=args.batch_size
+    )
+    if stats is None:
+        print("La base ya tiene datos")
+        return 1
+    print(f"{stats['ventas']:,} ventas, {stats['autos']} autos y {stats['vendedores']} vendedores")
+    return 0
+
+
+def _cargar_snapshot(ruta):
+    # NumPy solo se importa para los comandos analíticos
+    from app.columnar import VentasColumnar
+
+    if ruta:
+        return VentasColumnar.cargar(ruta)
+    if _requiere_sqlite("La foto columnar desde la base"):
+        sys.exit(2)
+    conn = get_db_connection()
+    try:
+        return VentasColumnar.desde_sqlite(conn)
+    finally:
+        conn.close()
+
+
+def cmd_snapshot_ventas(args: argparse.Namespace) -> int:
+    snapshot = _cargar_snapshot(None)
+    snapshot.guardar(args.salida, comprimir=args.comprimir)
+    print(f"Foto de {len(snapshot)} ventas guardada en {args.salida}")
+    return 0
+
+
+def cmd_top_modelos(args: argparse.Namespace) -> int:
+    from app.utils.money import format_monto
+
+    snapshot = _cargar_snapshot(args.snapshot)
+    top = snapshot.top_n(args.por, "modelo", n=args.n, metrica=args.metrica, ultimos_dias=args.dias)
+    for grupo, modelos in top.items():
+        print(f"\n{grupo}")
+        for posicion, fila in enumerate(modelos, start=1):
+            print(f"  {posicion:>2}. {fila['modelo']:<30} {fila['num_ventas']:>6} ventas  {format_monto(fila['monto_centimos_total'])}")
+    return 0
+
+
+def cmd_schema_sql(args: argparse.Namespace) -> int:
+    # Solo compila el DDL: no necesita el driver ni una conexión
+    from app.repository import schema_sql
+
+    print(schema_sql(args.dialecto))
+    return 0
+
+
+def cmd_auto(args: argparse.Namespace) -> int:
+    from app.services.venta_service import actualizar_auto
+
+    if args.stock is None and args.activo is None:
+        print("Indique --stock, --activar o --desactivar")
+        return 2
+    if args.stock is not None and args.stock < 0:
+        print("El stock no puede ser negativo")
+        return 2
+    if not actualizar_auto(args.auto_id, stock=args.stock, is_active=args.activo):
+        print(f"Auto no encontrado: {args.auto_id}")
+        return 1
+    print(f"Auto {args.auto_id} actualizado")
+    return 0
+
+
+def cmd_vendedor(args: argparse.Namespace) -> int:
+    from app.services.auth_service import actualizar_vendedor, get_user
+
+    campos = {
+        "full_name": args.nombre,
+        "email": args.email,
+        "role": args.rol,
+        "sucursal_provincia": args.provincia,
+        "sucursal_distrito": args.distrito,
+        "is_active": args.activo,
+    }
+    cambios = {campo: valor for campo, valor in campos.items() if valor is not None}
+
+    user = get_user(args.username)
+    if not user:
+        print(f"Vendedor no encontrado: {args.username}")
+        return 1
+    if not cambios:
+        print(f"{user['username']}: {user['full_name']} ({user['sucursal_provincia']}/{user['sucursal_distrito']}), "
+              f"{'activo' if user['is_active'] else 'inactivo'}")
+        return 0
+    if not actualizar_vendedor(user["id"], **cambios):
+        print(f"No se pudo actualizar el vendedor {args.username}")
+        return 1
+    print(f"Vendedor {args.username} actualizado: {', '.join(cambios)}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    migrate = subparsers.add_parser("migrate", help="Aplica las migraciones de esquema pendientes")
+    migrate.add_argument("--sin-datos", action="store_true", help="No cargar los datos de demostración en una base nueva")
+    migrate.add_argument("--estado", action="store_true", help="Solo muestra la versión (sale con 1 si falta migrar)")
+    migrate.set_defaults(func=cmd_migrate)
+
+    backfill = subparsers.add_parser("backfill-montos", help="Completa registro_venta.monto_centimos por lotes")
+    backfill.add_argument("--chunk-size", type=int, default=settings.MONTO_BACKFILL_CHUNK_SIZE)
+    backfill.add_argument("--pausa", type=float, default=settings.MONTO_BACKFILL_PAUSE_SECONDS)
+    backfill.set_defaults(func=cmd_backfill_montos)
+
+    rollups = subparsers.add_parser("rebuild-rollups", help="Recalcula desde cero los agregados de ventas_diarias")
+    rollups.set_defaults(func=cmd_rebuild_rollups)
+
+    seed = subparsers.add_parser("seed", help="Genera datos sintéticos a la escala indicada")
+    seed.add_argument("--vendedores", type=int, default=12)
+    seed.add_argument("--modelos", type=int, default=24, help="Modelos por año")
+    seed.add_argument("--anios", type=int, default=2)
+    seed.add_argument("--ventas", type=int, default=432)
+    seed.add_argument("--dias", type=int, default=180, help="Días hacia atrás de las fechas de venta")
+    seed.add_argument("--hasta", type=date.fromisoformat, default=None, help="Fecha de la última venta (AAAA-MM-DD en UTC, por defecto hoy; nunca después de hoy)")
+    seed.add_argument("--seed", type=int, default=None, help="Semilla para datos reproducibles")
+    seed.add_argument("--batch-size", type=int, default=10_000, help="Filas por executemany")
+    seed.add_argument("--transaccion", type=int, default=200_000, help="Filas por commit")
+    seed.add_argument("--rapido", action="store_true", help="PRAGMAs relajados; índices y rollups al final")
+    seed.add_argument("--reset", action="store_true", help="Borra vendedores, autos, ventas y claves de idempotencia antes de generar")
+    seed.set_defaults(func=cmd_seed)
+
+    snapshot = subparsers.add_parser("snapshot-ventas", help="Guarda una foto columnar (.npz) de las ventas")
+    snapshot.add_argument("--salida", default="ventas.npz")
+    snapshot.add_argument("--comprimir", action="store_true")
+    snapshot.set_defaults(func=cmd_snapshot_ventas)
+
+    top = subparsers.add_parser("top-modelos", help="Top de modelos por provincia u otra columna")
+    top.add_argument("--snapshot", help="Foto .npz (por defecto se lee la base de datos)")
+    top.add_argument("--por", default="provincia")
+    top.add_argument("--dias", type=int, default=90)
+    top.add_argument("--n", type=int, default=10)
+    top.add_argument("--metrica", choices=["monto", "ventas"], default="monto")
+    top.set_defaults(func=cmd_top_modelos)
+
+    schema = subparsers.add_parser("schema-sql", help="Imprime el DDL del esquema para un dialecto de SQLAlchemy")
+    schema.add_argument("--dialecto", default="postgresql", choices=["postgresql", "mysql", "mssql", "sqlite"])
+    schema.set_defaults(func=cmd_schema_sql)
+
+    auto = subparsers.add_parser("auto", help="Cambia el stock o el estado de un auto del catálogo")
+    auto.add_argument("auto_id", type=int)
+    auto.add_argument("--stock", type=int, help="Unidades disponibles (reemplaza el valor actual)")
+    estado_auto = auto.add_mutually_exclusive_group()
+    estado_auto.add_argument("--activar", dest="activo", action="store_const", const=True)
+    estado_auto.add_argument("--desactivar", dest="activo", action="store_const", const=False, help="Lo retira del catálogo y de las ventas")
+    auto.set_defaults(func=cmd_auto)
+
+    vendedor = subparsers.add_parser("vendedor", help="Muestra o edita el perfil de un vendedor")
+    vendedor.add_argument("username")
+    vendedor.add_argument("--nombre")
+    vendedor.add_argument("--email")
+    vendedor.add_argument("--rol")
+    vendedor.add_argument("--provincia")
+    vendedor.add_argument("--distrito")
+    estado = vendedor.add_mutually_exclusive_group()
+    estado.add_argument("--activar", dest="activo", action="store_const", const=1)
+    estado.add_argument("--desactivar", dest="activo", action="store_const", const=0, help="Rechaza sus tokens y nuevos logins")
+    vendedor.set_defaults(func=cmd_vendedor)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(levelname)s %(message)s")
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        close_writer()
+        close_pool()
+        close_repositorio()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
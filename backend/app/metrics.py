@@ -0,0 +1,285 @@
+"""
+Métricas Prometheus expuestas en /metrics
+
+- Latencia HTTP por plantilla de ruta, método y status (histograma)
+- Requests en curso (gauge)
+- Duración de cada función de servicio ejecutada en el executor de BD
+- Intentos de login por resultado y rechazos por límite de tasa
+- Duración de hashes/verificaciones de contraseña y cola del pool de hashing
+- Registros de venta con Idempotency-Key por resultado
+- Registros de log descartados por cola llena
+- Tiempo de arranque hasta /ready y hasta el primer request atendido
+- Pool de conexiones, escritor, réplicas de lectura y cachés: se leen de
+  sus contadores internos solo cuando Prometheus hace scrape, sin costo por
+  request
+
+Con varios workers de uvicorn, definir PROMETHEUS_MULTIPROC_DIR para que
+/metrics agregue los contadores de todos los procesos del pod.
+"""
+import logging
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+HASH_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5, 5.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de requests HTTP",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests HTTP en curso",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duración de funciones de servicio con acceso a BD",
+    ["function"],
+    buckets=DB_BUCKETS
+)
+
+LOGIN_ATTEMPTS = Counter(
+    "auth_login_attempts_total",
+    "Intentos de login por resultado",
+    ["result"]
+)
+RATE_LIMITED = Counter(
+    "rate_limited_requests",
+    "Requests rechazados por límite de tasa antes de tocar la BD",
+    ["endpoint", "scope"]
+)
+
+IDEMPOTENCY_REQUESTS = Counter(
+    "idempotency_requests",
+    "POST /venta/registrar con Idempotency-Key por resultado (nueva, repetida, reutilizada)",
+    ["result"]
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Duración de hashes y verificaciones de contraseña en el pool (sin la espera de turno)",
+    ["operation"],
+    buckets=HASH_BUCKETS
+)
+
+STARTUP_SECONDS = Gauge(
+    "app_startup_seconds",
+    "Segundos desde el inicio del proceso por fase (ready, first_request)",
+    ["phase"],
+    multiprocess_mode="max"
+)
+
+# Sondas y scrape no cuentan como primer request
+_RUTAS_INTERNAS = frozenset(("/health", "/ready", "/metrics"))
+_inicio_proceso = time.perf_counter()
+_primer_request_visto = False
+
+
+def set_process_start(inicio: float) -> None:
+    """Marca de tiempo (perf_counter) desde la que se mide el arranque"""
+    global _inicio_proceso
+    _inicio_proceso = inicio
+
+
+def observe_startup(phase: str) -> float:
+    segundos = time.perf_counter() - _inicio_proceso
+    STARTUP_SECONDS.labels(phase).set(segundos)
+    return segundos
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class PrometheusMiddleware:
+    """Middleware ASGI que mide cada request HTTP"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # La plantilla ("/venta/autos") evita una serie por cada URL concreta
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method,
+                route.path if route is not None else "sin_ruta",
+                str(status_code)
+            ).observe(time.perf_counter() - start)
+            if not _primer_request_visto and scope["path"] not in _RUTAS_INTERNAS:
+                _registrar_primer_request()
+
+
+def _registrar_primer_request() -> None:
+    global _primer_request_visto
+    _primer_request_visto = True
+    segundos = observe_startup("first_request")
+    logger.info(f"⏱️ Primer request atendido a los {segundos:.3f}s del arranque")
+
+
+def observe_db(function: str, seconds: float) -> None:
+    DB_QUERY_DURATION.labels(function).observe(seconds)
+
+
+def observe_password_hash(operation: str, seconds: float) -> None:
+    PASSWORD_HASH_DURATION.labels(operation).observe(seconds)
+
+
+# ============================================
+# COLECTOR DE POOL / ESCRITOR / REPOSITORIO / RÉPLICAS / LÍMITES / HASHING / CACHÉS
+# ============================================
+
+class RuntimeCollector:
+    """Publica los contadores internos del pool, el escritor, el repositorio, las réplicas, el hashing y las cachés"""
+
+    def collect(self):
+        from app.cache import cache_stats
+        from app.database import db_stats
+        from app.logging_config import dropped_records
+        from app.passwords import hashing_stats
+        from app.rate_limit import rate_limit_stats
+
+        stats = db_stats()
+        pool = stats["pool"]
+        if pool is not None:
+            conexiones = GaugeMetricFamily("db_pool_connections", "Conexiones del pool por estado", labels=["state"])
+            conexiones.add_metric(["in_use"], pool["in_use"])
+            conexiones.add_metric(["idle"], pool["idle"])
+            yield conexiones
+            yield GaugeMetricFamily("db_pool_max_size", "Tamaño máximo del pool", value=pool["max_size"])
+            yield CounterMetricFamily("db_pool_checkouts", "Checkouts del pool", value=pool["checkouts"])
+            yield CounterMetricFamily("db_pool_waits", "Checkouts que esperaron una conexión libre", value=pool["waits"])
+            yield CounterMetricFamily("db_pool_wait_seconds", "Tiempo total de espera por conexión", value=pool["wait_time_total"])
+            yield CounterMetricFamily("db_pool_timeouts", "Checkouts que agotaron el timeout", value=pool["timeouts"])
+
+        writer = stats["writer"]
+        if writer is not None:
+            yield GaugeMetricFamily("db_writer_queue_depth", "Escrituras en cola", value=writer["queued"])
+            yield CounterMetricFamily("db_writer_batches", "Transacciones confirmadas por el escritor", value=writer["batches"])
+            yield CounterMetricFamily("db_writer_operations", "Escrituras procesadas", value=writer["operations"])
+            yield CounterMetricFamily("db_writer_failures", "Escrituras fallidas", value=writer["failed"])
+
+        repositorio = stats["repositorio"]
+        if repositorio is not None:
+            conexiones = GaugeMetricFamily(
+                "db_engine_connections", "Conexiones del engine SQLAlchemy por estado", labels=["backend", "state"]
+            )
+            conexiones.add_metric([repositorio["backend"], "in_use"], repositorio["in_use"])
+            conexiones.add_metric([repositorio["backend"], "idle"], repositorio["idle"])
+            yield conexiones
+
+        replicas = stats["replicas"]
+        if replicas is not None:
+            lecturas = CounterMetricFamily("db_reads", "Lecturas por destino (primario o réplica)", labels=["target"])
+            for destino, total in replicas["lecturas"].items():
+                lecturas.add_metric([destino], total)
+            yield lecturas
+            desvios = CounterMetricFamily(
+                "db_replica_fallbacks", "Lecturas enviadas al primario por motivo", labels=["reason"]
+            )
+            for motivo, total in replicas["desvios_al_primario"].items():
+                desvios.add_metric([motivo], total)
+            yield desvios
+            lag = GaugeMetricFamily("db_replica_lag_seconds", "Lag medido de cada réplica", labels=["target"])
+            sana = GaugeMetricFamily("db_replica_healthy", "1 si la réplica recibe lecturas", labels=["target"])
+            errores = CounterMetricFamily("db_replica_errors", "Lecturas fallidas en la réplica", labels=["target"])
+            for replica in replicas["replicas"]:
+                if replica["lag"] is not None:
+                    lag.add_metric([replica["nombre"]], replica["lag"])
+                sana.add_metric([replica["nombre"]], 1 if replica["sana"] else 0)
+                errores.add_metric([replica["nombre"]], replica["errores"])
+            yield lag
+            yield sana
+            yield errores
+
+        limites = rate_limit_stats()
+        if limites is not None and "baldes" in limites:
+            yield GaugeMetricFamily("rate_limit_buckets", "Token buckets en memoria", value=limites["baldes"])
+
+        hashing = hashing_stats()
+        yield GaugeMetricFamily("password_hash_in_flight", "Hashes de contraseña en curso", value=hashing["en_curso"])
+        yield GaugeMetricFamily("password_hash_waiting", "Logins esperando turno de hashing", value=hashing["en_espera"])
+        yield CounterMetricFamily(
+            "password_hash_rejected", "Logins rechazados sin turno de hashing", value=hashing["rechazados"]
+        )
+        yield CounterMetricFamily(
+            "password_rehashes", "Hashes heredados o con otro costo reemplazados al iniciar sesión", value=hashing["rehashes"]
+        )
+
+        yield CounterMetricFamily(
+            "log_records_dropped",
+            "Registros de log descartados por cola llena",
+            value=dropped_records()
+        )
+
+        caches = cache_stats()
+        if caches:
+            hits = CounterMetricFamily("cache_hits", "Aciertos de caché", labels=["cache"])
+            misses = CounterMetricFamily("cache_misses", "Fallos de caché", labels=["cache"])
+            evictions = CounterMetricFamily("cache_evictions", "Entradas desalojadas por LRU", labels=["cache"])
+            entries = GaugeMetricFamily("cache_entries", "Entradas en caché", labels=["cache"])
+            for nombre, cache in caches.items():
+                if not cache:
+                    continue
+                hits.add_metric([nombre], cache.get("hits", 0))
+                misses.add_metric([nombre], cache.get("misses", 0))
+                evictions.add_metric([nombre], cache.get("evictions", 0))
+                entries.add_metric([nombre], cache.get("entries", 0))
+            yield hits
+            yield misses
+            yield evictions
+            yield entries
+
+
+REGISTRY.register(RuntimeCollector())
+
+
+def render_metrics() -> tuple:
+    """Devuelve (contenido, content_type) para el endpoint /metrics"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(RuntimeCollector())
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
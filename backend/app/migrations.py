@@ -0,0 +1,194 @@
+"""
+Migraciones de esquema versionadas y migraciones de datos en línea
+
+El esquema avanza por pasos numerados (`Migracion`); la tabla
+`schema_version` registra los aplicados. `aplicar_migraciones` corre los
+pendientes una vez por despliegue (python -m app.manage migrate, o al
+arrancar si DB_MIGRAR_AL_INICIAR) y al arrancar basta `version_esquema`,
+una sola consulta, para saber si la base está al día.
+
+`monto_centimos` reemplaza al texto `monto_fisco` ("S/. 85,000.00") para
+sumas, promedios y filtros por rango en SQL. En bases existentes la columna
+se agrega con ALTER TABLE (instantáneo en SQLite) y las filas antiguas se
+completan en segundo plano por lotes cortos: cada lote es una transacción
+del escritor único, así que las ventas nuevas nunca esperan más que un lote.
+"""
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+from app.utils.money import parse_monto
+
+logger = logging.getLogger(__name__)
+
+_backfill_thread: Optional[threading.Thread] = None
+_detener = threading.Event()
+
+
+# ============================================
+# MIGRACIONES DE ESQUEMA
+# ============================================
+
+class Migracion(NamedTuple):
+    """Paso del esquema; `aplicar(conn)` no hace commit"""
+    version: int
+    descripcion: str
+    aplicar: Callable[[Any], Any]
+
+
+def version_esquema(conn: sqlite3.Connection) -> int:
+    """Última versión aplicada (0 si la base es anterior a `schema_version`)"""
+    try:
+        return conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        return 0
+
+
+def aplicar_migraciones(conn: sqlite3.Connection, migraciones: Sequence[Migracion]) -> List[int]:
+    """
+    Aplica las migraciones pendientes en una sola transacción
+
+    BEGIN IMMEDIATE toma el lock de escritura antes de leer la versión: si
+    varios workers arrancan a la vez sobre la misma base, el primero migra y
+    los demás encuentran el esquema al día. Si un paso falla no queda
+    ninguno aplicado.
+
+    Returns:
+        List[int]: versiones aplicadas (vacía si el esquema ya estaba al día)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                descripcion TEXT NOT NULL,
+                aplicada_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        actual = version_esquema(conn)
+        pendientes = [m for m in migraciones if m.version > actual]
+        for migracion in pendientes:
+            migracion.aplicar(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, descripcion) VALUES (?, ?)",
+                (migracion.version, migracion.descripcion)
+            )
+            logger.info(f"✅ Migración {migracion.version} aplicada: {migracion.descripcion}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return [m.version for m in pendientes]
+
+
+# ============================================
+# MIGRACIONES DE DATOS
+# ============================================
+
+
+def ensure_monto_centimos(conn: sqlite3.Connection) -> bool:
+    """
+    Agrega `registro_venta.monto_centimos` y su índice si no existen
+
+    Returns:
+        bool: True si la columna se acaba de agregar
+    """
+    columnas = {row[1] for row in conn.execute("PRAGMA table_info(registro_venta)")}
+    agregada = "monto_centimos" not in columnas
+
+    if agregada:
+        conn.execute("ALTER TABLE registro_venta ADD COLUMN monto_centimos INTEGER")
+        logger.info("✅ Columna 'registro_venta.monto_centimos' agregada")
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_venta_monto_centimos ON registro_venta(monto_centimos)')
+    return agregada
+
+
+def backfill_monto_centimos(chunk_size: int = 1000, pausa: float = 0.05) -> int:
+    """
+    Completa `monto_centimos` a partir de `monto_fisco` en las filas antiguas
+
+    Recorre la tabla por id (keyset) en lotes de `chunk_size`; la lectura usa
+    una conexión del pool y la escritura de cada lote pasa por el escritor.
+    Entre lotes espera `pausa` segundos para dejar pasar otras escrituras.
+    Los montos que no se pueden interpretar quedan en NULL y se registran.
+
+    Returns:
+        int: filas actualizadas
+    """
+    from app.database import get_connection, get_writer
+
+    writer = get_writer()
+    ultimo_id = 0
+    actualizadas = 0
+    invalidas = 0
+
+    while not _detener.is_set():
+        with get_connection() as conn:
+            filas = conn.execute('''
+                SELECT id, monto_fisco FROM registro_venta
+                WHERE id > ? AND monto_centimos IS NULL
+                ORDER BY id
+                LIMIT ?
+            ''', (ultimo_id, chunk_size)).fetchall()
+
+        if not filas:
+            break
+        ultimo_id = filas[-1][0]
+
+        valores: List[Tuple[int, int]] = []
+        for venta_id, monto_fisco in filas:
+            try:
+                valores.append((parse_monto(monto_fisco), venta_id))
+            except ValueError:
+                invalidas += 1
+                logger.warning(f"⚠️ Monto no interpretable en venta {venta_id}: {monto_fisco!r}")
+
+        if valores:
+            actualizadas += writer.execute(_actualizar_montos, valores)
+
+        if pausa:
+            _detener.wait(pausa)
+
+    if actualizadas or invalidas:
+        logger.info(f"✅ Backfill de monto_centimos: {actualizadas} filas actualizadas, {invalidas} inválidas")
+    return actualizadas
+
+
+def _actualizar_montos(conn, valores: List[Tuple[int, int]]) -> int:
+    # Solo filas aún pendientes: no pisa montos escritos mientras corría el backfill
+    cursor = conn.executemany(
+        "UPDATE registro_venta SET monto_centimos = ? WHERE id = ? AND monto_centimos IS NULL",
+        valores
+    )
+    return cursor.rowcount
+
+
+def start_backfill_monto_centimos(chunk_size: int = 1000, pausa: float = 0.05) -> threading.Thread:
+    """Lanza el backfill en un hilo de fondo (una sola vez por proceso)"""
+    global _backfill_thread
+
+    if _backfill_thread is None or not _backfill_thread.is_alive():
+        _detener.clear()
+        _backfill_thread = threading.Thread(
+            target=_backfill_seguro,
+            args=(chunk_size, pausa),
+            name="backfill-montos",
+            daemon=True
+        )
+        _backfill_thread.start()
+    return _backfill_thread
+
+
+def _backfill_seguro(chunk_size: int, pausa: float) -> None:
+    try:
+        backfill_monto_centimos(chunk_size, pausa)
+    except Exception as e:
+        logger.error(f"❌ Error en backfill de monto_centimos: {e}")
+
+
+def stop_backfill_monto_centimos(timeout: float = 5.0) -> None:
+    """Pide al backfill que termine tras el lote en curso y lo espera"""
+    _detener.set()
+    if _backfill_thread is not None:
+        _backfill_thread.join(timeout)
@@ -0,0 +1,187 @@
+"""
+Hash y verificación de contraseñas fuera del event loop
+
+Una verificación bcrypt con 12 rondas cuesta ~250 ms de CPU: hecha en el
+event loop, cada login detendría todos los requests del worker. Aquí cada
+hash o verificación corre en un pool de procesos acotado
+(PASSWORD_HASH_WORKERS) y un semáforo limita cuántos están en curso a la
+vez (PASSWORD_HASH_MAX_CONCURRENT). Los que exceden el límite esperan turno
+hasta PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS y luego fallan con
+`HashingSaturadoError`: un pico de logins al inicio del turno se encola en
+vez de quitarle CPU al registro de ventas.
+
+Formatos aceptados:
+
+- bcrypt ("$2b$12$..."): el formato actual
+- SHA-256 hexadecimal sin sal: el que guardaban las versiones anteriores
+  (y el seed). Tras un login correcto `verificar_password` devuelve el hash
+  bcrypt que debe reemplazarlo; también si el costo bcrypt del hash no es
+  PASSWORD_BCRYPT_ROUNDS.
+
+Las funciones que corren en los procesos están en app/utils/hashing.py:
+cada proceso del pool solo importa ese módulo y bcrypt.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.utils.hashing import hashear, listo, verificar
+
+logger = logging.getLogger(__name__)
+
+
+class HashingSaturadoError(Exception):
+    """No hubo turno para hashear dentro de PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS"""
+
+
+# ============================================
+# POOL DE PROCESOS
+# ============================================
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# El semáforo pertenece a un event loop; se recrea si cambia el loop
+_semaforo: Optional[asyncio.Semaphore] = None
+_semaforo_loop = None
+
+_stats = {"en_curso": 0, "en_espera": 0, "rechazados": 0, "rehashes": 0}
+
+# Hash contra el que se verifica cuando el usuario no existe, para que la
+# respuesta tarde lo mismo que con un usuario real
+_hash_ficticio: Optional[str] = None
+
+
+def get_executor() -> Optional[ProcessPoolExecutor]:
+    """Pool de procesos de hashing (None con PASSWORD_HASH_WORKERS = 0)"""
+    global _executor
+
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: el proceso ya tiene hilos (escritor, log, pool de BD)
+                # y fork copiaría sus locks en cualquier estado. spawn vuelve
+                # a importar el módulo __main__ en cada proceso: un script que
+                # use la aplicación necesita `if __name__ == "__main__":`
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"🔐 Pool de hashing creado ({settings.PASSWORD_HASH_WORKERS} procesos)")
+    return _executor
+
+
+def iniciar_hashing() -> None:
+    """Arranca los procesos del pool sin esperarlos (el primer login no paga el spawn)"""
+    executor = get_executor()
+    if executor is not None:
+        for _ in range(settings.PASSWORD_HASH_WORKERS):
+            executor.submit(listo)
+
+
+def shutdown_hashing() -> None:
+    """Detiene el pool de procesos al cerrar la aplicación"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+            logger.info("🔐 Pool de hashing detenido")
+
+
+def _get_semaforo() -> asyncio.Semaphore:
+    global _semaforo, _semaforo_loop
+
+    loop = asyncio.get_running_loop()
+    if _semaforo is None or _semaforo_loop is not loop:
+        _semaforo = asyncio.Semaphore(max(1, settings.PASSWORD_HASH_MAX_CONCURRENT))
+        _semaforo_loop = loop
+    return _semaforo
+
+
+async def _ejecutar(operacion: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """Corre `fn` en el pool cuando hay turno en el semáforo"""
+    global _executor
+
+    semaforo = _get_semaforo()
+    _stats["en_espera"] += 1
+    try:
+        await asyncio.wait_for(semaforo.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        _stats["rechazados"] += 1
+        raise HashingSaturadoError(
+            f"Sin turno de hashing en {settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS}s"
+        ) from None
+    finally:
+        _stats["en_espera"] -= 1
+
+    _stats["en_curso"] += 1
+    inicio = time.perf_counter()
+    try:
+        executor = get_executor()
+        if executor is None:
+            # bcrypt libera el GIL: en un hilo tampoco bloquea el event loop
+            return await asyncio.to_thread(fn, *args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Un proceso murió (p. ej. OOM): el siguiente uso crea otro pool
+            logger.error("❌ Pool de hashing roto, se recreará en el próximo uso")
+            with _executor_lock:
+                if _executor is executor:
+                    _executor = None
+            raise
+    finally:
+        # app.metrics importa este módulo en su colector: se importa aquí
+        from app.metrics import observe_password_hash
+
+        _stats["en_curso"] -= 1
+        semaforo.release()
+        observe_password_hash(operacion, time.perf_counter() - inicio)
+
+
+async def verificar_password(password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica una contraseña fuera del event loop
+
+    Con `hashed` None (usuario inexistente) verifica contra un hash ficticio
+    y devuelve (False, None), con el mismo costo que un usuario real.
+
+    Returns:
+        (correcta, nuevo_hash): ver app.utils.hashing.verificar
+    """
+    global _hash_ficticio
+
+    if hashed is None:
+        if _hash_ficticio is None:
+            _hash_ficticio = await hashear_password(os.urandom(16).hex())
+        await _ejecutar("verify", verificar, password, _hash_ficticio, settings.PASSWORD_BCRYPT_ROUNDS)
+        return False, None
+
+    correcta, nuevo_hash = await _ejecutar("verify", verificar, password, hashed, settings.PASSWORD_BCRYPT_ROUNDS)
+    if nuevo_hash is not None:
+        _stats["rehashes"] += 1
+    return correcta, nuevo_hash
+
+
+async def hashear_password(password: str) -> str:
+    """Hash bcrypt fuera del event loop"""
+    return await _ejecutar("hash", hashear, password, settings.PASSWORD_BCRYPT_ROUNDS)
+
+
+def hashing_stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "procesos": settings.PASSWORD_HASH_WORKERS,
+        "max_concurrentes": settings.PASSWORD_HASH_MAX_CONCURRENT,
+    }
@@ -0,0 +1,292 @@
+"""
+Límite de tasa con token buckets
+
+Cada clave ("ip:10.0.0.7", "usuario:cmendoza") tiene un balde de
+`capacidad` fichas que se recarga a `recarga` fichas por segundo; cada
+intento consume una ficha y sin fichas el intento se rechaza con el tiempo
+de espera hasta la siguiente. La capacidad permite ráfagas cortas y la
+recarga fija el ritmo sostenido.
+
+Igual que las cachés (app/cache.py) hay una interfaz, `RateLimitBackend`, y
+una implementación en memoria por proceso. Con varias réplicas se registra
+un backend compartido con `set_rate_limiter()`, o se define
+RATE_LIMIT_REDIS_URL para usar `RedisRateLimiter` (el paquete `redis` solo
+se importa en ese caso).
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend:
+    """Interfaz mínima que deben implementar los backends de límite de tasa"""
+
+    # True si `consumir` hace E/S (red): la ruta lo llama desde un hilo
+    bloqueante = False
+
+    def consumir(self, clave: str, capacidad: float, recarga: float, costo: float = 1.0) -> float:
+        """
+        Consume `costo` fichas del balde de `clave`
+
+        Returns:
+            float: 0 si el intento se permite; si no, segundos hasta que haya
+            fichas suficientes (el intento rechazado no consume)
+        """
+        raise NotImplementedError
+
+    def reiniciar(self, clave: str) -> None:
+        """Devuelve el balde de `clave` a su capacidad completa"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class TokenBucketLimiter(RateLimitBackend):
+    """
+    Token buckets en memoria, thread-safe
+
+    Los baldes viven en un OrderedDict ordenado por último uso. Un balde que
+    volvería a estar lleno equivale a no tenerlo, así que cada
+    `intervalo_barrido` segundos se eliminan desde el más antiguo hasta el
+    primero que aún no se llenó; el costo del barrido es proporcional a lo
+    que se elimina. `max_entries` acota la memoria ante un barrido de IPs
+    distintas: al superarlo se desaloja el balde usado hace más tiempo.
+
+    Args:
+        max_entries: Máximo de baldes en memoria
+        intervalo_barrido: Segundos entre barridos de baldes llenos
+    """
+
+    def __init__(self, max_entries: int = 100000, intervalo_barrido: float = 10.0):
+        self.max_entries = max_entries
+        self.intervalo_barrido = intervalo_barrido
+        # clave -> [fichas, actualizado_en, lleno_en]
+        self._baldes: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._proximo_barrido = time.monotonic() + intervalo_barrido
+
+        self.permitidos = 0
+        self.rechazados = 0
+        self.barridos = 0
+        self.evictions = 0
+
+    def consumir(self, clave: str, capacidad: float, recarga: float, costo: float = 1.0) -> float:
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora >= self._proximo_barrido:
+                self._barrer(ahora)
+
+            balde = self._baldes.get(clave)
+            if balde is None:
+                fichas = capacidad
+            else:
+                fichas = min(capacidad, balde[0] + (ahora - balde[1]) * recarga)
+                self._baldes.move_to_end(clave)
+
+            if fichas < costo:
+                self.rechazados += 1
+                return (costo - fichas) / recarga
+
+            fichas -= costo
+            lleno_en = ahora + (capacidad - fichas) / recarga
+            if balde is None:
+                self._baldes[clave] = [fichas, ahora, lleno_en]
+                while len(self._baldes) > self.max_entries:
+                    self._baldes.popitem(last=False)
+                    self.evictions += 1
+            else:
+                balde[0], balde[1], balde[2] = fichas, ahora, lleno_en
+            self.permitidos += 1
+            return 0.0
+
+    def _barrer(self, ahora: float) -> None:
+        while self._baldes:
+            clave, balde = next(iter(self._baldes.items()))
+            if balde[2] > ahora:
+                break
+            del self._baldes[clave]
+            self.barridos += 1
+        self._proximo_barrido = ahora + self.intervalo_barrido
+
+    def reiniciar(self, clave: str) -> None:
+        with self._lock:
+            self._baldes.pop(clave, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memoria",
+                "baldes": len(self._baldes),
+                "max_entries": self.max_entries,
+                "permitidos": self.permitidos,
+                "rechazados": self.rechazados,
+                "barridos": self.barridos,
+                "evictions": self.evictions,
+            }
+
+
+# Recarga y consumo atómicos en el servidor; TIME evita depender del reloj
+# de cada réplica. La clave expira cuando el balde volvería a estar lleno.
+_SCRIPT_REDIS = """
+local capacidad = tonumber(ARGV[1])
+local recarga = tonumber(ARGV[2])
+local costo = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local ahora = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local balde = redis.call('HMGET', KEYS[1], 'f', 't')
+local fichas = tonumber(balde[1]) or capacidad
+local antes = tonumber(balde[2]) or ahora
+fichas = math.min(capacidad, fichas + (ahora - antes) * recarga)
+local espera = 0
+if fichas >= costo then
+    fichas = fichas - costo
+else
+    espera = (costo - fichas) / recarga
+end
+redis.call('HSET', KEYS[1], 'f', fichas, 't', ahora)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacidad - fichas) / recarga * 1000) + 1000)
+return tostring(espera)
+"""
+
+
+class RedisRateLimiter(RateLimitBackend):
+    """
+    Token buckets compartidos entre réplicas en Redis
+
+    Si Redis no responde el intento se permite (y se registra): el límite
+    protege capacidad, no debe dejar a todos sin poder iniciar sesión.
+
+    Args:
+        url: URL de Redis (redis://host:6379/0)
+        prefijo: Prefijo de las claves en Redis
+    """
+
+    bloqueante = True
+
+    def __init__(self, url: str, prefijo: str = "automotriz:limite:"):
+        import redis
+
+        self.prefijo = prefijo
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._cliente.register_script(_SCRIPT_REDIS)
+        self._lock = threading.Lock()
+        self.permitidos = 0
+        self.rechazados = 0
+        self.errores = 0
+
+    def consumir(self, clave: str, capacidad: float, recarga: float, costo: float = 1.0) -> float:
+        try:
+            espera = float(self._script(keys=[self.prefijo + clave], args=[capacidad, recarga, costo]))
+        except Exception as e:
+            with self._lock:
+                self.errores += 1
+            logger.warning(f"⚠️ Límite de tasa no disponible (Redis): {e}")
+            return 0.0
+        with self._lock:
+            if espera > 0:
+                self.rechazados += 1
+            else:
+                self.permitidos += 1
+        return espera
+
+    def reiniciar(self, clave: str) -> None:
+        try:
+            self._cliente.delete(self.prefijo + clave)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo reiniciar el límite de {clave} (Redis): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "redis",
+                "permitidos": self.permitidos,
+                "rechazados": self.rechazados,
+                "errores": self.errores,
+            }
+
+
+# ============================================
+# REGISTRO DEL BACKEND
+# ============================================
+
+_limiter: Optional[RateLimitBackend] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimitBackend:
+    """
+    Devuelve el backend registrado
+
+    Si no se registró ninguno, usa Redis cuando RATE_LIMIT_REDIS_URL está
+    definido y, si no, token buckets en memoria.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if settings.RATE_LIMIT_REDIS_URL:
+                    _limiter = RedisRateLimiter(settings.RATE_LIMIT_REDIS_URL)
+                else:
+                    _limiter = TokenBucketLimiter(max_entries=settings.RATE_LIMIT_MAX_KEYS)
+    return _limiter
+
+
+def set_rate_limiter(backend: RateLimitBackend) -> None:
+    """Registra un backend (p. ej. uno compartido entre réplicas)"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = backend
+
+
+def rate_limit_stats() -> Optional[Dict[str, Any]]:
+    """Métricas del backend (None si todavía no se usó)"""
+    limiter = _limiter
+    return limiter.stats() if limiter is not None else None
+
+
+# ============================================
+# POLÍTICA DE /auth/login
+# ============================================
+
+def _clave_usuario(username: str) -> str:
+    # El formulario no limita el largo: se acota para no guardar claves enormes
+    return "usuario:" + username.strip().lower()[:150]
+
+
+def limitar_login(ip: Optional[str], username: str) -> Optional[Dict[str, Any]]:
+    """
+    Aplica los límites de intentos de login por IP y por usuario
+
+    Se consulta antes de tocar la base de datos. Primero la IP (frena el
+    credential stuffing desde un origen) y luego el usuario (frena la
+    fuerza bruta distribuida contra una cuenta); si la IP ya está agotada no
+    se consume del usuario.
+
+    Returns:
+        Optional[dict]: None si el intento se permite; si no,
+        {"alcance": "ip" | "usuario", "retry_after": segundos}
+    """
+    limiter = get_rate_limiter()
+    baldes = (
+        ("ip", "ip:" + (ip or "desconocida"),
+         settings.LOGIN_RATE_LIMIT_IP_BURST, settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE),
+        ("usuario", _clave_usuario(username),
+         settings.LOGIN_RATE_LIMIT_USER_BURST, settings.LOGIN_RATE_LIMIT_USER_PER_MINUTE),
+    )
+    for alcance, clave, capacidad, por_minuto in baldes:
+        espera = limiter.consumir(clave, capacidad, por_minuto / 60.0)
+        if espera > 0:
+            return {"alcance": alcance, "retry_after": espera}
+    return None
+
+
+def login_exitoso(username: str) -> None:
+    """Tras un login correcto el usuario recupera todos sus intentos"""
+    get_rate_limiter().reiniciar(_clave_usuario(username))
@@ -0,0 +1,237 @@
+"""
+Réplicas de lectura
+
+Con DB_READ_REPLICAS configurado, las lecturas de catálogo, historial,
+perfiles y reportes se reparten por turnos entre las réplicas y las
+escrituras siguen yendo al primario.
+
+- Lag: en cada verificación (DB_REPLICA_CHECK_INTERVAL) el primario escribe
+  su hora en la tabla `replica_heartbeat` y se lee el último latido que ya
+  llegó a cada réplica; el lag es la diferencia. Una réplica con más de
+  DB_REPLICA_MAX_LAG_SECONDS de retraso, o que falla al leer, deja de
+  recibir lecturas hasta la siguiente verificación que la encuentre al día.
+- Leer lo propio: cada escritura anota su hora bajo una o más claves (p. ej.
+  ("vendedor", 7)). Una lectura con esas claves solo va a una réplica cuyo
+  último latido es posterior a la escritura; si ninguna lo es, va al
+  primario. Las escrituras anotadas son del proceso: en otro pod la misma
+  lectura solo está acotada por el lag máximo.
+
+Sin réplicas sanas todas las lecturas van al primario.
+"""
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, ContextManager, Dict, Hashable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIMARIO = "primario"
+
+# Claves de escritura recordadas como máximo (las más antiguas se descartan)
+_MAX_ESCRITURAS = 10000
+
+
+class Replica:
+    """
+    Destino de lectura con su estado de salud
+
+    Args:
+        nombre: Etiqueta para logs y métricas (no incluye credenciales)
+        abrir: Función sin argumentos que devuelve un context manager con el
+            destino de la lectura (conexión SQLite o repositorio)
+        leer_latido: Función que devuelve el último latido replicado (o None)
+        sincronizar: Copia el primario a la réplica antes de medir (solo la
+            réplica SQLite local); None si la replicación es externa
+        cerrar: Libera las conexiones de la réplica
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        abrir: Callable[[], ContextManager[Any]],
+        leer_latido: Callable[[], Optional[float]],
+        sincronizar: Optional[Callable[[], None]] = None,
+        cerrar: Optional[Callable[[], None]] = None
+    ):
+        self.nombre = nombre
+        self.abrir = abrir
+        self.leer_latido = leer_latido
+        self.sincronizar = sincronizar
+        self.cerrar = cerrar
+
+        self.sana = False
+        self.latido: Optional[float] = None
+        self.lag: Optional[float] = None
+        self.ultimo_error: Optional[str] = None
+
+
+class RouterReplicas:
+    """
+    Elige el destino de cada lectura y mide el lag de las réplicas
+
+    Args:
+        replicas: Réplicas de lectura
+        latir: Escribe el latido en el primario y devuelve la hora escrita
+        max_lag: Segundos de retraso tolerados antes de sacar una réplica
+        intervalo: Segundos entre verificaciones del hilo monitor
+    """
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        latir: Callable[[], float],
+        max_lag: float = 5.0,
+        intervalo: float = 1.0
+    ):
+        self.replicas = replicas
+        self.latir = latir
+        self.max_lag = max_lag
+        self.intervalo = intervalo
+        # Pasado este tiempo cualquier réplica elegible ya tiene la escritura
+        self.retencion = 2 * (max_lag + intervalo)
+
+        self._lock = threading.Lock()
+        self._turno = 0
+        self._escrituras: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._ultimo_latido: Optional[float] = None
+
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+        # Métricas
+        self._lecturas: Counter = Counter()
+        self._errores: Counter = Counter()
+        self._desvios: Counter = Counter()
+
+    # ============================================
+    # RUTEO
+    # ============================================
+
+    def elegir(self, claves: Iterable[Hashable] = ()) -> Optional[Replica]:
+        """Réplica para una lectura, o None si debe ir al primario"""
+        with self._lock:
+            sanas = [r for r in self.replicas if r.sana]
+            if not sanas:
+                self._desvios["sin_replica"] += 1
+                return None
+
+            escritura = max((self._escrituras.get(c, 0.0) for c in claves), default=0.0)
+            if escritura:
+                sanas = [r for r in sanas if r.latido is not None and r.latido >= escritura]
+                if not sanas:
+                    self._desvios["escritura_reciente"] += 1
+                    return None
+
+            self._turno = (self._turno + 1) % len(sanas)
+            return sanas[self._turno]
+
+    def anotar_escritura(self, *claves: Hashable) -> None:
+        """Registra que se acaba de confirmar una escritura que afecta a `claves`"""
+        ahora = time.time()
+        with self._lock:
+            for clave in claves:
+                self._escrituras[clave] = ahora
+                self._escrituras.move_to_end(clave)
+            while len(self._escrituras) > _MAX_ESCRITURAS:
+                self._escrituras.popitem(last=False)
+
+    def contar_lectura(self, destino: str) -> None:
+        with self._lock:
+            self._lecturas[destino] += 1
+
+    def marcar_fallo(self, replica: Replica, error: Exception) -> None:
+        """Saca la réplica de la rotación hasta la próxima verificación"""
+        with self._lock:
+            replica.sana = False
+            replica.ultimo_error = str(error)
+            self._errores[replica.nombre] += 1
+            self._desvios["error"] += 1
+        logger.warning(f"⚠️ Réplica '{replica.nombre}' falló, lecturas al primario: {error}")
+
+    # ============================================
+    # MONITOR DE LAG
+    # ============================================
+
+    def verificar(self) -> None:
+        """Escribe el latido en el primario y mide el lag de cada réplica"""
+        try:
+            self._ultimo_latido = self.latir()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo escribir el latido en el primario: {e}")
+
+        for replica in self.replicas:
+            try:
+                if replica.sincronizar is not None:
+                    replica.sincronizar()
+                latido = replica.leer_latido()
+            except Exception as e:
+                latido, error = None, str(e)
+            else:
+                error = None if latido is not None else "sin latido replicado"
+            self._actualizar(replica, latido, error)
+
+    def _actualizar(self, replica: Replica, latido: Optional[float], error: Optional[str]) -> None:
+        with self._lock:
+            estaba_sana = replica.sana
+            replica.latido = latido
+            if latido is None or self._ultimo_latido is None:
+                replica.lag = None
+            else:
+                replica.lag = max(0.0, self._ultimo_latido - latido)
+            replica.ultimo_error = error
+            replica.sana = replica.lag is not None and replica.lag <= self.max_lag
+
+            # Escrituras que ya pasó el tiempo de retención
+            limite = time.time() - self.retencion
+            while self._escrituras and next(iter(self._escrituras.values())) < limite:
+                self._escrituras.popitem(last=False)
+
+        if replica.sana and not estaba_sana:
+            logger.info(f"✅ Réplica '{replica.nombre}' en rotación (lag {replica.lag:.2f}s)")
+        elif estaba_sana and not replica.sana:
+            motivo = f"lag {replica.lag:.2f}s" if replica.lag is not None else error
+            logger.warning(f"⚠️ Réplica '{replica.nombre}' fuera de rotación: {motivo}")
+
+    def iniciar(self) -> None:
+        """Primera verificación síncrona y luego el hilo monitor"""
+        self.verificar()
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._monitor, name="monitor-replicas", daemon=True)
+            self._hilo.start()
+
+    def _monitor(self) -> None:
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:
+                logger.error(f"❌ Error en el monitor de réplicas: {e}")
+
+    def close(self) -> None:
+        """Detiene el monitor y cierra las réplicas"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(self.intervalo + 5)
+        for replica in self.replicas:
+            if replica.cerrar is not None:
+                replica.cerrar()
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado de cada réplica y lecturas por destino"""
+        with self._lock:
+            return {
+                "max_lag": self.max_lag,
+                "replicas": [
+                    {
+                        "nombre": r.nombre,
+                        "sana": r.sana,
+                        "lag": r.lag,
+                        "errores": self._errores[r.nombre],
+                        "ultimo_error": r.ultimo_error,
+                    }
+                    for r in self.replicas
+                ],
+                "lecturas": dict(self._lecturas),
+                "desvios_al_primario": dict(self._desvios),
+            }
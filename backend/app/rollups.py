@@ -0,0 +1,133 @@
+"""
+Agregados precalculados de ventas (rollups)
+
+`ventas_diarias` guarda una fila por día × sucursal × vendedor × auto × tipo
+de compra con el número de ventas y el monto total en céntimos. Se mantiene
+con triggers sobre `registro_venta`, así que cada venta actualiza su rollup
+en la misma transacción que la inserta (incluido el backfill de
+monto_centimos). Los reportes del dashboard leen O(días) filas en lugar de
+recorrer todas las ventas.
+
+`rebuild_rollups` recalcula la tabla desde cero (python -m app.manage
+rebuild-rollups).
+"""
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+_DIMENSIONES = "dia, sucursal_provincia, sucursal_distrito, vendedor_id, auto_id, tipo_compra"
+
+
+def _sumar(fila: str, signo: str) -> str:
+    """SQL que suma (o resta) la venta `fila` (new/old) a su rollup"""
+    return f'''
+            INSERT INTO ventas_diarias ({_DIMENSIONES}, num_ventas, monto_centimos_total)
+            VALUES (
+                date({fila}.fecha_venta), {fila}.sucursal_provincia, {fila}.sucursal_distrito,
+                {fila}.vendedor_id, {fila}.auto_id, {fila}.tipo_compra,
+                {signo}1, {signo}COALESCE({fila}.monto_centimos, 0)
+            )
+            ON CONFLICT({_DIMENSIONES}) DO UPDATE SET
+                num_ventas = num_ventas + excluded.num_ventas,
+                monto_centimos_total = monto_centimos_total + excluded.monto_centimos_total;
+    '''
+
+
+def _limpiar(fila: str) -> str:
+    """SQL que borra el rollup de la venta `fila` si quedó sin ventas"""
+    return f'''
+            DELETE FROM ventas_diarias
+            WHERE dia = date({fila}.fecha_venta)
+            AND sucursal_provincia = {fila}.sucursal_provincia
+            AND sucursal_distrito = {fila}.sucursal_distrito
+            AND vendedor_id = {fila}.vendedor_id
+            AND auto_id = {fila}.auto_id
+            AND tipo_compra = {fila}.tipo_compra
+            AND num_ventas = 0;
+    '''
+
+
+def init_rollups(conn: sqlite3.Connection) -> None:
+    """Crea la tabla de rollups y sus triggers (idempotente)"""
+    existia = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ventas_diarias'"
+    ).fetchone() is not None
+
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS ventas_diarias (
+            dia TEXT NOT NULL,
+            sucursal_provincia TEXT NOT NULL,
+            sucursal_distrito TEXT NOT NULL,
+            vendedor_id INTEGER NOT NULL,
+            auto_id INTEGER NOT NULL,
+            tipo_compra TEXT NOT NULL,
+            num_ventas INTEGER NOT NULL DEFAULT 0,
+            monto_centimos_total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY ({_DIMENSIONES})
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_rollup_sucursal_dia ON ventas_diarias(sucursal_provincia, sucursal_distrito, dia)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_rollup_vendedor_dia ON ventas_diarias(vendedor_id, dia)')
+
+    # Los triggers se recrean siempre para que coincidan con esta versión
+    drop_rollup_triggers(conn)
+    conn.execute(f'''
+        CREATE TRIGGER ventas_diarias_ai AFTER INSERT ON registro_venta BEGIN
+            {_sumar("new", "")}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER ventas_diarias_ad AFTER DELETE ON registro_venta BEGIN
+            {_sumar("old", "-")}
+            {_limpiar("old")}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER ventas_diarias_au AFTER UPDATE OF
+            fecha_venta, sucursal_provincia, sucursal_distrito, vendedor_id, auto_id, tipo_compra, monto_centimos
+        ON registro_venta BEGIN
+            {_sumar("old", "-")}
+            {_sumar("new", "")}
+            {_limpiar("old")}
+        END
+    ''')
+
+    if not existia:
+        # Ventas registradas antes de existir la tabla de rollups
+        rebuild_rollups(conn)
+        logger.info("✅ Tabla de agregados 'ventas_diarias' creada")
+
+
+def drop_rollup_triggers(conn: sqlite3.Connection) -> None:
+    """
+    Quita los triggers de rollups para cargas masivas
+
+    Después de la carga hay que llamar a `rebuild_rollups` e `init_rollups`
+    para recalcular la tabla y volver a crear los triggers.
+    """
+    for trigger in ("ventas_diarias_ai", "ventas_diarias_ad", "ventas_diarias_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def rebuild_rollups(conn: sqlite3.Connection) -> int:
+    """
+    Recalcula `ventas_diarias` desde `registro_venta`
+
+    No hace commit: se ejecuta dentro de la transacción del llamador (por
+    ejemplo, como operación del escritor único).
+
+    Returns:
+        int: filas de rollup generadas
+    """
+    conn.execute("DELETE FROM ventas_diarias")
+    cursor = conn.execute(f'''
+        INSERT INTO ventas_diarias ({_DIMENSIONES}, num_ventas, monto_centimos_total)
+        SELECT
+            date(fecha_venta), sucursal_provincia, sucursal_distrito,
+            vendedor_id, auto_id, tipo_compra,
+            COUNT(*), COALESCE(SUM(monto_centimos), 0)
+        FROM registro_venta
+        GROUP BY 1, 2, 3, 4, 5, 6
+    ''')
+    return cursor.rowcount
@@ -0,0 +1,64 @@
+import logging
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Optional
+from app.services.analytics_service import get_resumen_ventas
+from app.utils.money import format_monto
+from app.utils.security import get_current_user
+from app.db_executor import run_db
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get("/ventas")
+async def resumen_ventas(
+    agrupar_por: str = Query(
+        "provincia",
+        description="Dimensiones separadas por coma: dia, mes, provincia, distrito, vendedor, auto, tipo_compra"
+    ),
+    desde: Optional[date] = Query(None, description="Fecha inicial (inclusive)"),
+    hasta: Optional[date] = Query(None, description="Fecha final (inclusive)"),
+    provincia: Optional[str] = Query(None),
+    distrito: Optional[str] = Query(None),
+    vendedor_id: Optional[int] = Query(None),
+    tipo_compra: Optional[str] = Query(None, pattern="^(Cash|Crédito)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Totales de ventas para el dashboard de sucursales
+
+    Ejemplo: /analytics/ventas?agrupar_por=distrito,mes&desde=2025-01-01
+    """
+    dimensiones = [d.strip() for d in agrupar_por.split(",") if d.strip()]
+    logger.info(f"Resumen de ventas - Usuario: {current_user['username']}, Agrupación: {dimensiones}")
+
+    try:
+        filas = await run_db(
+            get_resumen_ventas,
+            dimensiones,
+            desde=desde,
+            hasta=hasta,
+            provincia=provincia,
+            distrito=distrito,
+            vendedor_id=vendedor_id,
+            tipo_compra=tipo_compra
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    num_ventas = sum(f["num_ventas"] for f in filas)
+    monto_total = sum(f["monto_centimos_total"] for f in filas)
+    for fila in filas:
+        fila["monto_total"] = format_monto(fila["monto_centimos_total"])
+
+    return {
+        "agrupar_por": dimensiones,
+        "num_ventas": num_ventas,
+        "monto_total": format_monto(monto_total),
+        "monto_centimos_total": monto_total,
+        "filas": filas
+    }
@@ -1,24 +1,46 @@
+import asyncio
 import logging
+import math
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.schemas.token import Token
-from app.services.auth_service import authenticate_user, get_user
-from app.utils.security import create_access_token, get_current_user
+from app.schemas.token import LoginResponse, LogoutResponse
+from app.schemas.user import VendedorPerfil
+from app.services.auth_service import authenticate_user, etag_perfil
+from app.utils.security import create_access_token, get_current_user, revoke_access_token
 from app.config import settings
+from app.db_executor import run_db
+from app.http_cache import cabeceras_cache, coincide, no_modificado
+from app.metrics import LOGIN_ATTEMPTS, RATE_LIMITED
+from app.passwords import HashingSaturadoError
+from app.rate_limit import get_rate_limiter, limitar_login, login_exitoso
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["Autenticación"])
 
 
-@router.post("/login", response_model=dict)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+@router.post("/login", response_model=LoginResponse)
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """Endpoint de login para autenticar usuarios"""
     logger.info(f"Intento de login para usuario: {form_data.username}")
     
-    user = authenticate_user(form_data.username, form_data.password)
+    if settings.LOGIN_RATE_LIMIT_ENABLED:
+        await _verificar_limite_login(request, form_data.username)
+    
+    try:
+        user = await authenticate_user(form_data.username, form_data.password)
+    except HashingSaturadoError:
+        # Pico de logins: el cliente reintenta en vez de quitarle CPU a las ventas
+        LOGIN_ATTEMPTS.labels("saturated").inc()
+        logger.warning(f"⚠️ Login sin turno de hashing: usuario={form_data.username}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio de autenticación ocupado, intente nuevamente",
+            headers={"Retry-After": "1"},
+        )
     
     if not user:
+        LOGIN_ATTEMPTS.labels("failure").inc()
         logger.warning(f"Login fallido para usuario: {form_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,9 +48,14 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    LOGIN_ATTEMPTS.labels("success").inc()
+    if settings.LOGIN_RATE_LIMIT_ENABLED:
+        await _sin_bloquear(login_exitoso, form_data.username)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["username"]},
+        # Solo la identidad: nombre, sucursal y estado se leen del perfil
+        # cacheado en cada request (ver get_current_user)
+        data={"sub": user["username"], "uid": user["id"]},
         expires_delta=access_token_expires
     )
     
@@ -49,35 +76,65 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     }
 
 
-@router.get("/me", response_model=dict)
-async def get_current_user_info(current_user: dict = Depends(get_current_user)):
-    """Obtiene la información del usuario autenticado actualmente"""
-    username = current_user["username"]
-    logger.info(f"Solicitud de información de usuario: {username}")
+async def _sin_bloquear(fn, *args):
+    # El backend en memoria responde en microsegundos; uno de red va a un hilo
+    if get_rate_limiter().bloqueante:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+async def _verificar_limite_login(request: Request, username: str) -> None:
+    """Responde 429 con Retry-After si la IP o el usuario agotaron sus intentos"""
+    ip = request.client.host if request.client else None
+    rechazo = await _sin_bloquear(limitar_login, ip, username)
+    if rechazo is None:
+        return
     
-    user = get_user(username)
+    RATE_LIMITED.labels("login", rechazo["alcance"]).inc()
+    LOGIN_ATTEMPTS.labels("throttled").inc()
+    logger.warning(f"⚠️ Login limitado por {rechazo['alcance']}: usuario={username} ip={ip}")
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Demasiados intentos de inicio de sesión, intente más tarde",
+        headers={"Retry-After": str(max(1, math.ceil(rechazo["retry_after"])))},
+    )
+
+
+@router.get("/me", response_model=VendedorPerfil)
+async def get_current_user_info(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Obtiene la información del usuario autenticado actualmente
+
+    El perfil ya lo cargó `get_current_user` (de la caché de perfiles);
+    responde 304 si no cambió desde el ETag que envía el cliente.
+    """
+    # no-cache: el navegador revalida siempre, y el 304 no toca la base
+    cabeceras = cabeceras_cache(etag_perfil(current_user["id"]), "private, no-cache")
+    if coincide(request, cabeceras["ETag"]):
+        return no_modificado(cabeceras)
     
-    if not user:
-        logger.error(f"Usuario no encontrado: {username}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuario no encontrado"
-        )
+    logger.info(f"Solicitud de información de usuario: {current_user['username']}")
     
+    response.headers.update(cabeceras)
     return {
-        "username": user["username"],
-        "full_name": user["full_name"],
-        "email": user["email"],
-        "role": user.get("role", "user"),
-        "codigo_vendedor": user.get("codigo_vendedor", ""),
-        "sucursal_provincia": user.get("sucursal_provincia", ""),
-        "sucursal_distrito": user.get("sucursal_distrito", "")
+        "username": current_user["username"],
+        "full_name": current_user["full_name"],
+        "email": current_user["email"],
+        "role": current_user.get("role", "user"),
+        "codigo_vendedor": current_user.get("codigo_vendedor", ""),
+        "sucursal_provincia": current_user.get("sucursal_provincia", ""),
+        "sucursal_distrito": current_user.get("sucursal_distrito", "")
     }
 
 
-@router.post("/logout")
+@router.post("/logout", response_model=LogoutResponse)
 async def logout(current_user: dict = Depends(get_current_user)):
-    """Endpoint de logout"""
+    """Endpoint de logout: revoca el token hasta su expiración"""
+    await run_db(revoke_access_token, current_user["token"])
     logger.info(f"Logout exitoso para usuario: {current_user['username']}")
     return {
         "message": f"Usuario {current_user['username']} ha cerrado sesión exitosamente"
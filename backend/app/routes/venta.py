@@ -1,14 +1,34 @@
+import csv
+import io
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Optional
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from fastapi import APIRouter, Body, Depends, File, Header, HTTPException, status, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from app.services.venta_service import (
+    AutoNoDisponibleError,
+    StockAgotadoError,
+    ahora_venta,
+    etag_catalogo,
     get_autos_disponibles,
     registrar_venta,
-    get_ventas_by_vendedor
+    registrar_venta_idempotente,
+    registrar_ventas_lote,
+    get_ventas_by_vendedor,
+    listar_ventas
 )
-from app.services.auth_service import get_user
+from app.config import settings
 from app.utils.security import get_current_user
+from app.db_executor import run_db
+from app.http_cache import cabeceras_cache, coincide, no_modificado
+from app.errors import IdempotencyKeyReutilizadaError
+from app.idempotency import ClaveIdempotencia, ejecutar_idempotente, huella
+from app.metrics import IDEMPOTENCY_REQUESTS
+from app.schemas.venta import AutosResponse, LoteResponse, MisVentasResponse, VentaRegistrada
+from app.utils.money import format_monto, parse_monto
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.respuestas import linea_ndjson, respuesta_filas
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/venta", tags=["Ventas"])
@@ -22,47 +42,137 @@ class VentaCreate(BaseModel):
     nombre_comprador: str = Field(..., min_length=3, description="Nombre del comprador")
     dni_comprador: str = Field(..., min_length=8, max_length=8, description="DNI del comprador")
     contacto_comprador: str = Field(..., min_length=6, description="Contacto del comprador")
+    
+    @field_validator("monto_fisco")
+    @classmethod
+    def validar_monto(cls, value: str) -> str:
+        parse_monto(value)
+        return value
+    
+    @property
+    def monto_centimos(self) -> int:
+        return parse_monto(self.monto_fisco)
+
+
+class VentaLoteItem(VentaCreate):
+    """Fila de un lote: además puede traer la fecha real de la venta"""
+    fecha_venta: Optional[datetime] = Field(None, description="Fecha de la venta, UTC si no trae zona (por defecto, ahora)")
+    
+    @field_validator("fecha_venta")
+    @classmethod
+    def validar_fecha(cls, value: Optional[datetime]) -> Optional[datetime]:
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            # Se guarda en UTC sin zona, como las ventas individuales
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        value = value.replace(microsecond=0)
+        if value > ahora_venta():
+            raise ValueError("La fecha de venta no puede ser futura")
+        return value
+
 
+def formatear_venta(venta: dict) -> dict:
+    """Formatea el monto para la respuesta a partir de los céntimos"""
+    centimos = venta.get("monto_centimos")
+    if centimos is not None:
+        venta["monto_fisco"] = format_monto(centimos)
+    return venta
 
-@router.get("/autos")
+
+@router.get("/autos", response_model=AutosResponse)
 async def listar_autos(
+    request: Request,
     search: Optional[str] = Query(None, description="Término de búsqueda"),
     current_user: dict = Depends(get_current_user)
 ):
-    """Lista autos disponibles con búsqueda opcional"""
+    """
+    Lista autos disponibles con búsqueda opcional
+
+    Con If-None-Match igual a la versión actual del catálogo responde 304
+    sin consultar la base.
+    """
+    # El ETag se toma antes de leer: si el catálogo cambia durante la
+    # lectura, el siguiente request ya no coincide
+    cabeceras = cabeceras_cache(etag_catalogo(), f"private, max-age={settings.CATALOG_HTTP_MAX_AGE_SECONDS}")
+    if coincide(request, cabeceras["ETag"]):
+        return no_modificado(cabeceras)
+    
     logger.info(f"Listando autos - Usuario: {current_user['username']}, Búsqueda: {search}")
     
-    autos = get_autos_disponibles(search)
+    autos = await run_db(get_autos_disponibles, search)
     
-    return {
+    return respuesta_filas({
         "total": len(autos),
         "autos": autos
-    }
+    }, headers=cabeceras)
 
 
-@router.post("/registrar")
+@router.post("/registrar", response_model=VentaRegistrada)
 async def crear_venta(
     venta: VentaCreate,
-    current_user: dict = Depends(get_current_user)
+    response: Response,
+    user: dict = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Clave única por venta: los reintentos con la misma clave devuelven la venta original"
+    )
 ):
-    """Registra una nueva venta"""
-    username = current_user["username"]
-    user = get_user(username)
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuario no encontrado"
-        )
-    
+    """
+    Registra una nueva venta
+
+    Con `Idempotency-Key`, un reintento (o un duplicado simultáneo) con la
+    misma clave y el mismo cuerpo devuelve el venta_id original con la
+    cabecera `Idempotent-Replayed: true`, sin registrar otra venta.
+    """
     logger.info(f"Registrando venta - Vendedor: {user['full_name']} ({user['sucursal_provincia']}/{user['sucursal_distrito']})")
     
-    # Registrar la venta
-    venta_id = registrar_venta(
+    if idempotency_key is None:
+        venta_id, _ = await _registrar(venta, user)
+    else:
+        # La clave es por vendedor: dos vendedores pueden generar la misma
+        clave = f"{user['id']}:{idempotency_key}"
+        try:
+            venta_id, repetida = await ejecutar_idempotente(
+                clave, huella(venta.model_dump()), lambda idempotencia: _registrar(venta, user, idempotencia)
+            )
+        except IdempotencyKeyReutilizadaError:
+            IDEMPOTENCY_REQUESTS.labels("reutilizada").inc()
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="La Idempotency-Key ya se usó con otros datos de venta"
+            )
+        IDEMPOTENCY_REQUESTS.labels("repetida" if repetida else "nueva").inc()
+        if repetida:
+            logger.info(f"🔁 Venta {venta_id} devuelta por Idempotency-Key (sin registrar otra)")
+            response.headers["Idempotent-Replayed"] = "true"
+    
+    return {
+        "success": True,
+        "message": "Venta registrada exitosamente",
+        "venta_id": venta_id
+    }
+
+
+async def _registrar(
+    venta: VentaCreate,
+    user: dict,
+    idempotencia: Optional[ClaveIdempotencia] = None
+) -> Tuple[int, bool]:
+    """
+    Registra la venta (descuenta una unidad de stock en la misma transacción)
+
+    Returns:
+        (venta_id, repetida): repetida es True si la base ya tenía la clave
+    """
+    datos = dict(
         vendedor_id=user['id'],
         auto_id=venta.auto_id,
         tipo_compra=venta.tipo_compra,
-        monto_fisco=venta.monto_fisco,
+        monto_centimos=venta.monto_centimos,
         nombre_comprador=venta.nombre_comprador,
         dni_comprador=venta.dni_comprador,
         contacto_comprador=venta.contacto_comprador,
@@ -70,42 +180,264 @@ async def crear_venta(
         sucursal_distrito=user['sucursal_distrito'],
         nombre_vendedor=user['full_name']
     )
+    try:
+        if idempotencia is None:
+            venta_id = await run_db(registrar_venta, **datos)
+            repetida = False
+        else:
+            venta_id, repetida = await run_db(registrar_venta_idempotente, idempotencia, **datos)
+    except AutoNoDisponibleError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Auto no encontrado"
+        )
+    except StockAgotadoError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El auto no tiene stock disponible"
+        )
     
     if not venta_id:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al registrar la venta"
         )
+    return venta_id, repetida
+
+
+@router.post("/registrar-lote", response_model=LoteResponse, response_model_exclude_none=True)
+async def crear_ventas_lote(
+    ventas: List[Dict[str, Any]] = Body(..., description="Lista de ventas con los campos de /registrar"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Registra un lote de ventas (por ejemplo, el cierre del día de una sucursal)
+
+    Cada fila se valida por separado; las válidas se insertan por tramos y la
+    respuesta indica, por fila (numerada desde 1), el venta_id o los errores.
+    """
+    return await _registrar_lote(ventas, user)
+
+
+@router.post("/registrar-lote/csv", response_model=LoteResponse, response_model_exclude_none=True)
+async def crear_ventas_lote_csv(
+    archivo: UploadFile = File(..., description="CSV con cabecera: auto_id, tipo_compra, monto_fisco, ..."),
+    user: dict = Depends(get_current_user)
+):
+    """Igual que /registrar-lote, con las ventas en un archivo CSV"""
+    try:
+        contenido = (await archivo.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El archivo debe estar codificado en UTF-8"
+        )
+    
+    # Las celdas vacías se tratan como campos ausentes
+    ventas = [
+        {k.strip(): v.strip() for k, v in fila.items() if k and v and v.strip()}
+        for fila in csv.DictReader(io.StringIO(contenido))
+    ]
+    return await _registrar_lote(ventas, user)
+
+
+async def _registrar_lote(ventas: List[Dict[str, Any]], user: dict) -> dict:
+    if not ventas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El lote no contiene ventas"
+        )
+    if len(ventas) > settings.VENTAS_LOTE_MAX_FILAS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote supera el máximo de {settings.VENTAS_LOTE_MAX_FILAS} ventas"
+        )
+    
+    logger.info(f"Registrando lote de {len(ventas)} ventas - Vendedor: {user['full_name']} ({user['sucursal_provincia']}/{user['sucursal_distrito']})")
+    
+    resultados: List[dict] = [{"fila": i + 1} for i in range(len(ventas))]
+    validas: List[dict] = []
+    indices: List[int] = []
+    
+    for i, fila in enumerate(ventas):
+        try:
+            venta = VentaLoteItem.model_validate(fila)
+        except ValidationError as e:
+            resultados[i]["errores"] = [
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            ]
+            continue
+        
+        validas.append({
+            "auto_id": venta.auto_id,
+            "tipo_compra": venta.tipo_compra,
+            "monto_centimos": venta.monto_centimos,
+            "nombre_comprador": venta.nombre_comprador,
+            "dni_comprador": venta.dni_comprador,
+            "contacto_comprador": venta.contacto_comprador,
+            "fecha_venta": venta.fecha_venta,
+        })
+        indices.append(i)
+    
+    if validas:
+        insertadas = await run_db(
+            registrar_ventas_lote,
+            vendedor_id=user['id'],
+            sucursal_provincia=user['sucursal_provincia'],
+            sucursal_distrito=user['sucursal_distrito'],
+            nombre_vendedor=user['full_name'],
+            ventas=validas
+        )
+        for i, resultado in zip(indices, insertadas):
+            if "venta_id" in resultado:
+                resultados[i]["venta_id"] = resultado["venta_id"]
+            else:
+                resultados[i]["errores"] = [resultado["error"]]
+    
+    registradas = sum(1 for r in resultados if "venta_id" in r)
     
     return {
-        "success": True,
-        "message": "Venta registrada exitosamente",
-        "venta_id": venta_id
+        "success": registradas == len(ventas),
+        "total": len(ventas),
+        "registradas": registradas,
+        "fallidas": len(ventas) - registradas,
+        "resultados": resultados
     }
 
 
-@router.get("/mis-ventas")
+@router.get("/mis-ventas", response_model=MisVentasResponse)
 async def obtener_mis_ventas(
     limit: int = Query(50, ge=1, le=100),
-    current_user: dict = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Cursor devuelto como next_cursor en la página anterior"),
+    monto_min: Optional[float] = Query(None, gt=0, description="Monto mínimo en soles"),
+    monto_max: Optional[float] = Query(None, gt=0, description="Monto máximo en soles"),
+    user: dict = Depends(get_current_user)
 ):
-    """Obtiene las ventas del vendedor actual"""
-    username = current_user["username"]
-    user = get_user(username)
+    """
+    Obtiene las ventas del vendedor actual, paginadas por cursor
+
+    Para la página siguiente se envía el `next_cursor` recibido; es null en
+    la última página.
+    """
+    logger.info(f"Obteniendo ventas - Vendedor: {user['full_name']}")
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuario no encontrado"
-        )
+    despues_de = _decodificar_cursor(cursor)
     
-    logger.info(f"Obteniendo ventas - Vendedor: {user['full_name']}")
+    # Se pide una fila extra solo para saber si hay otra página
+    ventas = await run_db(
+        get_ventas_by_vendedor,
+        user['id'],
+        limit + 1,
+        monto_min=_monto_filtro(monto_min),
+        monto_max=_monto_filtro(monto_max),
+        despues_de=despues_de
+    )
     
-    ventas = get_ventas_by_vendedor(user['id'], limit)
+    next_cursor = None
+    if len(ventas) > limit:
+        ventas = ventas[:limit]
+        next_cursor = encode_cursor(ventas[-1]["fecha_venta"], ventas[-1]["id"])
     
-    return {
+    return respuesta_filas({
         "total": len(ventas),
         "vendedor": user['full_name'],
         "sucursal": f"{user['sucursal_provincia']}/{user['sucursal_distrito']}",
-        "ventas": ventas
-    }
\ No newline at end of file
+        "ventas": [formatear_venta(v) for v in ventas],
+        "next_cursor": next_cursor
+    })
+
+
+EXPORT_COLUMNAS = [
+    "id", "fecha_venta", "monto_fisco", "monto_centimos", "auto", "tipo_compra",
+    "nombre_comprador", "dni_comprador", "contacto_comprador",
+    "sucursal_provincia", "sucursal_distrito", "nombre_vendedor"
+]
+
+
+@router.get("/mis-ventas/export")
+async def exportar_ventas(
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson o csv"),
+    alcance: str = Query("vendedor", pattern="^(vendedor|sucursal)$", description="Ventas propias o de toda la sucursal"),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Exporta el historial completo en streaming (NDJSON o CSV)
+
+    Las ventas se leen por páginas de keyset y se escriben a medida que
+    llegan, así que la memoria usada no depende del tamaño del historial.
+    """
+    logger.info(f"Exportando ventas ({alcance}, {formato}) - Vendedor: {user['full_name']}")
+    
+    if alcance == "sucursal":
+        filtro = {"sucursal": (user['sucursal_provincia'], user['sucursal_distrito'])}
+    else:
+        filtro = {"vendedor_id": user['id']}
+    
+    if formato == "csv":
+        return StreamingResponse(
+            _exportar_csv(filtro),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="ventas_{alcance}.csv"'}
+        )
+    
+    return StreamingResponse(_exportar_ndjson(filtro), media_type="application/x-ndjson")
+
+
+def _decodificar_cursor(cursor: Optional[str]):
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def _monto_filtro(monto: Optional[float]) -> Optional[int]:
+    if monto is None:
+        return None
+    try:
+        return parse_monto(monto)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+async def _paginas_ventas(filtro: dict) -> AsyncIterator[list]:
+    """Recorre el historial por keyset; cada página usa su propia conexión"""
+    despues_de = None
+    batch = settings.VENTAS_EXPORT_BATCH_SIZE
+    
+    while True:
+        ventas = await run_db(listar_ventas, limit=batch, despues_de=despues_de, **filtro)
+        if not ventas:
+            return
+        yield [formatear_venta(v) for v in ventas]
+        if len(ventas) < batch:
+            return
+        despues_de = (ventas[-1]["fecha_venta"], ventas[-1]["id"])
+
+
+async def _exportar_ndjson(filtro: dict) -> AsyncIterator[bytes]:
+    async for ventas in _paginas_ventas(filtro):
+        yield b"".join(linea_ndjson(v) for v in ventas)
+
+
+async def _exportar_csv(filtro: dict) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNAS, extrasaction="ignore")
+    writer.writeheader()
+    
+    async for ventas in _paginas_ventas(filtro):
+        writer.writerows(ventas)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # Historial vacío: solo la cabecera
+    if buffer.tell():
+        yield buffer.getvalue()
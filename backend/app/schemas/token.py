@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.schemas.user import VendedorPerfil
 
 
 class Token(BaseModel):
@@ -10,4 +11,13 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     """Datos contenidos en el token"""
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+
+class LoginResponse(Token):
+    """Respuesta de /auth/login: token y perfil del vendedor"""
+    user: VendedorPerfil
+
+
+class LogoutResponse(BaseModel):
+    """Respuesta de /auth/logout"""
+    message: str
@@ -36,4 +36,14 @@ class UserInDB(UserBase):
     is_active: bool
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class VendedorPerfil(BaseModel):
+    """Perfil del vendedor devuelto por /auth/login y /auth/me"""
+    username: str
+    full_name: str
+    email: Optional[str] = None
+    role: str = "user"
+    codigo_vendedor: str = ""
+    sucursal_provincia: str = ""
+    sucursal_distrito: str = ""
@@ -0,0 +1,67 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class AutoDisponible(BaseModel):
+    """Auto del catálogo con stock"""
+    id: int
+    marca: str
+    modelo: str
+    anio: int
+    precio_referencial: Optional[float] = None
+    stock: int
+
+
+class AutosResponse(BaseModel):
+    """Respuesta de GET /venta/autos"""
+    total: int
+    autos: List[AutoDisponible]
+
+
+class VentaHistorial(BaseModel):
+    """Venta del historial de un vendedor o sucursal"""
+    id: int
+    fecha_venta: datetime
+    monto_fisco: str = Field(..., description="Monto formateado (S/. 85,000.00)")
+    monto_centimos: Optional[int] = Field(None, description="Monto en céntimos")
+    nombre_comprador: str
+    dni_comprador: str
+    contacto_comprador: str
+    auto: str = Field(..., description="Marca Modelo Año")
+    tipo_compra: str
+    sucursal_provincia: str
+    sucursal_distrito: str
+    nombre_vendedor: str
+
+
+class MisVentasResponse(BaseModel):
+    """Página del historial de GET /venta/mis-ventas"""
+    total: int
+    vendedor: str
+    sucursal: str
+    ventas: List[VentaHistorial]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (null en la última)")
+
+
+class VentaRegistrada(BaseModel):
+    """Respuesta de POST /venta/registrar"""
+    success: bool
+    message: str
+    venta_id: int
+
+
+class ResultadoFilaLote(BaseModel):
+    """Resultado de una fila del lote: venta_id si se registró, errores si no"""
+    fila: int
+    venta_id: Optional[int] = None
+    errores: Optional[List[str]] = None
+
+
+class LoteResponse(BaseModel):
+    """Respuesta de POST /venta/registrar-lote y /venta/registrar-lote/csv"""
+    success: bool
+    total: int
+    registradas: int
+    fallidas: int
+    resultados: List[ResultadoFilaLote]
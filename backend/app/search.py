@@ -0,0 +1,168 @@
+"""
+Búsqueda de autos con índice de texto completo (SQLite FTS5)
+
+`autos_fts` es una tabla FTS5 de contenido externo sobre
+`autos_disponibles` (marca, modelo, anio), sincronizada mediante triggers.
+El tokenizador `unicode61 remove_diacritics 2` hace la búsqueda insensible a
+mayúsculas y tildes, y el índice de prefijos permite buscar mientras el
+usuario escribe ("toy", "cr-v", "toyota 2025"). Los resultados se ordenan por
+relevancia (bm25) y luego por año, marca y modelo.
+
+Si la versión de SQLite no trae FTS5, se usa la búsqueda LIKE original.
+"""
+import logging
+import re
+import sqlite3
+import unicodedata
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_fts_disponible: Optional[bool] = None
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Pesos bm25 por columna: marca, modelo, anio
+_BM25_PESOS = "10.0, 8.0, 2.0"
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Minúsculas, sin tildes y con espacios simples"""
+    if not texto:
+        return ""
+    sin_tildes = "".join(
+        c for c in unicodedata.normalize("NFKD", texto)
+        if not unicodedata.combining(c)
+    )
+    return " ".join(sin_tildes.lower().split())
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Divide un texto normalizado en tokens alfanuméricos"""
+    return _TOKEN_RE.findall(normalizar_texto(texto))
+
+
+def construir_consulta_fts(termino: str) -> str:
+    """
+    Convierte el término del usuario en una consulta FTS5
+
+    Cada token se busca como prefijo y todos deben coincidir:
+    "toyota 2025" -> "toyota"* AND "2025"*
+    """
+    return " AND ".join(f'"{token}"*' for token in tokenizar(termino))
+
+
+# ============================================
+# ÍNDICE
+# ============================================
+
+def init_search_index(conn: sqlite3.Connection) -> bool:
+    """
+    Crea la tabla FTS5 y sus triggers (idempotente)
+
+    Returns:
+        bool: True si el índice FTS5 quedó disponible
+    """
+    global _fts_disponible
+
+    existia = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'autos_fts'"
+    ).fetchone() is not None
+
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS autos_fts USING fts5(
+                marca, modelo, anio,
+                content='autos_disponibles',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='1 2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"⚠️ FTS5 no disponible, se usará búsqueda LIKE: {e}")
+        _fts_disponible = False
+        return False
+
+    # Triggers de sincronización (solo columnas indexadas: los cambios de
+    # stock o is_active no tocan el índice)
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS autos_fts_ai AFTER INSERT ON autos_disponibles BEGIN
+            INSERT INTO autos_fts(rowid, marca, modelo, anio)
+            VALUES (new.id, new.marca, new.modelo, new.anio);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS autos_fts_ad AFTER DELETE ON autos_disponibles BEGIN
+            INSERT INTO autos_fts(autos_fts, rowid, marca, modelo, anio)
+            VALUES ('delete', old.id, old.marca, old.modelo, old.anio);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS autos_fts_au AFTER UPDATE OF marca, modelo, anio ON autos_disponibles BEGIN
+            INSERT INTO autos_fts(autos_fts, rowid, marca, modelo, anio)
+            VALUES ('delete', old.id, old.marca, old.modelo, old.anio);
+            INSERT INTO autos_fts(rowid, marca, modelo, anio)
+            VALUES (new.id, new.marca, new.modelo, new.anio);
+        END
+    ''')
+
+    if not existia:
+        # Indexar autos que ya existían antes de crear la tabla FTS
+        conn.execute("INSERT INTO autos_fts(autos_fts) VALUES ('rebuild')")
+        logger.info("✅ Índice de búsqueda 'autos_fts' creado")
+
+    _fts_disponible = True
+    return True
+
+
+def fts_disponible(conn: sqlite3.Connection) -> bool:
+    """Indica si existe el índice FTS5 (se consulta una sola vez por proceso)"""
+    global _fts_disponible
+
+    if _fts_disponible is None:
+        _fts_disponible = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'autos_fts'"
+        ).fetchone() is not None
+    return _fts_disponible
+
+
+# ============================================
+# CONSULTAS
+# ============================================
+
+def buscar_autos(conn: sqlite3.Connection, termino: str) -> List[Dict]:
+    """Busca autos disponibles usando FTS5 si está disponible"""
+    consulta = construir_consulta_fts(termino)
+    if consulta and fts_disponible(conn):
+        return buscar_autos_fts(conn, consulta)
+    return buscar_autos_like(conn, termino)
+
+
+def buscar_autos_fts(conn: sqlite3.Connection, consulta: str) -> List[Dict]:
+    cursor = conn.execute(f'''
+        SELECT a.id, a.marca, a.modelo, a.anio, a.precio_referencial, a.stock
+        FROM autos_fts
+        JOIN autos_disponibles a ON a.id = autos_fts.rowid
+        WHERE autos_fts MATCH ?
+        AND a.is_active = 1 AND a.stock > 0
+        ORDER BY bm25(autos_fts, {_BM25_PESOS}), a.anio DESC, a.marca, a.modelo
+    ''', (consulta,))
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def buscar_autos_like(conn: sqlite3.Connection, termino: str) -> List[Dict]:
+    """Búsqueda original por subcadena (recorre toda la tabla)"""
+    patron = f'%{termino}%'
+    cursor = conn.execute('''
+        SELECT id, marca, modelo, anio, precio_referencial, stock
+        FROM autos_disponibles
+        WHERE is_active = 1 AND stock > 0
+        AND (
+            marca LIKE ? OR
+            modelo LIKE ? OR
+            CAST(anio AS TEXT) LIKE ?
+        )
+        ORDER BY anio DESC, marca, modelo
+    ''', (patron, patron, patron))
+    return [dict(row) for row in cursor.fetchall()]
@@ -0,0 +1,302 @@
+"""
+Generador de datos de prueba
+
+Crea vendedores, autos y ventas sintéticas a la escala pedida (hasta
+millones de ventas) con una semilla determinista opcional. Con los valores
+por defecto genera los datos de demostración que carga `seed_initial_data`:
+los 12 vendedores de prueba, 24 modelos en 2024 y 2025, y 432 ventas.
+
+Para cargas grandes:
+- los vendedores y autos se leen una sola vez y quedan en memoria
+- las ventas se insertan con executemany en lotes, dentro de transacciones
+  de `transaccion` filas
+- con `rapido=True` se relajan los PRAGMAs (synchronous=OFF, caché grande), y
+  los índices secundarios de registro_venta y los rollups de ventas_diarias
+  se reconstruyen una vez al final en lugar de actualizarse fila por fila
+
+Uso:
+    python -m app.manage seed --ventas 1000000 --vendedores 200 --modelos 300 --seed 42 --rapido
+"""
+import hashlib
+import logging
+import random
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+from app.config import settings
+from app.rollups import drop_rollup_triggers, init_rollups, rebuild_rollups
+from app.utils.money import format_monto
+
+logger = logging.getLogger(__name__)
+
+VENDEDORES_DEMO = [
+    ('cmendoza', 'carlos2020', 'Carlos Mendoza', 'cmendoza@automotrizjj.com', 'vendedor', 'VEN001', 'LIMA', 'Miraflores'),
+    ('svargas', 'sofia2020', 'Sofía Vargas', 'svargas@automotrizjj.com', 'vendedor', 'VEN002', 'LIMA', 'Miraflores'),
+    ('mrojas', 'miguel2020', 'Miguel Rojas', 'mrojas@automotrizjj.com', 'vendedor', 'VEN003', 'LIMA', 'San Isidro'),
+    ('ldiaz', 'laura2020', 'Laura Díaz', 'ldiaz@automotrizjj.com', 'vendedor', 'VEN004', 'LIMA', 'San Isidro'),
+    ('dcruz', 'diego2020', 'Diego Cruz', 'dcruz@automotrizjj.com', 'vendedor', 'VEN005', 'LIMA', 'Surco'),
+    ('alopez', 'andrea2020', 'Andrea López', 'alopez@automotrizjj.com', 'vendedor', 'VEN006', 'LIMA', 'Surco'),
+    ('rsilva', 'roberto2020', 'Roberto Silva', 'rsilva@automotrizjj.com', 'vendedor', 'VEN007', 'LIMA', 'La Molina'),
+    ('ptorres', 'patricia2020', 'Patricia Torres', 'ptorres@automotrizjj.com', 'vendedor', 'VEN008', 'LIMA', 'La Molina'),
+    ('fcampos', 'fernando2020', 'Fernando Campos', 'fcampos@automotrizjj.com', 'vendedor', 'VEN009', 'PIURA', 'Piura Centro'),
+    ('vmorales', 'valentina2020', 'Valentina Morales', 'vmorales@automotrizjj.com', 'vendedor', 'VEN010', 'PIURA', 'Piura Centro'),
+    ('mquispe', 'marco2020', 'Marco Quispe', 'mquispe@automotrizjj.com', 'vendedor', 'VEN011', 'AYACUCHO', 'Ayacucho Centro'),
+    ('chuaman', 'carmen2020', 'Carmen Huamán', 'chuaman@automotrizjj.com', 'vendedor', 'VEN012', 'AYACUCHO', 'Ayacucho Centro'),
+]
+
+AUTOS_BASE = [
+    ('Toyota', 'Corolla', 85000.00),
+    ('Toyota', 'Yaris', 65000.00),
+    ('Toyota', 'RAV4', 125000.00),
+    ('Honda', 'Civic', 90000.00),
+    ('Honda', 'CR-V', 130000.00),
+    ('Honda', 'Accord', 110000.00),
+    ('Nissan', 'Sentra', 75000.00),
+    ('Nissan', 'Kicks', 80000.00),
+    ('Nissan', 'X-Trail', 120000.00),
+    ('Hyundai', 'Elantra', 78000.00),
+    ('Hyundai', 'Tucson', 115000.00),
+    ('Hyundai', 'Accent', 62000.00),
+    ('Mazda', '3', 88000.00),
+    ('Mazda', 'CX-5', 128000.00),
+    ('Mazda', '2', 68000.00),
+    ('Kia', 'Forte', 76000.00),
+    ('Kia', 'Sportage', 122000.00),
+    ('Kia', 'Rio', 64000.00),
+    ('Chevrolet', 'Cruze', 82000.00),
+    ('Chevrolet', 'Tracker', 95000.00),
+    ('Ford', 'Focus', 79000.00),
+    ('Ford', 'Escape', 118000.00),
+    ('BMW', 'Serie 3', 180000.00),
+    ('BMW', 'X3', 220000.00)
+]
+
+NOMBRES_COMPRADOR = ['Juan Pérez', 'María García', 'Carlos López', 'Ana Martínez', 'Luis Rodríguez',
+                     'Carmen Silva', 'José Torres', 'Elena Flores', 'Pedro Ramírez', 'Isabel Castro']
+
+# Orden de las columnas en las filas que produce `generar_ventas`
+COLUMNAS_VENTA = (
+    "fecha_venta", "vendedor_id", "auto_id", "tipo_compra", "monto_fisco", "monto_centimos",
+    "nombre_comprador", "dni_comprador", "contacto_comprador",
+    "sucursal_provincia", "sucursal_distrito", "nombre_vendedor"
+)
+
+_SQL_VENTA = f'''
+    INSERT INTO registro_venta ({", ".join(COLUMNAS_VENTA)})
+    VALUES ({", ".join("?" * len(COLUMNAS_VENTA))})
+'''
+
+
+def generar_vendedores(num: int) -> List[tuple]:
+    """Los vendedores de demostración y, si se piden más, vendedores numerados"""
+    vendedores = list(VENDEDORES_DEMO[:num])
+    sucursales = sorted({(v[6], v[7]) for v in VENDEDORES_DEMO})
+    for i in range(len(vendedores) + 1, num + 1):
+        username = f"vendedor{i:04d}"
+        provincia, distrito = sucursales[i % len(sucursales)]
+        vendedores.append((
+            username, username, f"Vendedor {i:04d}", f"{username}@automotrizjj.com",
+            'vendedor', f"VEN{i:03d}", provincia, distrito
+        ))
+    return vendedores
+
+
+def generar_modelos(num: int) -> List[tuple]:
+    """Los modelos base y, si se piden más, versiones numeradas de ellos"""
+    modelos = []
+    for i in range(num):
+        marca, modelo, precio = AUTOS_BASE[i % len(AUTOS_BASE)]
+        version = i // len(AUTOS_BASE)
+        if version:
+            modelo = f"{modelo} V{version + 1}"
+            precio = round(precio * (1 + 0.05 * version), 2)
+        modelos.append((marca, modelo, precio))
+    return modelos
+
+
+def filas_vendedores(num: int) -> List[tuple]:
+    """
+    Filas de vendedores listas para insertar (contraseña ya hasheada)
+
+    El hash es SHA-256, barato para sembrar miles de vendedores; cada uno
+    pasa a bcrypt en su primer login (ver app/passwords.py).
+    """
+    return [
+        (username, hashlib.sha256(password.encode()).hexdigest(), full_name, email, role, codigo, provincia, distrito)
+        for username, password, full_name, email, role, codigo, provincia, distrito in generar_vendedores(num)
+    ]
+
+
+def generar_autos(rng: random.Random, modelos: int, anios: int, anio_final: int) -> List[tuple]:
+    """(marca, modelo, anio, precio, stock) de cada modelo por año; cada año sube el precio"""
+    autos = []
+    for marca, modelo, precio in generar_modelos(modelos):
+        for anio in range(anio_final - anios + 1, anio_final + 1):
+            autos.append((marca, modelo, anio, precio, 25))
+            precio += rng.randrange(25000, 75001, 10)
+    return autos
+
+
+def generar_ventas(
+    rng: random.Random,
+    vendedores: Sequence[tuple],
+    autos: Sequence[tuple],
+    ventas: int,
+    dias: int,
+    hasta: Optional[date] = None,
+    batch_size: int = 10_000
+) -> Iterator[List[tuple]]:
+    """
+    Lotes de ventas sintéticas con las columnas de COLUMNAS_VENTA
+
+    Args:
+        vendedores: (id, full_name, sucursal_provincia, sucursal_distrito)
+        autos: (id, precio_referencial)
+        hasta: último día con ventas (hoy por defecto, nunca después de hoy).
+            Las fechas están en UTC, como `fecha_venta`; las ventas de hoy
+            no pasan de la hora actual.
+    """
+    ahora = datetime.utcnow()
+    hoy = ahora.date()
+    fecha_fin = min(hasta or hoy, hoy)
+    fecha_inicio = fecha_fin - timedelta(days=dias)
+    fechas = [(fecha_inicio + timedelta(days=d)).isoformat() for d in range(dias + 1)]
+    hoy_iso = hoy.isoformat()
+    transcurridos = ahora.hour * 3600 + ahora.minute * 60 + ahora.second
+
+    generadas = 0
+    while generadas < ventas:
+        lote = []
+        for _ in range(min(batch_size, ventas - generadas)):
+            vendedor_id, full_name, provincia, distrito = rng.choice(vendedores)
+            auto_id, precio = rng.choice(autos)
+            monto_centimos = int(precio * rng.uniform(0.9, 1.1)) * 100
+            segundo = rng.randrange(86400)
+            dia = rng.choice(fechas)
+            if dia == hoy_iso and segundo > transcurridos:
+                segundo %= transcurridos + 1
+            lote.append((
+                f"{dia} {segundo // 3600:02d}:{segundo // 60 % 60:02d}:{segundo % 60:02d}",
+                vendedor_id, auto_id, rng.choice(('Cash', 'Crédito')),
+                format_monto(monto_centimos), monto_centimos,
+                rng.choice(NOMBRES_COMPRADOR), str(rng.randint(10000000, 99999999)),
+                f"9{rng.randint(10000000, 99999999)}",
+                provincia, distrito, full_name
+            ))
+        generadas += len(lote)
+        yield lote
+
+
+def generar_datos(
+    conn: sqlite3.Connection,
+    vendedores: int = len(VENDEDORES_DEMO),
+    modelos: int = len(AUTOS_BASE),
+    anios: int = 2,
+    anio_final: int = 2025,
+    ventas: int = 432,
+    dias: int = 180,
+    hasta: Optional[date] = None,
+    seed: Optional[int] = None,
+    batch_size: int = 10_000,
+    transaccion: int = 200_000,
+    rapido: bool = False
+) -> Dict[str, float]:
+    """
+    Inserta vendedores, autos y ventas sintéticas en una base vacía
+
+    Args:
+        vendedores: cantidad de vendedores (los primeros 12 son los de demo)
+        modelos: modelos por año; cada uno se crea para `anios` años hasta `anio_final`
+        ventas: ventas a generar en los `dias` días previos a `hasta` (hoy por defecto)
+        seed: semilla para obtener siempre los mismos datos (None = aleatorio);
+            con la misma semilla y `hasta` los datos son idénticos
+        batch_size: filas por executemany
+        transaccion: filas por commit
+        rapido: PRAGMAs relajados; índices y rollups reconstruidos al final
+
+    Returns:
+        Estadísticas: filas insertadas, segundos y filas/segundo de las ventas
+    """
+    rng = random.Random(seed)
+    inicio_total = time.perf_counter()
+
+    indices: List[str] = []
+    if rapido:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        drop_rollup_triggers(conn)
+        # Los índices secundarios se reconstruyen una vez al final: más rápido
+        # que mantenerlos fila por fila
+        for nombre, sql in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'registro_venta' AND sql IS NOT NULL"
+        ).fetchall():
+            indices.append(sql)
+            conn.execute(f"DROP INDEX {nombre}")
+
+    try:
+        # PASO 1: VENDEDORES (tabla padre)
+        conn.executemany('''
+            INSERT INTO vendedores (username, password_hash, full_name, email, role, codigo_vendedor, sucursal_provincia, sucursal_distrito)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', filas_vendedores(vendedores))
+        logger.info(f"✅ Insertados {vendedores} vendedores")
+
+        # PASO 2: AUTOS (tabla padre)
+        autos = generar_autos(rng, modelos, anios, anio_final)
+        conn.executemany('''
+            INSERT INTO autos_disponibles (marca, modelo, anio, precio_referencial, stock)
+            VALUES (?, ?, ?, ?, ?)
+        ''', autos)
+        conn.commit()
+        logger.info(f"✅ Insertados {len(autos)} autos ({anios} años)")
+
+        # PASO 3: VENTAS (tabla con FK); vendedores y autos quedan en memoria
+        cache_vendedores = conn.execute(
+            "SELECT id, full_name, sucursal_provincia, sucursal_distrito FROM vendedores"
+        ).fetchall()
+        cache_autos = conn.execute("SELECT id, precio_referencial FROM autos_disponibles").fetchall()
+
+        inicio_ventas = time.perf_counter()
+        insertadas = 0
+        pendientes_commit = 0
+
+        for lote in generar_ventas(rng, cache_vendedores, cache_autos, ventas, dias, hasta, batch_size):
+            conn.executemany(_SQL_VENTA, lote)
+            insertadas += len(lote)
+            pendientes_commit += len(lote)
+
+            if pendientes_commit >= transaccion:
+                conn.commit()
+                pendientes_commit = 0
+                transcurrido = time.perf_counter() - inicio_ventas
+                logger.info(f"   {insertadas:,}/{ventas:,} ventas ({insertadas / transcurrido:,.0f} filas/s)")
+
+        conn.commit()
+        segundos_ventas = time.perf_counter() - inicio_ventas
+
+    finally:
+        if rapido:
+            # Índices, rollups de lo que se haya confirmado, triggers y PRAGMAs normales
+            conn.rollback()
+            for sql in indices:
+                conn.execute(sql)
+            rebuild_rollups(conn)
+            init_rollups(conn)
+            conn.commit()
+            conn.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+            conn.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}")
+
+    stats = {
+        "vendedores": vendedores,
+        "autos": len(autos),
+        "ventas": insertadas,
+        "segundos": round(time.perf_counter() - inicio_total, 2),
+        "ventas_por_segundo": round(insertadas / segundos_ventas) if segundos_ventas > 0 else 0,
+    }
+    logger.info(
+        f"✅ Insertados {insertadas:,} registros de ventas "
+        f"({stats['ventas_por_segundo']:,} filas/s, {stats['segundos']}s en total)"
+    )
+    return stats
@@ -0,0 +1,113 @@
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+from app.database import get_writer, leer, usa_repositorio
+from app.rollups import rebuild_rollups as recalcular_rollups
+
+logger = logging.getLogger(__name__)
+
+# Dimensión -> (columnas seleccionadas, expresión de agrupación, JOIN necesario)
+DIMENSIONES = {
+    "dia": (["vd.dia AS dia"], "vd.dia", None),
+    "mes": (["substr(vd.dia, 1, 7) AS mes"], "substr(vd.dia, 1, 7)", None),
+    "provincia": (["vd.sucursal_provincia AS provincia"], "vd.sucursal_provincia", None),
+    "distrito": (
+        ["vd.sucursal_provincia AS provincia", "vd.sucursal_distrito AS distrito"],
+        "vd.sucursal_provincia, vd.sucursal_distrito",
+        None
+    ),
+    "vendedor": (
+        ["vd.vendedor_id AS vendedor_id", "v.full_name AS vendedor"],
+        "vd.vendedor_id",
+        "JOIN vendedores v ON v.id = vd.vendedor_id"
+    ),
+    "auto": (
+        ["vd.auto_id AS auto_id", "a.marca || ' ' || a.modelo || ' ' || a.anio AS auto"],
+        "vd.auto_id",
+        "JOIN autos_disponibles a ON a.id = vd.auto_id"
+    ),
+    "tipo_compra": (["vd.tipo_compra AS tipo_compra"], "vd.tipo_compra", None),
+}
+
+
+def get_resumen_ventas(
+    agrupar_por: List[str],
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    provincia: Optional[str] = None,
+    distrito: Optional[str] = None,
+    vendedor_id: Optional[int] = None,
+    tipo_compra: Optional[str] = None
+) -> List[Dict]:
+    """
+    Totales de ventas agrupados por las dimensiones pedidas
+
+    Lee la tabla de rollups `ventas_diarias` (ver app/rollups.py), no
+    `registro_venta`. Con un backend distinto de SQLite el repositorio
+    agrupa `registro_venta` directamente. Se lee de una réplica si hay
+    alguna dentro del lag máximo. Lanza ValueError si una dimensión no
+    existe.
+
+    Returns:
+        Lista de filas con las dimensiones, num_ventas y monto_centimos_total
+    """
+    desconocidas = [d for d in agrupar_por if d not in DIMENSIONES]
+    if desconocidas:
+        raise ValueError(f"Dimensiones no válidas: {', '.join(desconocidas)}")
+
+    if usa_repositorio():
+        filtros = {
+            "desde": desde, "hasta": hasta, "provincia": provincia,
+            "distrito": distrito, "vendedor_id": vendedor_id, "tipo_compra": tipo_compra
+        }
+        return leer(lambda repositorio: repositorio.resumen_ventas(agrupar_por, **filtros))
+
+    columnas: List[str] = []
+    grupos: List[str] = []
+    joins: List[str] = []
+    for dimension in dict.fromkeys(agrupar_por):
+        cols, grupo, join = DIMENSIONES[dimension]
+        columnas.extend(c for c in cols if c not in columnas)
+        grupos.append(grupo)
+        if join:
+            joins.append(join)
+
+    condiciones = []
+    params: list = []
+    for sql, valor in (
+        ("vd.dia >= ?", desde.isoformat() if desde else None),
+        ("vd.dia <= ?", hasta.isoformat() if hasta else None),
+        ("vd.sucursal_provincia = ?", provincia),
+        ("vd.sucursal_distrito = ?", distrito),
+        ("vd.vendedor_id = ?", vendedor_id),
+        ("vd.tipo_compra = ?", tipo_compra),
+    ):
+        if valor is not None:
+            condiciones.append(sql)
+            params.append(valor)
+
+    select = ", ".join(columnas + [
+        "SUM(vd.num_ventas) AS num_ventas",
+        "SUM(vd.monto_centimos_total) AS monto_centimos_total"
+    ])
+    sql = f"SELECT {select} FROM ventas_diarias vd {' '.join(joins)}"
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    if grupos:
+        sql += f" GROUP BY {', '.join(grupos)} ORDER BY {', '.join(grupos)}"
+
+    return leer(_leer_resumen, sql, params)
+
+
+def _leer_resumen(conn, sql: str, params: list) -> List[Dict]:
+    cursor = conn.execute(sql, params)
+    return [dict(row) for row in cursor.fetchall() if row["num_ventas"]]
+
+
+def rebuild_rollups() -> int:
+    """Recalcula los rollups desde cero en una sola transacción del escritor"""
+    if usa_repositorio():
+        raise RuntimeError("Los rollups solo existen con DB_TYPE=sqlite")
+    filas = get_writer().execute(recalcular_rollups)
+    logger.info(f"✅ Rollups de ventas recalculados: {filas} filas")
+    return filas
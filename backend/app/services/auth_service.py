@@ -1,104 +1,266 @@
 from typing import Optional
-import hashlib
 import logging
-from app.database import get_db_connection
+import time
+from app.cache import get_cache
+from app.config import settings
+from app.database import anotar_escritura, get_connection, get_repositorio, get_writer, leer, usa_repositorio
+from app.db_executor import run_db
+from app.http_cache import etag, nueva_version
+from app.passwords import verificar_password
 
 logger = logging.getLogger(__name__)
 
+PERFILES_CACHE = "perfiles_usuario"
 
-def simple_verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verificación simple de contraseña"""
-    return hashlib.sha256(plain_password.encode()).hexdigest() == hashed_password
+# Versión de los perfiles para los ETag de /auth/me (ver app/http_cache.py)
+VERSION_PERFILES = "perfiles"
 
+# Clave de escritura de la tabla vendedores (ver app/replicas.py)
+CLAVE_VENDEDORES = "vendedores"
 
-def authenticate_user(username: str, password: str) -> Optional[dict]:
+
+async def authenticate_user(username: str, password: str) -> Optional[dict]:
     """
     Autentica un usuario verificando sus credenciales en la base de datos
+
+    La lectura va al executor de BD y la verificación al pool de hashing
+    (app/passwords.py): el event loop nunca ejecuta bcrypt. Un usuario
+    inactivo se rechaza antes de verificar. Un hash SHA-256 heredado se
+    reemplaza por bcrypt tras un login correcto.
+
+    Raises:
+        HashingSaturadoError: el pool de hashing no dio turno a tiempo
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            SELECT id, username, password_hash, full_name, email, role, 
-                   codigo_vendedor, sucursal_provincia, sucursal_distrito, is_active
-            FROM vendedores
-            WHERE username = ?
-        ''', (username,))
-        
-        user_row = cursor.fetchone()
-        
-        if not user_row:
-            logger.warning(f"❌ Usuario no encontrado: {username}")
-            return None
-        
-        user = dict(user_row)
-        
-        if not simple_verify_password(password, user["password_hash"]):
-            logger.warning(f"❌ Contraseña incorrecta para usuario: {username}")
-            return None
-        
-        if not user.get("is_active", 0):
-            logger.warning(f"❌ Usuario inactivo: {username}")
-            return None
-        
-        logger.info(f"✅ Autenticación exitosa para usuario: {username}")
-        return user
-        
+        user = await run_db(_buscar_vendedor, username=username, con_password=True)
     except Exception as e:
         logger.error(f"❌ Error al autenticar usuario: {e}")
         return None
-    finally:
-        conn.close()
+    
+    if not user:
+        # Mismo costo que una contraseña incorrecta: no revela qué usuarios existen
+        await verificar_password(password, None)
+        logger.warning(f"❌ Usuario no encontrado: {username}")
+        return None
+    
+    # Antes de bcrypt: una cuenta desactivada no ocupa el pool de hashing ni
+    # migra su hash heredado
+    if not user.get("is_active", 0):
+        logger.warning(f"❌ Usuario inactivo: {username}")
+        return None
+    
+    correcta, nuevo_hash = await verificar_password(password, user["password_hash"])
+    if not correcta:
+        logger.warning(f"❌ Contraseña incorrecta para usuario: {username}")
+        return None
+    
+    if nuevo_hash is not None:
+        await run_db(actualizar_password_hash, user["id"], user["password_hash"], nuevo_hash)
+    
+    logger.info(f"✅ Autenticación exitosa para usuario: {username}")
+    return user
+
+
+def _buscar_vendedor(
+    username: Optional[str] = None,
+    user_id: Optional[int] = None,
+    con_password: bool = False
+) -> Optional[dict]:
+    """
+    Lee un vendedor por username o id desde SQLite o desde el repositorio
+
+    Va a una réplica salvo que este proceso acabe de modificar vendedores.
+    """
+    return leer(_leer_vendedor, username, user_id, con_password, claves=(CLAVE_VENDEDORES,))
+
+
+def _leer_vendedor(destino, username: Optional[str], user_id: Optional[int], con_password: bool) -> Optional[dict]:
+    if usa_repositorio():
+        return destino.get_vendedor(username=username, user_id=user_id, con_password=con_password)
+    
+    columnas = "id, username, full_name, email, role, codigo_vendedor, sucursal_provincia, sucursal_distrito, is_active"
+    if con_password:
+        columnas += ", password_hash"
+    campo, valor = ("username", username) if username is not None else ("id", user_id)
+    
+    cursor = destino.cursor()
+    cursor.execute(f"SELECT {columnas} FROM vendedores WHERE {campo} = ?", (valor,))
+    user_row = cursor.fetchone()
+    return dict(user_row) if user_row else None
+
+
+def get_perfiles_cache():
+    """Caché de perfiles de vendedor (claves: ("username", x) e ("id", x))"""
+    return get_cache(
+        PERFILES_CACHE,
+        max_entries=settings.USER_CACHE_MAX_ENTRIES,
+        ttl=settings.USER_CACHE_TTL_SECONDS
+    )
+
+
+def _cachear_perfil(user: dict) -> None:
+    cache = get_perfiles_cache()
+    cache.set(("username", user["username"]), user)
+    cache.set(("id", user["id"]), user)
+
+
+def invalidar_usuario(username: Optional[str] = None, user_id: Optional[int] = None) -> None:
+    """Descarta el perfil cacheado de un vendedor (por username y/o id)"""
+    cache = get_perfiles_cache()
+    nueva_version(VERSION_PERFILES)
+    
+    for clave in (("username", username), ("id", user_id)):
+        if clave[1] is None:
+            continue
+        perfil = cache.get(clave)
+        cache.delete(clave)
+        if perfil:
+            cache.delete(("username", perfil["username"]))
+            cache.delete(("id", perfil["id"]))
+
+
+def etag_perfil(user_id: int) -> str:
+    """ETag de GET /auth/me: cambia al editar cualquier vendedor"""
+    return etag(VERSION_PERFILES, user_id, ventana=settings.USER_CACHE_TTL_SECONDS)
 
 
 def get_user(username: str) -> Optional[dict]:
     """Obtiene un usuario por su nombre de usuario"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    perfil = get_perfiles_cache().get(("username", username))
+    if perfil is not None:
+        return perfil
     
     try:
-        cursor.execute('''
-            SELECT id, username, full_name, email, role, 
-                   codigo_vendedor, sucursal_provincia, sucursal_distrito, is_active
-            FROM vendedores
-            WHERE username = ?
-        ''', (username,))
-        
-        user_row = cursor.fetchone()
-        
-        if user_row:
-            return dict(user_row)
-        return None
-        
+        user = _buscar_vendedor(username=username)
     except Exception as e:
         logger.error(f"❌ Error al obtener usuario: {e}")
         return None
-    finally:
-        conn.close()
+    
+    if user:
+        _cachear_perfil(user)
+    return user
 
 
 def get_user_by_id(user_id: int) -> Optional[dict]:
     """Obtiene un usuario por su ID"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    perfil = get_perfiles_cache().get(("id", user_id))
+    if perfil is not None:
+        return perfil
     
     try:
-        cursor.execute('''
-            SELECT id, username, full_name, email, role, 
-                   codigo_vendedor, sucursal_provincia, sucursal_distrito, is_active
-            FROM vendedores
-            WHERE id = ?
-        ''', (user_id,))
-        
-        user_row = cursor.fetchone()
-        
-        if user_row:
-            return dict(user_row)
-        return None
-        
+        user = _buscar_vendedor(user_id=user_id)
     except Exception as e:
         logger.error(f"❌ Error al obtener usuario por ID: {e}")
         return None
-    finally:
-        conn.close()
\ No newline at end of file
+    
+    if user:
+        _cachear_perfil(user)
+    return user
+
+
+CAMPOS_EDITABLES_VENDEDOR = (
+    "full_name", "email", "role", "sucursal_provincia", "sucursal_distrito", "is_active"
+)
+
+
+def actualizar_vendedor(user_id: int, **campos) -> bool:
+    """Actualiza datos de un vendedor e invalida su perfil cacheado"""
+    cambios = {k: v for k, v in campos.items() if k in CAMPOS_EDITABLES_VENDEDOR}
+    if not cambios:
+        return False
+    
+    try:
+        if usa_repositorio():
+            actualizado = get_repositorio().actualizar_vendedor(user_id, cambios)
+        else:
+            actualizado = get_writer().execute(_actualizar_vendedor, user_id, cambios)
+    except Exception as e:
+        logger.error(f"❌ Error al actualizar vendedor {user_id}: {e}")
+        return False
+    
+    anotar_escritura(CLAVE_VENDEDORES)
+    invalidar_usuario(user_id=user_id)
+    return actualizado
+
+
+def _actualizar_vendedor(conn, user_id: int, cambios: dict) -> bool:
+    asignaciones = ", ".join(f"{campo} = ?" for campo in cambios)
+    cursor = conn.execute(
+        f"UPDATE vendedores SET {asignaciones} WHERE id = ?",
+        (*cambios.values(), user_id)
+    )
+    return cursor.rowcount > 0
+
+
+def actualizar_password_hash(user_id: int, hash_anterior: str, hash_nuevo: str) -> bool:
+    """
+    Reemplaza el hash de contraseña de un vendedor si sigue siendo `hash_anterior`
+
+    La condición evita que un rehash tardío pise un cambio de contraseña
+    hecho entretanto; con dos logins simultáneos del mismo usuario solo el
+    primero escribe. Un fallo se registra y no afecta al login: el hash
+    heredado sigue siendo válido y se reintenta en el próximo.
+    """
+    try:
+        if usa_repositorio():
+            actualizado = get_repositorio().actualizar_password_hash(user_id, hash_anterior, hash_nuevo)
+        else:
+            actualizado = get_writer().execute(_actualizar_password_hash, user_id, hash_anterior, hash_nuevo)
+    except Exception as e:
+        logger.error(f"❌ Error al actualizar el hash de contraseña del vendedor {user_id}: {e}")
+        return False
+    
+    if actualizado:
+        # El perfil cacheado no incluye el hash: solo se anota la escritura
+        anotar_escritura(CLAVE_VENDEDORES)
+        logger.info(f"🔐 Hash de contraseña del vendedor {user_id} actualizado a bcrypt ({settings.PASSWORD_BCRYPT_ROUNDS} rondas)")
+    return actualizado
+
+
+def _actualizar_password_hash(conn, user_id: int, hash_anterior: str, hash_nuevo: str) -> bool:
+    cursor = conn.execute(
+        "UPDATE vendedores SET password_hash = ? WHERE id = ? AND password_hash = ?",
+        (hash_nuevo, user_id, hash_anterior)
+    )
+    return cursor.rowcount > 0
+
+
+# Hasta 50 revocaciones vencidas por logout: la tabla no crece sin límite
+_SQL_BARRER_REVOCADOS = '''
+    DELETE FROM tokens_revocados
+    WHERE jti IN (SELECT jti FROM tokens_revocados WHERE expira <= ? LIMIT 50)
+'''
+
+
+def revocar_token(jti: str, expira: float) -> None:
+    """
+    Registra un token revocado en la tabla `tokens_revocados`
+
+    La tabla la comparten todos los workers y pods: un logout vale en
+    cualquiera de ellos. `expira` es el `exp` del token; pasado ese momento
+    la fila se puede borrar porque el JWT ya no es válido.
+    """
+    if usa_repositorio():
+        get_repositorio().revocar_token(jti, expira)
+    else:
+        get_writer().execute(_revocar_token, jti, expira)
+
+
+def _revocar_token(conn, jti: str, expira: float) -> None:
+    conn.execute(_SQL_BARRER_REVOCADOS, (time.time(),))
+    conn.execute("INSERT OR IGNORE INTO tokens_revocados (jti, expira) VALUES (?, ?)", (jti, expira))
+
+
+def token_revocado(jti: str) -> bool:
+    """
+    True si el token fue revocado
+
+    Se lee siempre en el primario: una réplica atrasada dejaría pasar un
+    token recién revocado.
+    """
+    if usa_repositorio():
+        return get_repositorio().token_revocado(jti)
+    
+    with get_connection() as conn:
+        fila = conn.execute("SELECT 1 FROM tokens_revocados WHERE jti = ?", (jti,)).fetchone()
+    return fila is not None
@@ -1,52 +1,147 @@
 import logging
-from typing import List, Optional, Dict
-from app.database import get_db_connection
+import sqlite3
+import time
+from typing import List, Optional, Dict, Tuple
+from app.cache import get_cache
+from app.config import settings
+from app.database import anotar_escritura, get_repositorio, get_writer, leer, usa_repositorio
+from app.errors import AutoNoDisponibleError, IdempotencyKeyReutilizadaError, StockAgotadoError, VentaRechazadaError
+from app.http_cache import etag, nueva_version
+from app.idempotency import ClaveIdempotencia
+from app.search import buscar_autos, normalizar_texto
+from app.utils.money import format_monto
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+CATALOGO_CACHE = "catalogo_autos"
+
+# Claves de escritura para leer lo propio en las réplicas (ver app/replicas.py)
+CLAVE_CATALOGO = "catalogo"
+
+
+def ahora_venta() -> datetime:
+    """
+    Fecha de una venta nueva en el formato de `CURRENT_TIMESTAMP`: UTC sin
+    zona y sin microsegundos, como el resto de `registro_venta`
+    """
+    return datetime.utcnow().replace(microsecond=0)
+
+
+def _claves_ventas(vendedor_id: Optional[int] = None, sucursal: Optional[Tuple[str, str]] = None) -> List[tuple]:
+    """Claves que marca una venta y que consulta el historial de un vendedor o sucursal"""
+    claves = []
+    if vendedor_id is not None:
+        claves.append(("vendedor", vendedor_id))
+    if sucursal is not None:
+        claves.append(("sucursal", *sucursal))
+    return claves
+
+
+def get_catalogo_cache():
+    """Caché del catálogo de autos (clave: término de búsqueda normalizado)"""
+    return get_cache(
+        CATALOGO_CACHE,
+        max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+        ttl=settings.CATALOG_CACHE_TTL_SECONDS
+    )
+
+
+def normalizar_busqueda(search: Optional[str]) -> str:
+    """Normaliza el término de búsqueda: minúsculas, sin tildes y espacios simples"""
+    return normalizar_texto(search)
+
+
+def invalidar_catalogo() -> None:
+    """Descarta el catálogo cacheado tras un cambio de stock o is_active"""
+    # Antes de vaciar la caché: la próxima lectura no debe volver a cachear
+    # el catálogo de una réplica que todavía no ve el cambio
+    anotar_escritura(CLAVE_CATALOGO)
+    get_catalogo_cache().clear()
+    nueva_version(CLAVE_CATALOGO)
+    logger.info("🧹 Caché del catálogo de autos invalidada")
+
+
+def etag_catalogo() -> str:
+    """ETag de GET /venta/autos: cambia con cada invalidación del catálogo"""
+    return etag(CLAVE_CATALOGO, ventana=settings.CATALOG_CACHE_TTL_SECONDS)
+
 
 def get_autos_disponibles(search: Optional[str] = None) -> List[Dict]:
     """Obtiene lista de autos disponibles, con búsqueda opcional"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    termino = normalizar_busqueda(search)
+    cache = get_catalogo_cache()
     
-    try:
-        if search:
-            cursor.execute('''
-                SELECT id, marca, modelo, anio, precio_referencial, stock
-                FROM autos_disponibles
-                WHERE is_active = 1 AND stock > 0
-                AND (
-                    marca LIKE ? OR 
-                    modelo LIKE ? OR 
-                    CAST(anio AS TEXT) LIKE ?
-                )
-                ORDER BY anio DESC, marca, modelo
-            ''', (f'%{search}%', f'%{search}%', f'%{search}%'))
-        else:
-            cursor.execute('''
-                SELECT id, marca, modelo, anio, precio_referencial, stock
-                FROM autos_disponibles
-                WHERE is_active = 1 AND stock > 0
-                ORDER BY anio DESC, marca, modelo
-            ''')
-        
-        autos = [dict(row) for row in cursor.fetchall()]
+    autos = cache.get(termino)
+    if autos is not None:
         return autos
-        
+    
+    try:
+        autos = _consultar_autos(termino)
     except Exception as e:
         logger.error(f"❌ Error al obtener autos disponibles: {e}")
         return []
-    finally:
-        conn.close()
+    
+    cache.set(termino, autos)
+    return autos
+
+
+def _consultar_autos(termino: str) -> List[Dict]:
+    return leer(_leer_autos, termino, claves=(CLAVE_CATALOGO,))
+
+
+def _leer_autos(destino, termino: str) -> List[Dict]:
+    """Lectura del catálogo en una réplica o el primario (conexión SQLite o repositorio)"""
+    if usa_repositorio():
+        return destino.listar_autos(termino)
+    
+    if termino:
+        return buscar_autos(destino, termino)
+    
+    cursor = destino.cursor()
+    cursor.execute('''
+        SELECT id, marca, modelo, anio, precio_referencial, stock
+        FROM autos_disponibles
+        WHERE is_active = 1 AND stock > 0
+        ORDER BY anio DESC, marca, modelo
+    ''')
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def actualizar_auto(auto_id: int, stock: Optional[int] = None, is_active: Optional[bool] = None) -> bool:
+    """Actualiza stock y/o estado de un auto e invalida el catálogo cacheado"""
+    if stock is None and is_active is None:
+        return False
+    
+    try:
+        if usa_repositorio():
+            actualizado = get_repositorio().actualizar_auto(auto_id, stock, is_active)
+        else:
+            actualizado = get_writer().execute(_actualizar_auto, auto_id, stock, is_active)
+    except Exception as e:
+        logger.error(f"❌ Error al actualizar auto {auto_id}: {e}")
+        return False
+    
+    if actualizado:
+        invalidar_catalogo()
+    return actualizado
+
+
+def _actualizar_auto(conn, auto_id: int, stock: Optional[int], is_active: Optional[bool]) -> bool:
+    cursor = conn.execute('''
+        UPDATE autos_disponibles
+        SET stock = COALESCE(?, stock),
+            is_active = COALESCE(?, is_active)
+        WHERE id = ?
+    ''', (stock, None if is_active is None else int(is_active), auto_id))
+    return cursor.rowcount > 0
 
 
 def registrar_venta(
     vendedor_id: int,
     auto_id: int,
     tipo_compra: str,
-    monto_fisco: str,
+    monto_centimos: int,
     nombre_comprador: str,
     dni_comprador: str,
     contacto_comprador: str,
@@ -54,71 +149,437 @@ def registrar_venta(
     sucursal_distrito: str,
     nombre_vendedor: str
 ) -> Optional[int]:
-    """Registra una nueva venta en la base de datos"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """
+    Registra una nueva venta en la base de datos y descuenta una unidad de stock
+
+    En SQLite la inserción se encola en el escritor único, que la confirma
+    junto con otras ventas concurrentes en un mismo commit; con otro backend
+    la hace el repositorio SQLAlchemy en su propia transacción. El descuento de
+    stock es un UPDATE condicionado a `stock > 0` dentro de la misma
+    transacción, así que dos vendedores nunca venden la última unidad dos
+    veces. El monto se guarda en céntimos (`monto_centimos`) y, por
+    compatibilidad, también como texto formateado en `monto_fisco`.
+
+    Raises:
+        StockAgotadoError: no quedan unidades del auto
+        AutoNoDisponibleError: el auto no existe o está desactivado
+    """
+    venta_id, _ = _registrar_venta(_nueva_venta(
+        vendedor_id, auto_id, tipo_compra, monto_centimos, nombre_comprador, dni_comprador,
+        contacto_comprador, sucursal_provincia, sucursal_distrito, nombre_vendedor
+    ))
+    return venta_id
+
+
+def registrar_venta_idempotente(idempotencia: ClaveIdempotencia, **datos) -> Tuple[Optional[int], bool]:
+    """
+    Registra una venta con Idempotency-Key (`datos`: los de registrar_venta)
+
+    La clave se guarda en la tabla `idempotencia` en la misma transacción
+    que la venta, así que la comparten todos los workers y réplicas, y nunca
+    queda una venta sin su clave (ni al revés). Si la clave ya tiene una
+    venta vigente se devuelve esa venta: primero con una lectura, sin pasar
+    por el escritor, y si no, dentro de la transacción de escritura, que es
+    la que decide entre dos intentos simultáneos.
+
+    Returns:
+        (venta_id, repetida): repetida es True si la venta ya existía
+
+    Raises:
+        IdempotencyKeyReutilizadaError: la clave es de una venta con otros datos
+        StockAgotadoError / AutoNoDisponibleError: como registrar_venta
+    """
+    try:
+        previa = leer(_leer_idempotencia, idempotencia.clave)
+    except Exception as e:
+        logger.error(f"❌ Error al leer Idempotency-Key: {e}")
+        previa = None
+    
+    if previa is not None:
+        huella, venta_id = previa
+        if huella != idempotencia.huella:
+            raise IdempotencyKeyReutilizadaError("La Idempotency-Key ya se usó con otros datos de venta")
+        return venta_id, True
+    
+    return _registrar_venta(_nueva_venta(**datos), idempotencia)
+
+
+def _nueva_venta(
+    vendedor_id: int,
+    auto_id: int,
+    tipo_compra: str,
+    monto_centimos: int,
+    nombre_comprador: str,
+    dni_comprador: str,
+    contacto_comprador: str,
+    sucursal_provincia: str,
+    sucursal_distrito: str,
+    nombre_vendedor: str
+) -> Dict:
+    """Fila de registro_venta, en el orden de _SQL_INSERTAR_VENTA"""
+    return {
+        "vendedor_id": vendedor_id, "auto_id": auto_id, "tipo_compra": tipo_compra,
+        "monto_fisco": format_monto(monto_centimos), "monto_centimos": monto_centimos,
+        "nombre_comprador": nombre_comprador, "dni_comprador": dni_comprador,
+        "contacto_comprador": contacto_comprador, "sucursal_provincia": sucursal_provincia,
+        "sucursal_distrito": sucursal_distrito, "nombre_vendedor": nombre_vendedor,
+        "fecha_venta": ahora_venta()
+    }
+
+
+def _registrar_venta(venta: Dict, idempotencia: Optional[ClaveIdempotencia] = None) -> Tuple[Optional[int], bool]:
+    """Inserta la venta (y su clave, si hay) en el escritor o el repositorio"""
+    auto_id, nombre_vendedor = venta["auto_id"], venta["nombre_vendedor"]
+    repetida = False
     
     try:
-        cursor.execute('''
-            INSERT INTO registro_venta (
-                vendedor_id, auto_id, tipo_compra, monto_fisco,
-                nombre_comprador, dni_comprador, contacto_comprador,
-                sucursal_provincia, sucursal_distrito, nombre_vendedor, fecha_venta
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            vendedor_id, auto_id, tipo_compra, monto_fisco,
-            nombre_comprador, dni_comprador, contacto_comprador,
-            sucursal_provincia, sucursal_distrito, nombre_vendedor, datetime.now()
-        ))
-        
-        venta_id = cursor.lastrowid
-        conn.commit()
-        
-        logger.info(f"✅ Venta registrada exitosamente - ID: {venta_id}")
-        logger.info(f"   - Vendedor: {nombre_vendedor} ({sucursal_provincia}/{sucursal_distrito})")
-        logger.info(f"   - Comprador: {nombre_comprador} (DNI: {dni_comprador})")
-        logger.info(f"   - Monto: {monto_fisco}")
-        
-        return venta_id
+        if usa_repositorio():
+            if idempotencia is None:
+                venta_id, stock_restante = get_repositorio().registrar_venta(venta)
+            else:
+                venta_id, stock_restante, repetida = get_repositorio().registrar_venta_idempotente(venta, *idempotencia)
+        elif idempotencia is None:
+            venta_id, stock_restante = get_writer().execute(_insertar_venta, tuple(venta.values()))
+        else:
+            venta_id, stock_restante, repetida = get_writer().execute(
+                _insertar_venta_idempotente, tuple(venta.values()), idempotencia
+            )
         
+    except VentaRechazadaError as e:
+        logger.warning(f"⚠️ Venta rechazada - Auto: {auto_id} - Vendedor: {nombre_vendedor}: {e}")
+        raise
     except Exception as e:
         logger.error(f"❌ Error al registrar venta: {e}")
-        conn.rollback()
-        return None
-    finally:
-        conn.close()
+        return None, False
+    
+    if repetida:
+        logger.info(f"🔁 Venta {venta_id} ya registrada con la misma Idempotency-Key - Vendedor: {nombre_vendedor}")
+        return venta_id, True
+    
+    sucursal_provincia, sucursal_distrito = venta["sucursal_provincia"], venta["sucursal_distrito"]
+    anotar_escritura(*_claves_ventas(venta["vendedor_id"], (sucursal_provincia, sucursal_distrito)))
+    
+    # El catálogo muestra el stock de cada auto: cualquier venta lo cambia
+    invalidar_catalogo()
+    
+    logger.info(
+        f"✅ Venta registrada exitosamente - ID: {venta_id} - Vendedor: {nombre_vendedor} "
+        f"({sucursal_provincia}/{sucursal_distrito}) - Monto: {venta['monto_fisco']}",
+        extra={"venta_id": venta_id, "vendedor_id": venta["vendedor_id"], "auto_id": auto_id, "stock_restante": stock_restante}
+    )
+    
+    return venta_id, False
+
+
+_SQL_INSERTAR_VENTA = '''
+    INSERT INTO registro_venta (
+        vendedor_id, auto_id, tipo_compra, monto_fisco, monto_centimos,
+        nombre_comprador, dni_comprador, contacto_comprador,
+        sucursal_provincia, sucursal_distrito, nombre_vendedor, fecha_venta
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _reservar_stock(conn, auto_id: int, unidades: int = 1) -> int:
+    """
+    Descuenta unidades de stock solo si alcanzan; devuelve el stock restante
+
+    Raises:
+        StockAgotadoError / AutoNoDisponibleError si no se pudo descontar
+    """
+    fila = conn.execute('''
+        UPDATE autos_disponibles
+        SET stock = stock - ?
+        WHERE id = ? AND is_active = 1 AND stock >= ?
+        RETURNING stock
+    ''', (unidades, auto_id, unidades)).fetchone()
+    
+    if fila is not None:
+        return fila[0]
+    
+    existe = conn.execute(
+        "SELECT 1 FROM autos_disponibles WHERE id = ? AND is_active = 1", (auto_id,)
+    ).fetchone()
+    if existe is None:
+        raise AutoNoDisponibleError("Auto no encontrado")
+    raise StockAgotadoError("Sin stock disponible")
+
+
+def _insertar_venta(conn, params: tuple) -> Tuple[int, int]:
+    """Operación de escritura: reserva stock e inserta la venta (el commit lo hace el escritor)"""
+    stock_restante = _reservar_stock(conn, params[1])
+    cursor = conn.execute(_SQL_INSERTAR_VENTA, params)
+    return cursor.lastrowid, stock_restante
+
+
+# Hasta 50 claves vencidas por venta: la tabla se limpia al ritmo en que crece
+_SQL_BARRER_IDEMPOTENCIA = '''
+    DELETE FROM idempotencia
+    WHERE clave IN (SELECT clave FROM idempotencia WHERE expira <= ? LIMIT 50)
+'''
+
+
+def _insertar_venta_idempotente(conn, params: tuple, idempotencia: ClaveIdempotencia) -> Tuple[int, Optional[int], bool]:
+    """
+    Operación de escritura: como _insertar_venta, pero si la clave ya tiene
+    una venta vigente la devuelve sin insertar nada
+
+    El escritor abre la transacción con BEGIN IMMEDIATE: entre workers que
+    comparten el archivo, la consulta y la inserción de la clave no se
+    intercalan con las de otro intento.
+
+    Returns:
+        (venta_id, stock restante o None si ya existía, True si ya existía)
+    """
+    clave, huella, expira = idempotencia
+    ahora = time.time()
+    conn.execute(_SQL_BARRER_IDEMPOTENCIA, (ahora,))
+    previa = conn.execute(
+        "SELECT huella, venta_id FROM idempotencia WHERE clave = ? AND expira > ?", (clave, ahora)
+    ).fetchone()
+    if previa is not None:
+        if previa[0] != huella:
+            raise IdempotencyKeyReutilizadaError("La Idempotency-Key ya se usó con otros datos de venta")
+        return previa[1], None, True
+    
+    venta_id, stock_restante = _insertar_venta(conn, params)
+    # OR REPLACE: una fila vencida de la misma clave que el barrido no alcanzó
+    conn.execute(
+        "INSERT OR REPLACE INTO idempotencia (clave, huella, venta_id, expira) VALUES (?, ?, ?, ?)",
+        (clave, huella, venta_id, expira)
+    )
+    return venta_id, stock_restante, False
+
+
+def _leer_idempotencia(destino, clave: str) -> Optional[Tuple[str, int]]:
+    """(huella, venta_id) de una clave vigente en una réplica o el primario"""
+    if usa_repositorio():
+        return destino.leer_idempotencia(clave)
+    
+    fila = destino.execute(
+        "SELECT huella, venta_id FROM idempotencia WHERE clave = ? AND expira > ?", (clave, time.time())
+    ).fetchone()
+    return (fila[0], fila[1]) if fila is not None else None
+
+
+def registrar_ventas_lote(
+    vendedor_id: int,
+    sucursal_provincia: str,
+    sucursal_distrito: str,
+    nombre_vendedor: str,
+    ventas: List[Dict]
+) -> List[Dict]:
+    """
+    Registra un lote de ventas ya validadas de un mismo vendedor
+
+    Las filas se insertan con executemany en tramos de
+    VENTAS_LOTE_CHUNK_SIZE; cada tramo es una operación del escritor (o
+    una transacción del repositorio) que también descuenta el stock de sus
+    autos. Si un tramo falla (un auto_id
+    inexistente, stock insuficiente), ese tramo se reintenta fila por fila
+    para identificar las filas con error sin descartar las demás.
 
+    Args:
+        ventas: dicts con auto_id, tipo_compra, monto_centimos,
+            nombre_comprador, dni_comprador, contacto_comprador y, opcional,
+            fecha_venta (UTC sin zona)
 
-def get_ventas_by_vendedor(vendedor_id: int, limit: int = 50) -> List[Dict]:
-    """Obtiene las últimas ventas de un vendedor"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    Returns:
+        Un dict por venta, en el mismo orden: {"venta_id": int} o {"error": str}
+    """
+    ahora = ahora_venta()
+    filas = [
+        {
+            "vendedor_id": vendedor_id, "auto_id": v["auto_id"], "tipo_compra": v["tipo_compra"],
+            "monto_fisco": format_monto(v["monto_centimos"]), "monto_centimos": v["monto_centimos"],
+            "nombre_comprador": v["nombre_comprador"], "dni_comprador": v["dni_comprador"],
+            "contacto_comprador": v["contacto_comprador"], "sucursal_provincia": sucursal_provincia,
+            "sucursal_distrito": sucursal_distrito, "nombre_vendedor": nombre_vendedor,
+            "fecha_venta": v.get("fecha_venta") or ahora
+        }
+        for v in ventas
+    ]
     
+    chunk = settings.VENTAS_LOTE_CHUNK_SIZE
+    resultados: List[Dict] = []
+    
+    for inicio in range(0, len(filas), chunk):
+        tramo = filas[inicio:inicio + chunk]
+        try:
+            if usa_repositorio():
+                resultados_tramo = get_repositorio().registrar_ventas_lote(tramo)
+                resultados_tramo = [
+                    r if "venta_id" in r else {"error": _describir_error(r["error"])}
+                    for r in resultados_tramo
+                ]
+            else:
+                resultados_tramo = get_writer().execute(
+                    _insertar_lote, [tuple(fila.values()) for fila in tramo]
+                )
+            resultados.extend(resultados_tramo)
+        except Exception as e:
+            logger.error(f"❌ Error al registrar lote de ventas: {e}")
+            resultados.extend({"error": "Error al registrar la venta"} for _ in tramo)
+    
+    registradas = sum(1 for r in resultados if "venta_id" in r)
+    if registradas:
+        anotar_escritura(*_claves_ventas(vendedor_id, (sucursal_provincia, sucursal_distrito)))
+        invalidar_catalogo()
+    logger.info(
+        f"✅ Lote de ventas registrado - Vendedor: {nombre_vendedor} "
+        f"({sucursal_provincia}/{sucursal_distrito}) - {registradas}/{len(filas)} ventas",
+        extra={"vendedor_id": vendedor_id, "registradas": registradas, "fallidas": len(filas) - registradas}
+    )
+    return resultados
+
+
+def _insertar_lote(conn, filas: List[tuple]) -> List[Dict]:
+    """
+    Operación de escritura: inserta un tramo con executemany
+
+    Returns:
+        List[Dict]: {"venta_id": int} o {"error": str} por fila
+    """
+    unidades: Dict[int, int] = {}
+    for fila in filas:
+        unidades[fila[1]] = unidades.get(fila[1], 0) + 1
+    
+    conn.execute("SAVEPOINT lote")
+    try:
+        for auto_id, cantidad in unidades.items():
+            _reservar_stock(conn, auto_id, cantidad)
+        conn.executemany(_SQL_INSERTAR_VENTA, filas)
+        # El escritor es el único que inserta: los ids del tramo son consecutivos
+        ultimo_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        conn.execute("RELEASE lote")
+        primer_id = ultimo_id - len(filas) + 1
+        return [{"venta_id": primer_id + i} for i in range(len(filas))]
+    except (sqlite3.Error, VentaRechazadaError):
+        conn.execute("ROLLBACK TO lote")
+        conn.execute("RELEASE lote")
+    
+    resultados = []
+    for fila in filas:
+        conn.execute("SAVEPOINT fila")
+        try:
+            _reservar_stock(conn, fila[1])
+            venta_id = conn.execute(_SQL_INSERTAR_VENTA, fila).lastrowid
+            conn.execute("RELEASE fila")
+            resultados.append({"venta_id": venta_id})
+        except (sqlite3.Error, VentaRechazadaError) as e:
+            conn.execute("ROLLBACK TO fila")
+            conn.execute("RELEASE fila")
+            resultados.append({"error": _describir_error(e)})
+    return resultados
+
+
+def _describir_error(error: Exception) -> str:
+    if isinstance(error, VentaRechazadaError):
+        return str(error)
+    # Los mensajes varían por motor: "FOREIGN KEY constraint failed",
+    # "violates foreign key constraint", "a foreign key constraint fails"...
+    mensaje = str(error).lower()
+    if "foreign key" in mensaje:
+        return "Auto no encontrado"
+    if "check" in mensaje:
+        return "Datos de la venta no válidos"
+    return "Error al registrar la venta"
+
+
+def get_ventas_by_vendedor(
+    vendedor_id: int,
+    limit: int = 50,
+    monto_min: Optional[int] = None,
+    monto_max: Optional[int] = None,
+    despues_de: Optional[Tuple[str, int]] = None
+) -> List[Dict]:
+    """
+    Obtiene las ventas de un vendedor, de la más reciente a la más antigua
+
+    `despues_de` es la clave (fecha_venta, id) de la última venta de la
+    página anterior. `monto_min` y `monto_max` (en céntimos) filtran por
+    rango de monto en SQL.
+    """
     try:
-        cursor.execute('''
+        return listar_ventas(
+            vendedor_id=vendedor_id,
+            limit=limit,
+            monto_min=monto_min,
+            monto_max=monto_max,
+            despues_de=despues_de
+        )
+    except Exception as e:
+        logger.error(f"❌ Error al obtener ventas del vendedor: {e}")
+        return []
+
+
+def listar_ventas(
+    vendedor_id: Optional[int] = None,
+    sucursal: Optional[Tuple[str, str]] = None,
+    limit: int = 50,
+    monto_min: Optional[int] = None,
+    monto_max: Optional[int] = None,
+    despues_de: Optional[Tuple[str, int]] = None
+) -> List[Dict]:
+    """
+    Página de ventas por keyset sobre (fecha_venta, id), en orden descendente
+
+    Filtra por vendedor o por sucursal (provincia, distrito); ambos recorren
+    su índice compuesto con fecha_venta e id, así que cada página cuesta lo
+    mismo sin importar cuán atrás esté. Se lee de una réplica salvo que
+    el vendedor o la sucursal acaben de registrar ventas que la réplica aún
+    no tiene. Los errores se propagan.
+    """
+    claves = _claves_ventas(vendedor_id, sucursal)
+    if usa_repositorio():
+        filtros = {
+            "vendedor_id": vendedor_id, "sucursal": sucursal, "limit": limit,
+            "monto_min": monto_min, "monto_max": monto_max, "despues_de": despues_de
+        }
+        return leer(lambda repositorio: repositorio.listar_ventas(**filtros), claves=claves)
+    
+    condiciones = []
+    params: list = []
+    if vendedor_id is not None:
+        condiciones.append("rv.vendedor_id = ?")
+        params.append(vendedor_id)
+    if sucursal is not None:
+        condiciones.append("rv.sucursal_provincia = ? AND rv.sucursal_distrito = ?")
+        params.extend(sucursal)
+    if monto_min is not None:
+        condiciones.append("rv.monto_centimos >= ?")
+        params.append(monto_min)
+    if monto_max is not None:
+        condiciones.append("rv.monto_centimos <= ?")
+        params.append(monto_max)
+    if despues_de is not None:
+        condiciones.append("(rv.fecha_venta, rv.id) < (?, ?)")
+        params.extend(despues_de)
+    params.append(limit)
+    
+    where = " AND ".join(condiciones) if condiciones else "1 = 1"
+    
+    return leer(_leer_filas, f'''
             SELECT 
                 rv.id,
                 rv.fecha_venta,
                 rv.monto_fisco,
+                rv.monto_centimos,
                 rv.nombre_comprador,
                 rv.dni_comprador,
                 rv.contacto_comprador,
                 a.marca || ' ' || a.modelo || ' ' || a.anio AS auto,
                 rv.tipo_compra,
                 rv.sucursal_provincia,
-                rv.sucursal_distrito
+                rv.sucursal_distrito,
+                rv.nombre_vendedor
             FROM registro_venta rv
             JOIN autos_disponibles a ON rv.auto_id = a.id
-            WHERE rv.vendedor_id = ?
-            ORDER BY rv.fecha_venta DESC
+            WHERE {where}
+            ORDER BY rv.fecha_venta DESC, rv.id DESC
             LIMIT ?
-        ''', (vendedor_id, limit))
-        
-        ventas = [dict(row) for row in cursor.fetchall()]
-        return ventas
-        
-    except Exception as e:
-        logger.error(f"❌ Error al obtener ventas del vendedor: {e}")
-        return []
-    finally:
-        conn.close()
\ No newline at end of file
+        ''', params, claves=claves)
+
+
+def _leer_filas(conn, sql: str, params: list) -> List[Dict]:
+    return [dict(row) for row in conn.execute(sql, params).fetchall()]
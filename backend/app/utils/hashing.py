@@ -0,0 +1,60 @@
+"""
+Hash y verificación de contraseñas (funciones puras, bloqueantes)
+
+Corren en los procesos del pool de app/passwords.py, por eso este módulo no
+importa la configuración ni nada de la aplicación: cada proceso solo carga
+bcrypt. `rondas` llega como argumento desde PASSWORD_BCRYPT_ROUNDS.
+
+Se usa el paquete `bcrypt` directamente: passlib 1.7.4 falla con bcrypt >= 5
+(su autodiagnóstico hashea una contraseña de más de 72 bytes).
+"""
+import hashlib
+import hmac
+import os
+from typing import Optional, Tuple
+
+import bcrypt
+
+
+def _bytes(password: str) -> bytes:
+    # bcrypt solo usa los primeros 72 bytes; bcrypt >= 5 rechaza los más largos
+    return password.encode("utf-8")[:72]
+
+
+def es_hash_heredado(hashed: str) -> bool:
+    """True si `hashed` es un SHA-256 hexadecimal sin sal (formato anterior)"""
+    return len(hashed) == 64 and all(c in "0123456789abcdef" for c in hashed)
+
+
+def hashear(password: str, rondas: int) -> str:
+    """Hash bcrypt con `rondas` de costo"""
+    return bcrypt.hashpw(_bytes(password), bcrypt.gensalt(rondas)).decode("ascii")
+
+
+def verificar(password: str, hashed: str, rondas: int) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica `password` contra `hashed` (bcrypt o SHA-256 heredado)
+
+    Returns:
+        (correcta, nuevo_hash): nuevo_hash es el bcrypt que debe reemplazar a
+        `hashed` (formato heredado o costo distinto de `rondas`), o None
+    """
+    if hashed.startswith("$2"):
+        try:
+            correcta = bcrypt.checkpw(_bytes(password), hashed.encode("ascii"))
+        except ValueError:
+            return False, None
+        if correcta and int(hashed.split("$")[2]) != rondas:
+            return True, hashear(password, rondas)
+        return correcta, None
+
+    if es_hash_heredado(hashed):
+        correcta = hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
+        return correcta, (hashear(password, rondas) if correcta else None)
+
+    return False, None
+
+
+def listo() -> int:
+    """Tarea vacía para arrancar los procesos del pool por adelantado"""
+    return os.getpid()
@@ -0,0 +1,60 @@
+"""
+Montos en soles
+
+En la base de datos los montos se guardan como enteros en céntimos
+(`registro_venta.monto_centimos`); el texto "S/. 85,000.00" solo se produce
+al responder, con `format_monto`.
+"""
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Union
+
+_PREFIJOS = re.compile(r"^\s*(S/\.?|PEN|S\.)\s*", re.IGNORECASE)
+_DECIMAL_CON_COMA = re.compile(r"^\d+,\d{1,2}$")
+
+# Tope en céntimos (10^13 soles): cabe holgado en el INTEGER de SQLite y en
+# el BIGINT del repositorio, ambos de 64 bits
+MAX_CENTIMOS = 10 ** 15
+
+
+def parse_monto(valor: Union[str, int, float, Decimal]) -> int:
+    """
+    Convierte un monto a céntimos
+
+    Acepta números o textos como "S/. 85,000.00", "85000", "85,000.5" o
+    "85000,50" (coma decimal). Lanza ValueError si no es un monto positivo o supera
+    `MAX_CENTIMOS`.
+    """
+    if isinstance(valor, bool):
+        raise ValueError("Monto inválido")
+
+    if isinstance(valor, (int, float, Decimal)):
+        numero = Decimal(str(valor))
+    else:
+        texto = _PREFIJOS.sub("", str(valor)).replace(" ", "")
+        if _DECIMAL_CON_COMA.match(texto):
+            texto = texto.replace(",", ".")
+        else:
+            texto = texto.replace(",", "")
+        try:
+            numero = Decimal(texto)
+        except InvalidOperation:
+            raise ValueError(f"Monto inválido: {valor!r}")
+
+    if not numero.is_finite() or numero <= 0:
+        raise ValueError(f"El monto debe ser mayor a cero: {valor!r}")
+
+    try:
+        centimos = int((numero * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ArithmeticError):
+        raise ValueError(f"Monto fuera de rango: {valor!r}")
+
+    # Un monto menor a medio céntimo se redondea a 0
+    if not 0 < centimos <= MAX_CENTIMOS:
+        raise ValueError(f"Monto fuera de rango: {valor!r}")
+    return centimos
+
+
+def format_monto(centimos: int) -> str:
+    """Formatea céntimos como texto para la API: 8500000 -> "S/. 85,000.00" """
+    return f"S/. {centimos // 100:,}.{centimos % 100:02d}"
@@ -0,0 +1,29 @@
+"""
+Paginación por keyset con cursores opacos
+
+El cursor codifica la última clave entregada, (fecha_venta, id), en base64
+URL-safe. El cliente solo lo devuelve tal cual en `cursor` para pedir la
+página siguiente; la consulta continúa desde esa clave usando el índice en
+lugar de saltar filas con OFFSET.
+"""
+import base64
+import json
+from typing import Tuple
+
+
+def encode_cursor(fecha_venta: str, venta_id: int) -> str:
+    """Codifica la clave (fecha_venta, id) de la última fila entregada"""
+    data = json.dumps([str(fecha_venta), int(venta_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decodifica un cursor; lanza ValueError si fue alterado o es inválido"""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        fecha_venta, venta_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if not isinstance(fecha_venta, str) or not isinstance(venta_id, int):
+            raise ValueError
+        return fecha_venta, venta_id
+    except Exception:
+        raise ValueError("Cursor inválido")
@@ -0,0 +1,33 @@
+"""
+Serialización JSON con orjson
+
+La aplicación usa `ORJSONResponse` como clase de respuesta por defecto: las
+rutas con un `response_model` tipado se validan y serializan con
+pydantic-core y el cuerpo lo escribe orjson, sin pasar por la reflexión de
+`jsonable_encoder`.
+
+Las listas grandes de filas (catálogo, historial de ventas) van por
+`respuesta_filas`: los dicts que salen de la consulta se escriben tal cual
+con orjson, sin construir un modelo por fila. El `response_model` de esas
+rutas documenta la forma en OpenAPI; las filas ya tienen esas columnas
+porque las arma la propia consulta.
+"""
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# Mismas opciones que ORJSONResponse; PASSTHROUGH_DATETIME + default=str
+# escribe las fechas del repositorio como "AAAA-MM-DD HH:MM:SS", igual que
+# las cadenas que devuelve SQLite
+_OPCIONES_NDJSON = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+
+
+def respuesta_filas(contenido: Any, headers: Optional[Dict[str, str]] = None, status_code: int = 200) -> ORJSONResponse:
+    """Respuesta JSON escrita directamente desde dicts/listas de filas"""
+    return ORJSONResponse(contenido, status_code=status_code, headers=headers)
+
+
+def linea_ndjson(fila: Dict[str, Any]) -> bytes:
+    """Una fila como línea NDJSON (UTF-8, terminada en salto de línea)"""
+    return orjson.dumps(fila, default=str, option=_OPCIONES_NDJSON)
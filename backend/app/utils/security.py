@@ -1,26 +1,38 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from app.cache import get_cache
 from app.config import settings
+from app.db_executor import run_db
+from app.services.auth_service import get_perfiles_cache, get_user, get_user_by_id, revocar_token, token_revocado
+from app.utils.hashing import hashear, verificar
+
+TOKENS_CACHE = "tokens_verificados"
+REVOCADOS_CACHE = "tokens_revocados"
 
-# Contexto para encriptar contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica si la contraseña es correcta"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """
+    Verifica si la contraseña es correcta (bloqueante)
+
+    Para scripts; las rutas usan `app.passwords.verificar_password`, que no
+    ejecuta bcrypt en el event loop.
+    """
+    return verificar(plain_password, hashed_password, settings.PASSWORD_BCRYPT_ROUNDS)[0]
 
 
 def get_password_hash(password: str) -> str:
-    """Genera hash de una contraseña"""
-    return pwd_context.hash(password)
+    """Genera hash bcrypt de una contraseña (bloqueante, ver verify_password)"""
+    return hashear(password, settings.PASSWORD_BCRYPT_ROUNDS)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -32,23 +44,128 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti: identificador único para que /auth/logout revoque solo este token
+    to_encode.update({"exp": expire, "jti": secrets.token_hex(8)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
 
 
+def get_tokens_cache():
+    """Caché de tokens ya verificados (clave: hash SHA-256 del token)"""
+    return get_cache(
+        TOKENS_CACHE,
+        max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+        ttl=settings.TOKEN_CACHE_TTL_SECONDS
+    )
+
+
+def get_revocados_cache():
+    """
+    Copia local de tokens revocados (clave: jti)
+
+    La fuente es la tabla `tokens_revocados`; aquí solo se recuerdan los
+    revocados ya vistos por este proceso, hasta el `exp` de cada token, para
+    no volver a consultarlos. Desalojar una entrada no la "des-revoca".
+    """
+    return get_cache(
+        REVOCADOS_CACHE,
+        max_entries=settings.TOKEN_REVOCATION_MAX_ENTRIES,
+        ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decodifica y valida un token JWT"""
+    """
+    Decodifica y valida un token JWT
+
+    Los payloads verificados se memorizan por hash del token hasta
+    TOKEN_CACHE_TTL_SECONDS, nunca más allá de su `exp`, para no repetir la
+    verificación HMAC en cada request del mismo cliente. No consulta las
+    revocaciones: eso lo hace `get_current_user` con `esta_revocado`.
+    """
+    clave = _hash_token(token)
+    
+    cache_ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    ahora = time.time()
+    
+    if cache_ttl > 0:
+        payload = get_tokens_cache().get(clave)
+        if payload is not None and payload.get("exp", 0) > ahora:
+            return payload
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    if cache_ttl > 0:
+        ttl = min(cache_ttl, payload.get("exp", ahora) - ahora)
+        if ttl > 0:
+            get_tokens_cache().set(clave, payload, ttl=ttl)
+    
+    return payload
+
+
+def _jti(payload: dict, token: str) -> str:
+    # Tokens sin jti (emitidos antes de /auth/logout): se usa el hash del token
+    return payload.get("jti") or _hash_token(token)
+
+
+def revoke_access_token(token: str) -> None:
+    """
+    Revoca un token hasta su expiración (bloqueante: escribe en la base)
+
+    La revocación se guarda en la tabla compartida `tokens_revocados`, de
+    modo que el token deja de valer en todos los workers y pods.
+    """
+    try:
+        payload = jwt.get_unverified_claims(token)
+    except JWTError:
+        return
+    
+    exp = payload.get("exp", 0)
+    ttl = exp - time.time()
+    if ttl > 0:
+        jti = _jti(payload, token)
+        revocar_token(jti, exp)
+        get_revocados_cache().set(jti, True, ttl=ttl)
+    get_tokens_cache().delete(_hash_token(token))
+
+
+async def esta_revocado(payload: dict, token: str) -> bool:
+    """
+    True si el token fue revocado en cualquier worker o pod
+
+    Un revocado ya visto responde desde la caché local; si no, se consulta
+    la tabla `tokens_revocados` (una búsqueda por clave primaria).
+    """
+    jti = _jti(payload, token)
+    if get_revocados_cache().get(jti) is not None:
+        return True
+    
+    if not await run_db(token_revocado, jti):
+        return False
+    
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        get_revocados_cache().set(jti, True, ttl=ttl)
+    return True
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
-    """Obtiene el usuario actual desde el token"""
+    """
+    Obtiene el vendedor actual desde el token
+
+    El token solo identifica al vendedor (sub y uid); nombre, sucursal y
+    estado salen de su perfil cacheado, que se invalida al editarlo, así que
+    un cambio o una desactivación valen desde el siguiente request y no
+    cuando el token expira. Devuelve el perfil más la clave "token".
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -57,7 +174,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     
     payload = decode_access_token(token)
     
-    if payload is None:
+    if payload is None or await esta_revocado(payload, token):
         raise credentials_exception
     
     username: str = payload.get("sub")
@@ -65,4 +182,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     if username is None:
         raise credentials_exception
     
-    return {"username": username, "token": token}
\ No newline at end of file
+    # Con el perfil en caché no hace falta pasar por el executor de BD
+    uid = payload.get("uid")
+    if uid is not None:
+        perfil = get_perfiles_cache().get(("id", uid)) or await run_db(get_user_by_id, uid)
+    else:
+        perfil = get_perfiles_cache().get(("username", username)) or await run_db(get_user, username)
+    
+    if not perfil or perfil["username"] != username or not perfil.get("is_active", 0):
+        raise credentials_exception
+    
+    return {**perfil, "token": token}
@@ -0,0 +1,7 @@
+"""
+Benchmarks y pruebas de carga del backend
+
+Todos los scripts se ejecutan sin red, contra una base SQLite temporal:
+
+    python -m benchmarks.load_test
+"""
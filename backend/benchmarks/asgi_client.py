@@ -0,0 +1,124 @@
+"""
+Cliente ASGI mínimo en proceso
+
+Permite enviar requests a `app.main:app` sin levantar uvicorn ni abrir
+sockets, de modo que los benchmarks midan solo el costo de la aplicación.
+"""
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+class ASGIResponse:
+    """Respuesta capturada de la aplicación ASGI"""
+
+    def __init__(self, status_code: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status_code = status_code
+        self.raw_headers = headers
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in headers}
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class ASGIClient:
+    """Envía requests HTTP directamente a una aplicación ASGI"""
+
+    def __init__(self, app, client_host: str = "127.0.0.1"):
+        self.app = app
+        self.client_host = client_host
+
+    async def startup(self, timeout: float = 60.0) -> None:
+        """Ejecuta los eventos de inicio y espera a que /ready responda 200"""
+        await self.app.router.startup()
+        limite = asyncio.get_running_loop().time() + timeout
+        while (await self.get("/ready")).status_code != 200:
+            if asyncio.get_running_loop().time() > limite:
+                raise RuntimeError(f"La aplicación no quedó lista en {timeout}s")
+            await asyncio.sleep(0.01)
+
+    async def shutdown(self) -> None:
+        await self.app.router.shutdown()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json_body: Any = None,
+        form: Optional[Dict[str, str]] = None,
+        content: Optional[bytes] = None,
+        content_type: Optional[str] = None
+    ) -> ASGIResponse:
+        body = b""
+        request_headers = dict(headers or {})
+
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            request_headers.setdefault("content-type", "application/json")
+        elif form is not None:
+            body = urlencode(form).encode()
+            request_headers.setdefault("content-type", "application/x-www-form-urlencoded")
+        elif content is not None:
+            body = content
+            if content_type:
+                request_headers.setdefault("content-type", content_type)
+
+        request_headers.setdefault("host", "testserver")
+        request_headers["content-length"] = str(len(body))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urlencode(params or {}).encode(),
+            "root_path": "",
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in request_headers.items()],
+            "client": (self.client_host, 50000),
+            "server": ("testserver", 80),
+        }
+
+        request_sent = False
+        response_complete = asyncio.Event()
+        status_code = 500
+        response_headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # El cliente solo se "desconecta" cuando la respuesta terminó
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status_code, response_headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_complete.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            response_complete.set()
+        return ASGIResponse(status_code, response_headers, b"".join(chunks))
+
+    async def get(self, path: str, **kwargs) -> ASGIResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> ASGIResponse:
+        return await self.request("POST", path, **kwargs)
@@ -0,0 +1,70 @@
+"""
+Microbenchmark del costo de autenticación por request
+
+Mide `get_current_user` (la dependencia que corre en cada request
+autenticado) con la caché de JWT verificados desactivada y activada.
+Cada request también consulta la tabla de revocados y el perfil del
+vendedor (de su caché), igual que en la API.
+
+Uso:
+    python -m benchmarks.bench_auth --iteraciones 20000
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import VENDEDORES_DEMO, prepare_workdir
+
+
+async def medir(get_current_user, tokens, iteraciones: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(iteraciones):
+        await get_current_user(tokens[i % len(tokens)])
+    return (time.perf_counter() - inicio) / iteraciones * 1_000_000
+
+
+def main(args) -> None:
+    import logging
+    from datetime import timedelta
+
+    from app.config import settings
+    from app.database import init_database, seed_initial_data
+    from app.services.auth_service import get_user
+    from app.utils.security import create_access_token, get_current_user, get_tokens_cache
+
+    logging.disable(logging.CRITICAL)
+    init_database()
+    seed_initial_data()
+
+    vendedores = [get_user(username) for username, _ in VENDEDORES_DEMO]
+    tokens = [
+        create_access_token(
+            {"sub": v["username"], "uid": v["id"]},
+            expires_delta=timedelta(minutes=30)
+        )
+        for v in (vendedores[i % len(vendedores)] for i in range(args.tokens))
+    ]
+
+    ttl_original = settings.TOKEN_CACHE_TTL_SECONDS
+
+    settings.TOKEN_CACHE_TTL_SECONDS = 0
+    sin_cache = asyncio.run(medir(get_current_user, tokens, args.iteraciones))
+
+    settings.TOKEN_CACHE_TTL_SECONDS = ttl_original or 300.0
+    get_tokens_cache().clear()
+    con_cache = asyncio.run(medir(get_current_user, tokens, args.iteraciones))
+
+    print(f"Tokens distintos: {args.tokens}, iteraciones: {args.iteraciones}")
+    print(f"sin caché: {sin_cache:8.2f} µs/request")
+    print(f"con caché: {con_cache:8.2f} µs/request  ({sin_cache / con_cache:.1f}x)")
+    print(f"caché: {get_tokens_cache().stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Costo de autenticación por request")
+    parser.add_argument("--iteraciones", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=50, help="Clientes (tokens) distintos")
+    args = parser.parse_args()
+
+    prepare_workdir()
+    main(args)
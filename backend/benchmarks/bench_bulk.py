@@ -0,0 +1,98 @@
+"""
+Benchmark de registro de ventas: una por request vs por lote
+
+Registra N ventas con POST /venta/registrar (secuencial y con clientes
+concurrentes) y con POST /venta/registrar-lote en lotes de distintos
+tamaños, y reporta ventas/segundo para cada camino.
+
+Uso:
+    python -m benchmarks.bench_bulk --ventas 2000 --clientes 8 --lotes 100,500,2000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import prepare_workdir, reponer_stock
+from benchmarks.load_test import login
+
+
+def generar_ventas(num: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "auto_id": rng.randint(1, 48),
+            "tipo_compra": rng.choice(["Cash", "Crédito"]),
+            "monto_fisco": f"S/. {rng.randint(50000, 250000):,}.00",
+            "nombre_comprador": "Cliente Lote",
+            "dni_comprador": str(rng.randint(10000000, 99999999)),
+            "contacto_comprador": "999888777",
+        }
+        for _ in range(num)
+    ]
+
+
+async def individual(client, headers, ventas: list, clientes: int) -> float:
+    pendientes = list(ventas)
+
+    async def trabajador():
+        while pendientes:
+            venta = pendientes.pop()
+            response = await client.post("/venta/registrar", headers=headers, json_body=venta)
+            if response.status_code != 200:
+                raise RuntimeError(f"/venta/registrar devolvió {response.status_code}")
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*[trabajador() for _ in range(clientes)])
+    return len(ventas) / (time.perf_counter() - inicio)
+
+
+async def por_lote(client, headers, ventas: list, tamanio: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(0, len(ventas), tamanio):
+        response = await client.post("/venta/registrar-lote", headers=headers, json_body=ventas[i:i + tamanio])
+        data = response.json()
+        if response.status_code != 200 or data["fallidas"]:
+            raise RuntimeError(f"/venta/registrar-lote devolvió {response.status_code}")
+    return len(ventas) / (time.perf_counter() - inicio)
+
+
+async def main(args) -> None:
+    import logging
+
+    from benchmarks.asgi_client import ASGIClient
+    from app.main import app
+
+    logging.disable(logging.CRITICAL)
+
+    client = ASGIClient(app)
+    await client.startup()
+    reponer_stock()
+    headers = {"Authorization": f"Bearer {await login(client, 'cmendoza', 'carlos2020')}"}
+    ventas = generar_ventas(args.ventas, args.seed)
+
+    print(f"{args.ventas} ventas por camino\n")
+    print(f"{'camino':<34} {'ventas/s':>10}")
+
+    base = await individual(client, headers, ventas, 1)
+    print(f"{'/registrar (1 cliente)':<34} {base:>10,.0f}")
+    concurrente = await individual(client, headers, ventas, args.clientes)
+    print(f"{f'/registrar ({args.clientes} clientes)':<34} {concurrente:>10,.0f}")
+
+    for tamanio in args.lotes:
+        velocidad = await por_lote(client, headers, ventas, tamanio)
+        print(f"{f'/registrar-lote (lotes de {tamanio})':<34} {velocidad:>10,.0f}  ({velocidad / base:.0f}x)")
+
+    await client.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Registro de ventas individual vs por lote")
+    parser.add_argument("--ventas", type=int, default=2000)
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--lotes", type=lambda s: [int(x) for x in s.split(",")], default=[100, 500, 2000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    prepare_workdir()
+    asyncio.run(main(args))
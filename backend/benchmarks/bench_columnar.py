@@ -0,0 +1,195 @@
+"""
+Benchmark del motor analítico columnar (app.columnar)
+
+Genera ventas sintéticas directamente como arreglos NumPy (por defecto 1M y
+10M filas) y mide:
+- agrupación por provincia × mes
+- top 10 modelos por provincia en los últimos 90 días
+- guardar/cargar la foto .npz
+y compara la agrupación con el enfoque actual de recorrer las filas en
+Python (solo hasta --python-max filas). Con --sqlite-filas también mide la
+construcción de la foto desde una base SQLite real.
+
+Uso:
+    python -m benchmarks.bench_columnar --filas 1000000,10000000 --sqlite-filas 200000
+"""
+import argparse
+import os
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from benchmarks.common import prepare_workdir
+
+PROVINCIAS = {
+    "LIMA": ["Miraflores", "San Isidro", "Surco", "La Molina", "San Borja", "Jesús María"],
+    "AREQUIPA": ["Cercado", "Yanahuara", "Cayma"],
+    "CUSCO": ["Wanchaq", "San Sebastián"],
+    "PIURA": ["Castilla", "Piura Centro"],
+    "AYACUCHO": ["Ayacucho Centro"],
+    "LA LIBERTAD": ["Trujillo", "Víctor Larco"],
+}
+MARCAS = {
+    "Toyota": ["Corolla", "Yaris", "RAV4", "Hilux", "Camry"],
+    "Honda": ["Civic", "Accord", "CR-V", "HR-V"],
+    "Nissan": ["Sentra", "Kicks", "Frontier", "X-Trail"],
+    "Hyundai": ["Accent", "Tucson", "Santa Fe", "Elantra"],
+    "Kia": ["Rio", "Sportage", "Sorento", "Picanto"],
+    "Mazda": ["2", "3", "CX-5", "CX-30"],
+}
+
+
+def generar(num_filas: int, seed: int):
+    """VentasColumnar sintética: 180 días, 12 vendedores, ~25 modelos"""
+    import numpy as np
+
+    from app.columnar import CATEGORICAS, VentasColumnar
+
+    rng = np.random.default_rng(seed)
+    sucursales = [(p, d) for p, ds in PROVINCIAS.items() for d in ds]
+    modelos = [(m, f"{m} {mod}") for m, mods in MARCAS.items() for mod in mods]
+    provincias = list(PROVINCIAS)
+    marcas = list(MARCAS)
+
+    sucursal = rng.integers(0, len(sucursales), num_filas, dtype=np.int32)
+    modelo = rng.integers(0, len(modelos), num_filas, dtype=np.int32)
+    hoy = (date.today() - date(1970, 1, 1)).days
+
+    diccionarios = {
+        "provincia": provincias,
+        "distrito": [d for _, d in sucursales],
+        "vendedor": [f"Vendedor {i}" for i in range(12)],
+        "marca": marcas,
+        "modelo": [etiqueta for _, etiqueta in modelos],
+        "tipo_compra": ["Cash", "Crédito"],
+    }
+    codigos = {
+        "provincia": np.array([provincias.index(p) for p, _ in sucursales], dtype=np.int32)[sucursal],
+        "distrito": sucursal,
+        "vendedor": rng.integers(0, 12, num_filas, dtype=np.int32),
+        "marca": np.array([marcas.index(m) for m, _ in modelos], dtype=np.int32)[modelo],
+        "modelo": modelo,
+        "tipo_compra": rng.integers(0, 2, num_filas, dtype=np.int32),
+    }
+    assert set(codigos) == set(CATEGORICAS)
+
+    return VentasColumnar(
+        dia=(hoy - rng.integers(0, 180, num_filas)).astype(np.int32),
+        monto_centimos=rng.integers(5_000_000, 25_000_000, num_filas, dtype=np.int64),
+        anio=rng.integers(2020, 2026, num_filas).astype(np.int16),
+        codigos=codigos,
+        diccionarios=diccionarios
+    )
+
+
+def cronometrar(fn, repeticiones: int = 3):
+    mejor = float("inf")
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = fn()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000, resultado
+
+
+def agrupar_en_python(filas) -> dict:
+    """Enfoque fila por fila: lo que hoy se hace con el volcado de la tabla"""
+    totales = defaultdict(lambda: [0, 0])
+    for provincia, mes, monto in filas:
+        acumulado = totales[(provincia, mes)]
+        acumulado[0] += 1
+        acumulado[1] += monto
+    return totales
+
+
+def bench_escala(num_filas: int, args) -> None:
+    import numpy as np
+
+    from app.columnar import VentasColumnar
+
+    inicio = time.perf_counter()
+    snapshot = generar(num_filas, args.seed)
+    print(f"\n== {num_filas:,} ventas (generadas en {time.perf_counter() - inicio:.1f}s) ==")
+
+    ms, filas = cronometrar(lambda: snapshot.agrupar(["provincia", "mes"]))
+    print(f"agrupar provincia × mes            {ms:>9.1f} ms  ({len(filas)} grupos)")
+
+    ms, top = cronometrar(lambda: snapshot.top_n("provincia", "modelo", n=10, ultimos_dias=90))
+    print(f"top 10 modelos por provincia (90d) {ms:>9.1f} ms  ({len(top)} provincias)")
+
+    ms, _ = cronometrar(lambda: snapshot.agrupar(["distrito", "vendedor", "tipo_compra"], snapshot.mascara(provincia="LIMA")))
+    print(f"LIMA: distrito × vendedor × tipo   {ms:>9.1f} ms")
+
+    ruta = os.path.abspath(f"ventas_{num_filas}.npz")
+    ms_guardar, _ = cronometrar(lambda: snapshot.guardar(ruta), repeticiones=1)
+    ms_cargar, _ = cronometrar(lambda: VentasColumnar.cargar(ruta), repeticiones=1)
+    print(f"guardar / cargar .npz              {ms_guardar:>9.1f} / {ms_cargar:.1f} ms  ({os.path.getsize(ruta) / 2**20:.1f} MiB)")
+    os.remove(ruta)
+
+    if num_filas <= args.python_max:
+        provincias = np.array(snapshot.diccionarios["provincia"])[snapshot.codigos["provincia"]].tolist()
+        meses = snapshot.dia.astype("datetime64[D]").astype("datetime64[M]").astype(str).tolist()
+        filas_py = list(zip(provincias, meses, snapshot.monto_centimos.tolist()))
+        ms_py, _ = cronometrar(lambda: agrupar_en_python(filas_py), repeticiones=1)
+        ms_np, _ = cronometrar(lambda: snapshot.agrupar(["provincia", "mes"]))
+        print(f"agrupar en Python (fila por fila)  {ms_py:>9.1f} ms  -> {ms_py / ms_np:.0f}x más lento")
+
+
+def bench_sqlite(num_filas: int, args) -> None:
+    import logging
+    import random
+
+    from app.columnar import VentasColumnar
+    from app.database import get_db_connection, init_database, seed_initial_data
+
+    logging.disable(logging.CRITICAL)
+    init_database()
+    seed_initial_data()
+
+    conn = get_db_connection()
+    vendedores = conn.execute("SELECT id, full_name, sucursal_provincia, sucursal_distrito FROM vendedores").fetchall()
+    autos = [row[0] for row in conn.execute("SELECT id FROM autos_disponibles")]
+    rng = random.Random(args.seed)
+    hoy = date.today()
+
+    filas = []
+    for _ in range(num_filas):
+        v = rng.choice(vendedores)
+        monto = rng.randint(5_000_000, 25_000_000)
+        filas.append((
+            (hoy - timedelta(days=rng.randint(0, 180))).isoformat(), v[0], rng.choice(autos),
+            rng.choice(("Cash", "Crédito")), f"S/. {monto / 100:,.2f}", monto,
+            "Comprador", "12345678", "999999999", v[2], v[3], v[1]
+        ))
+    conn.executemany('''
+        INSERT INTO registro_venta (
+            fecha_venta, vendedor_id, auto_id, tipo_compra, monto_fisco, monto_centimos,
+            nombre_comprador, dni_comprador, contacto_comprador,
+            sucursal_provincia, sucursal_distrito, nombre_vendedor
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', filas)
+    conn.commit()
+
+    total = conn.execute("SELECT COUNT(*) FROM registro_venta").fetchone()[0]
+    ms, snapshot = cronometrar(lambda: VentasColumnar.desde_sqlite(conn), repeticiones=1)
+    print(f"\n== Foto desde SQLite: {total:,} ventas en {ms:.0f} ms ({total / ms * 1000:,.0f} filas/s) ==")
+    conn.close()
+
+
+def main(args) -> None:
+    for num_filas in args.filas:
+        bench_escala(num_filas, args)
+    if args.sqlite_filas:
+        bench_sqlite(args.sqlite_filas, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del motor analítico columnar")
+    parser.add_argument("--filas", type=lambda s: [int(x) for x in s.split(",")], default=[1_000_000, 10_000_000])
+    parser.add_argument("--python-max", type=int, default=1_000_000, help="Máximo de filas para la comparación en Python")
+    parser.add_argument("--sqlite-filas", type=int, default=0, help="Ventas a insertar para medir desde_sqlite (0 = omitir)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    prepare_workdir()
+    main(args)
@@ -0,0 +1,172 @@
+"""
+Benchmark de logins con bcrypt: throughput y latencia de las ventas
+
+Lanza una tormenta de logins concurrentes (bcrypt con el costo de
+producción) y, a la vez, un vendedor que consulta el catálogo y registra
+ventas. Reporta logins/segundo, logins rechazados con 503 y las ventas
+atendidas (y su latencia) durante la tormenta, para cada configuración:
+
+- event loop: bcrypt ejecutado directamente en la ruta (lo que pasaría sin
+  el pool de hashing)
+- hilo: PASSWORD_HASH_WORKERS=0 (bcrypt libera el GIL)
+- N procesos: pool de procesos con N workers y N hashes concurrentes
+
+Cada configuración corre en un proceso nuevo. Antes de medir se hace un
+login por vendedor para migrar sus hashes SHA-256 heredados a bcrypt.
+
+Uso:
+    python -m benchmarks.bench_login --rondas 12 --clientes 16 --logins 4 --procesos 1,2,4
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BACKEND_DIR, TERMINOS_BUSQUEDA, VENDEDORES_DEMO, prepare_workdir, reponer_stock, summarize
+
+
+def bcrypt_en_event_loop() -> None:
+    """Reemplaza la verificación en el pool por una llamada directa a bcrypt"""
+    from app.config import settings
+    from app.services import auth_service
+    from app.utils.hashing import verificar
+
+    async def verificar_bloqueante(password, hashed):
+        if hashed is None:
+            return False, None
+        return verificar(password, hashed, settings.PASSWORD_BCRYPT_ROUNDS)
+
+    auth_service.verificar_password = verificar_bloqueante
+
+
+async def vendedor(client, headers, detener: asyncio.Event, latencias: list) -> None:
+    """
+    Un request cada ~5 ms; la latencia se mide desde que debía empezar, así
+    incluye el tiempo que el event loop estuvo ocupado con otra cosa
+    """
+    pausa = 0.005
+    i = 0
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(pausa)
+        if i % 4 == 3:
+            await client.post("/venta/registrar", headers=headers, json_body={
+                "auto_id": 1 + i % 48,
+                "tipo_compra": "Cash",
+                "monto_fisco": "S/. 85,000.00",
+                "nombre_comprador": "Cliente Login",
+                "dni_comprador": "12345678",
+                "contacto_comprador": "999888777",
+            })
+        else:
+            await client.get("/venta/autos", params={"search": TERMINOS_BUSQUEDA[i % len(TERMINOS_BUSQUEDA)]}, headers=headers)
+        latencias.append(time.perf_counter() - inicio - pausa)
+        i += 1
+
+
+async def medir_en_proceso(args) -> dict:
+    import logging
+
+    from app.main import app
+    from benchmarks.asgi_client import ASGIClient
+    from benchmarks.load_test import login
+
+    logging.disable(logging.CRITICAL)
+    if args.modo == "loop":
+        bcrypt_en_event_loop()
+
+    client = ASGIClient(app)
+    await client.startup()
+    reponer_stock()
+    for username, password in VENDEDORES_DEMO:
+        await login(client, username, password)
+    headers = {"Authorization": f"Bearer {await login(client, 'cmendoza', 'carlos2020')}"}
+
+    estados = []
+
+    async def tormenta(n: int) -> None:
+        for k in range(args.logins):
+            username, password = VENDEDORES_DEMO[(n + k) % len(VENDEDORES_DEMO)]
+            response = await client.post("/auth/login", form={"username": username, "password": password})
+            estados.append(response.status_code)
+
+    detener = asyncio.Event()
+    latencias: list = []
+    tarea_vendedor = asyncio.create_task(vendedor(client, headers, detener, latencias))
+    await asyncio.sleep(0.2)
+    base = len(latencias)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*[tormenta(n) for n in range(args.clientes)])
+    transcurrido = time.perf_counter() - inicio
+    detener.set()
+    await tarea_vendedor
+    await client.shutdown()
+
+    ventas = summarize(latencias[base:], transcurrido)
+    return {
+        "logins_ok": estados.count(200),
+        "logins_503": estados.count(503),
+        "logins_s": estados.count(200) / transcurrido,
+        "ventas_s": ventas["throughput"],
+        "ventas_p50_ms": ventas["p50_ms"],
+        "ventas_p95_ms": ventas["p95_ms"],
+        "ventas_max_ms": ventas["max_ms"],
+    }
+
+
+def lanzar(workdir: str, args, modo: str, procesos: int) -> dict:
+    directorio = os.path.join(workdir, f"{modo}_{procesos}")
+    os.makedirs(directorio, exist_ok=True)
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        LOG_FILE=os.path.join(directorio, "aplicacion.log"),
+        PASSWORD_BCRYPT_ROUNDS=str(args.rondas),
+        PASSWORD_HASH_WORKERS=str(procesos),
+        PASSWORD_HASH_MAX_CONCURRENT=str(max(1, procesos)),
+        PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS=str(args.espera),
+    )
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_login", "--hijo", "--modo", modo,
+         "--clientes", str(args.clientes), "--logins", str(args.logins)],
+        cwd=directorio, env=env, capture_output=True, text=True
+    )
+    if salida.returncode != 0:
+        raise RuntimeError(f"La configuración {modo}/{procesos} falló:\n{salida.stderr}")
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main(args) -> None:
+    workdir = prepare_workdir("automotriz_login_")
+    configuraciones = [("event loop", "loop", 0), ("hilo", "pool", 0)]
+    configuraciones += [(f"{n} procesos", "pool", n) for n in (int(p) for p in args.procesos.split(","))]
+
+    print(f"bcrypt {args.rondas} rondas, {args.clientes} clientes x {args.logins} logins, CPUs: {os.cpu_count()}\n")
+    print(f"{'configuración':<14} {'logins/s':>9} {'ok':>5} {'503':>5} {'ventas/s':>9} {'ventas p50':>11} {'ventas p95':>11} {'ventas max':>11}")
+    for nombre, modo, procesos in configuraciones:
+        r = lanzar(workdir, args, modo, procesos)
+        print(
+            f"{nombre:<14} {r['logins_s']:>9.1f} {r['logins_ok']:>5} {r['logins_503']:>5} {r['ventas_s']:>9.1f} "
+            f"{r['ventas_p50_ms']:>9.1f}ms {r['ventas_p95_ms']:>9.1f}ms {r['ventas_max_ms']:>9.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput de logins con bcrypt y latencia de ventas")
+    parser.add_argument("--rondas", type=int, default=12, help="Costo bcrypt (PASSWORD_BCRYPT_ROUNDS)")
+    parser.add_argument("--clientes", type=int, default=16, help="Clientes haciendo login a la vez")
+    parser.add_argument("--logins", type=int, default=4, help="Logins por cliente")
+    parser.add_argument("--procesos", default="1,2,4", help="Tamaños del pool de procesos a medir")
+    parser.add_argument("--espera", type=float, default=30.0, help="PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS")
+    parser.add_argument("--modo", default="pool", help=argparse.SUPPRESS)
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(asyncio.run(medir_en_proceso(args))))
+    else:
+        main(args)
@@ -0,0 +1,95 @@
+"""
+Benchmark de búsqueda de autos: LIKE '%term%' vs índice FTS5
+
+Genera un catálogo sintético (por defecto ~110k modelos), crea el esquema
+con init_database() y compara la latencia de cada consulta con ambos
+caminos de app.search.
+
+Uso:
+    python -m benchmarks.bench_search --marcas 40 --modelos 250 --repeticiones 20
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import prepare_workdir
+
+MARCAS_BASE = [
+    "Toyota", "Honda", "Nissan", "Hyundai", "Mazda", "Kia", "Chevrolet", "Ford", "BMW", "Audi",
+    "Mercedes", "Volkswagen", "Subaru", "Suzuki", "Mitsubishi", "Peugeot", "Renault", "Citroën",
+    "Fiat", "Jeep", "Volvo", "Lexus", "Škoda", "Seat", "Chery", "Geely", "BYD", "JAC",
+]
+RAICES_MODELO = ["Cor", "Ya", "Rav", "Civ", "Acc", "Sen", "Kic", "Tuc", "Elan", "Spor", "Cru", "Fo", "Tra", "Esc", "Serie", "X"]
+CONSULTAS = ["toyota", "toyota 2025", "cor", "civ 2024", "x 12", "skoda", "serie 1", "mazda 2021", "zzz"]
+
+
+def poblar_catalogo(conn, num_marcas: int, modelos_por_marca: int, seed: int) -> int:
+    rng = random.Random(seed)
+    marcas = [
+        MARCAS_BASE[i] if i < len(MARCAS_BASE) else f"Marca{i}"
+        for i in range(num_marcas)
+    ]
+    filas = []
+    for marca in marcas:
+        for n in range(modelos_por_marca):
+            modelo = f"{rng.choice(RAICES_MODELO)}-{n}"
+            for anio in range(2020, 2031):
+                filas.append((marca, modelo, anio, rng.randint(50000, 250000), 25))
+
+    conn.execute("DELETE FROM autos_disponibles")
+    conn.executemany('''
+        INSERT OR IGNORE INTO autos_disponibles (marca, modelo, anio, precio_referencial, stock)
+        VALUES (?, ?, ?, ?, ?)
+    ''', filas)
+    conn.commit()
+    return conn.execute("SELECT COUNT(*) FROM autos_disponibles").fetchone()[0]
+
+
+def medir(fn, repeticiones: int) -> tuple:
+    tiempos = []
+    filas = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = len(fn())
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2] * 1000, filas
+
+
+def main(args) -> None:
+    import logging
+
+    from app.database import get_db_connection, init_database
+    from app.search import buscar_autos_fts, buscar_autos_like, construir_consulta_fts
+
+    logging.disable(logging.CRITICAL)
+    init_database()
+
+    conn = get_db_connection()
+    inicio = time.perf_counter()
+    total = poblar_catalogo(conn, args.marcas, args.modelos, args.seed)
+    print(f"Catálogo: {total} modelos ({time.perf_counter() - inicio:.1f}s de carga)\n")
+
+    print(f"{'consulta':<14} {'LIKE ms':>9} {'filas':>7} {'FTS5 ms':>9} {'filas':>7} {'speedup':>8}")
+    for termino in CONSULTAS:
+        like_ms, like_filas = medir(lambda: buscar_autos_like(conn, termino), args.repeticiones)
+        consulta = construir_consulta_fts(termino)
+        fts_ms, fts_filas = medir(lambda: buscar_autos_fts(conn, consulta), args.repeticiones)
+        print(
+            f"{termino:<14} {like_ms:>9.2f} {like_filas:>7} {fts_ms:>9.2f} {fts_filas:>7} "
+            f"{like_ms / fts_ms if fts_ms else 0:>7.1f}x"
+        )
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda LIKE vs FTS5")
+    parser.add_argument("--marcas", type=int, default=40)
+    parser.add_argument("--modelos", type=int, default=250, help="Modelos por marca (x11 años)")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    prepare_workdir()
+    main(args)
@@ -0,0 +1,98 @@
+"""
+Costo de serializar un historial de ventas de 10k filas
+
+Compara, con las mismas filas leídas por `listar_ventas`:
+
+- jsonable_encoder + json: lo que hacía FastAPI con rutas sin modelo tipado
+- modelo tipado + orjson: validación y serialización del response_model
+  (MisVentasResponse) con pydantic-core y cuerpo escrito por ORJSONResponse
+- filas directo a orjson: `respuesta_filas`, sin modelos intermedios
+- NDJSON: json.dumps por fila (antes) vs `linea_ndjson`
+
+Uso:
+    python -m benchmarks.bench_serializacion --filas 10000 --repeticiones 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.common import prepare_workdir
+
+
+def medir(fn, repeticiones: int) -> tuple:
+    tiempos = []
+    tamano = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        tamano = len(fn())
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000, tamano
+
+
+def main(args) -> None:
+    import logging
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.database import get_db_connection, init_database
+    from app.routes.venta import formatear_venta
+    from app.schemas.venta import MisVentasResponse
+    from app.seed import generar_datos
+    from app.services.venta_service import listar_ventas
+    from app.utils.respuestas import linea_ndjson, respuesta_filas
+
+    logging.disable(logging.CRITICAL)
+    init_database()
+    conn = get_db_connection()
+    generar_datos(conn, ventas=args.filas, seed=42)
+    conn.close()
+
+    ventas = [formatear_venta(v) for v in listar_ventas(limit=args.filas)]
+    payload = {
+        "total": len(ventas),
+        "vendedor": "Carlos Mendoza",
+        "sucursal": "LIMA/Miraflores",
+        "ventas": ventas,
+        "next_cursor": None,
+    }
+    campo = create_response_field(name="respuesta", type_=MisVentasResponse)
+    loop = asyncio.new_event_loop()
+
+    def tipado() -> bytes:
+        contenido = loop.run_until_complete(serialize_response(field=campo, response_content=payload))
+        return respuesta_filas(contenido).body
+
+    casos = [
+        ("jsonable_encoder + json", lambda: JSONResponse(jsonable_encoder(payload)).body),
+        ("modelo tipado + orjson", tipado),
+        ("filas directo a orjson", lambda: respuesta_filas(payload).body),
+        ("NDJSON json.dumps", lambda: "".join(
+            json.dumps(v, ensure_ascii=False, default=str) + "\n" for v in ventas
+        ).encode("utf-8")),
+        ("NDJSON orjson", lambda: b"".join(linea_ndjson(v) for v in ventas)),
+    ]
+
+    print(f"{len(ventas)} ventas, mediana de {args.repeticiones} repeticiones\n")
+    print(f"{'camino':<26} {'ms':>9} {'KB':>8} {'vs base':>8}")
+    base = None
+    for nombre, fn in casos:
+        ms, tamano = medir(fn, args.repeticiones)
+        if nombre.startswith("NDJSON json") or base is None:
+            base = ms
+        print(f"{nombre:<26} {ms:>9.2f} {tamano / 1024:>8.0f} {base / ms:>7.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Costo de serialización del historial de ventas")
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    prepare_workdir()
+    main(args)
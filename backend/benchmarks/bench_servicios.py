@@ -0,0 +1,186 @@
+"""
+Microbenchmarks de las funciones de servicio a distintas escalas de datos
+
+Mide, sin pasar por HTTP, las funciones que sostienen cada ruta:
+
+- authenticate_user: lectura del vendedor + verificación bcrypt en el pool
+  de hashing (al costo mínimo, ver benchmarks.common)
+- get_autos_disponibles: búsqueda en el catálogo, sin caché y con caché
+- registrar_venta: reserva de stock + inserción por el escritor único
+- get_ventas_by_vendedor: primera página (50) del historial de un vendedor
+
+Cada escala (cantidad de ventas sembradas con `generar_datos`, semilla fija)
+corre en un proceso nuevo sobre su propia base SQLite, así que ni las
+cachés ni el pool de una escala afectan a la siguiente.
+
+Uso:
+    python -m benchmarks.bench_servicios --escalas 1000,10000,100000 --iteraciones 500
+    python -m benchmarks.bench_servicios --json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.common import (
+    BACKEND_DIR,
+    TERMINOS_BUSQUEDA,
+    VENDEDORES_DEMO,
+    prepare_workdir,
+    reponer_stock,
+    summarize,
+)
+
+OPERACIONES = [
+    "authenticate_user",
+    "get_autos_disponibles",
+    "get_autos_disponibles (caché)",
+    "registrar_venta",
+    "get_ventas_by_vendedor",
+]
+
+
+def medir(fn: Callable[[int], None], iteraciones: int, preparar: Callable[[], None] = None) -> Dict[str, float]:
+    """Llama `fn(i)` `iteraciones` veces; `preparar` corre antes de cada llamada, fuera del tiempo"""
+    fn(0)  # calentamiento: sentencias preparadas, imports perezosos
+    muestras = []
+    total = 0.0
+    for i in range(iteraciones):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        fn(i)
+        transcurrido = time.perf_counter() - inicio
+        muestras.append(transcurrido)
+        total += transcurrido
+    # Throughput sobre el tiempo medido, sin contar `preparar`
+    return summarize(muestras, total)
+
+
+def medir_en_proceso(ventas: int, iteraciones: int, seed: int) -> None:
+    """Corre en el proceso hijo: siembra la base e imprime una línea JSON por operación"""
+    import asyncio
+    import logging
+
+    logging.disable(logging.CRITICAL)
+
+    from app.database import get_db_connection, init_database
+    from app.seed import generar_datos
+    from app.services.auth_service import authenticate_user, get_user
+    from app.services.venta_service import (
+        get_autos_disponibles,
+        get_catalogo_cache,
+        get_ventas_by_vendedor,
+        registrar_venta,
+    )
+
+    init_database()
+    conn = get_db_connection()
+    generar_datos(conn, ventas=ventas, seed=seed, rapido=ventas >= 100_000)
+    total_autos = conn.execute("SELECT COUNT(*) FROM autos_disponibles").fetchone()[0]
+    conn.close()
+    reponer_stock()
+
+    rng = random.Random(seed)
+    vendedores = [get_user(username) for username, _ in VENDEDORES_DEMO]
+    cache = get_catalogo_cache()
+
+    loop = asyncio.new_event_loop()
+
+    def autenticar(i: int) -> None:
+        username, password = VENDEDORES_DEMO[i % len(VENDEDORES_DEMO)]
+        if loop.run_until_complete(authenticate_user(username, password)) is None:
+            raise RuntimeError(f"authenticate_user falló para {username}")
+
+    def buscar(i: int) -> None:
+        get_autos_disponibles(TERMINOS_BUSQUEDA[i % len(TERMINOS_BUSQUEDA)])
+
+    def vender(i: int) -> None:
+        vendedor = vendedores[i % len(vendedores)]
+        venta_id = registrar_venta(
+            vendedor_id=vendedor["id"],
+            auto_id=rng.randint(1, total_autos),
+            tipo_compra=rng.choice(["Cash", "Crédito"]),
+            monto_centimos=rng.randint(5_000_000, 25_000_000),
+            nombre_comprador="Cliente Benchmark",
+            dni_comprador=str(rng.randint(10000000, 99999999)),
+            contacto_comprador="999888777",
+            sucursal_provincia=vendedor["sucursal_provincia"],
+            sucursal_distrito=vendedor["sucursal_distrito"],
+            nombre_vendedor=vendedor["full_name"],
+        )
+        if venta_id is None:
+            raise RuntimeError("registrar_venta no registró la venta")
+
+    def historial(i: int) -> None:
+        get_ventas_by_vendedor(vendedores[i % len(vendedores)]["id"], limit=50)
+
+    casos = {
+        "authenticate_user": (autenticar, None),
+        "get_autos_disponibles": (buscar, cache.clear),
+        "get_autos_disponibles (caché)": (buscar, None),
+        "registrar_venta": (vender, None),
+        "get_ventas_by_vendedor": (historial, None),
+    }
+    for operacion in OPERACIONES:
+        fn, preparar = casos[operacion]
+        resultado = medir(fn, iteraciones, preparar)
+        resultado.update({"escala": ventas, "operacion": operacion})
+        print(json.dumps(resultado), flush=True)
+    loop.close()
+
+
+def lanzar(workdir: str, ventas: int, iteraciones: int, seed: int) -> List[dict]:
+    directorio = os.path.join(workdir, f"ventas_{ventas}")
+    os.makedirs(directorio, exist_ok=True)
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, LOG_FILE=os.path.join(directorio, "aplicacion.log"))
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_servicios", "--hijo",
+         "--escalas", str(ventas), "--iteraciones", str(iteraciones), "--seed", str(seed)],
+        cwd=directorio, env=env, capture_output=True, text=True
+    )
+    if salida.returncode != 0:
+        raise RuntimeError(f"La escala {ventas} falló:\n{salida.stderr}")
+    return [json.loads(linea) for linea in salida.stdout.splitlines() if linea.startswith("{")]
+
+
+def ejecutar(escalas: List[int], iteraciones: int, seed: int = 42) -> List[dict]:
+    """Mide todas las operaciones en cada escala (un proceso por escala)"""
+    workdir = prepare_workdir("automotriz_servicios_")
+    resultados = []
+    for ventas in escalas:
+        resultados.extend(lanzar(workdir, ventas, iteraciones, seed))
+    return resultados
+
+
+def print_table(resultados: List[dict]) -> None:
+    print(f"{'ventas':>8} {'operación':<30} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for r in resultados:
+        print(
+            f"{r['escala']:>8} {r['operacion']:<30} {r['throughput']:>10,.0f} "
+            f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks de las funciones de servicio")
+    parser.add_argument("--escalas", default="1000,10000,100000", help="Ventas sembradas, separadas por coma")
+    parser.add_argument("--iteraciones", type=int, default=500, help="Llamadas por operación y escala")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Imprimir resultados en JSON")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    escalas = [int(e) for e in args.escalas.split(",")]
+    if args.hijo:
+        medir_en_proceso(escalas[0], args.iteraciones, args.seed)
+    else:
+        resultados = ejecutar(escalas, args.iteraciones, args.seed)
+        if args.json:
+            print(json.dumps(resultados, indent=2))
+        else:
+            print_table(resultados)
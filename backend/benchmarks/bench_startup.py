@@ -0,0 +1,103 @@
+"""
+Benchmark de arranque: tiempo hasta /ready y hasta el primer request
+
+Cada medición corre en un proceso nuevo (imports en frío) con la aplicación
+en proceso (ASGIClient), sobre tres estados de la base SQLite:
+
+- nueva: sin archivo; el arranque migra y carga los datos de demostración
+- migrada: esquema al día; el arranque solo consulta schema_version
+- sin versionar: base anterior a schema_version; recorre todos los pasos
+  idempotentes, que es lo que antes hacía cada worker en cada arranque
+
+Uso:
+    python -m benchmarks.bench_startup --repeticiones 5
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BACKEND_DIR, prepare_workdir
+
+
+def medir_en_proceso() -> None:
+    """Corre en el proceso hijo: imprime una línea JSON con los tiempos"""
+    inicio = time.perf_counter()
+    import asyncio
+    import logging
+
+    from app.main import app
+    from benchmarks.asgi_client import ASGIClient
+
+    importado = time.perf_counter()
+    logging.disable(logging.CRITICAL)
+
+    async def arrancar():
+        client = ASGIClient(app)
+        await client.startup()
+        listo = time.perf_counter()
+        respuesta = await client.get("/")
+        primero = time.perf_counter()
+        await client.shutdown()
+        return listo, primero, respuesta.status_code
+
+    listo, primero, status = asyncio.run(arrancar())
+    print(json.dumps({
+        "import_s": importado - inicio,
+        "ready_s": listo - inicio,
+        "first_request_s": primero - inicio,
+        "status": status,
+    }))
+
+
+def lanzar(workdir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, LOG_FILE=os.path.join(workdir, "aplicacion.log"))
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--hijo"],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def quitar_version(workdir: str) -> None:
+    conn = sqlite3.connect(os.path.join(workdir, "automotriz_jj.db"))
+    conn.execute("DROP TABLE schema_version")
+    conn.commit()
+    conn.close()
+
+
+def main(args) -> None:
+    workdir = prepare_workdir("automotriz_startup_")
+    escenarios = {"nueva": [], "migrada": [], "sin versionar": []}
+
+    for _ in range(args.repeticiones):
+        base = os.path.join(workdir, "automotriz_jj.db")
+        for sufijo in ("", "-wal", "-shm"):
+            if os.path.exists(base + sufijo):
+                os.remove(base + sufijo)
+        escenarios["nueva"].append(lanzar(workdir))
+        escenarios["migrada"].append(lanzar(workdir))
+        quitar_version(workdir)
+        escenarios["sin versionar"].append(lanzar(workdir))
+
+    print(f"Medianas de {args.repeticiones} arranques (segundos desde el inicio del proceso)\n")
+    print(f"{'base':<14} {'imports':>9} {'/ready':>9} {'1er request':>12}")
+    for nombre, muestras in escenarios.items():
+        fila = {k: statistics.median(m[k] for m in muestras) for k in ("import_s", "ready_s", "first_request_s")}
+        print(f"{nombre:<14} {fila['import_s']:>9.3f} {fila['ready_s']:>9.3f} {fila['first_request_s']:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de arranque (tiempo hasta el primer request)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        medir_en_proceso()
+    else:
+        main(args)
@@ -0,0 +1,90 @@
+"""
+Utilidades compartidas por los benchmarks
+"""
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Credenciales sembradas por seed_initial_data
+VENDEDORES_DEMO = [
+    ("cmendoza", "carlos2020"),
+    ("svargas", "sofia2020"),
+    ("mrojas", "miguel2020"),
+    ("ldiaz", "laura2020"),
+    ("dcruz", "diego2020"),
+    ("alopez", "andrea2020"),
+    ("rsilva", "roberto2020"),
+    ("ptorres", "patricia2020"),
+    ("fcampos", "fernando2020"),
+    ("vmorales", "valentina2020"),
+    ("mquispe", "marco2020"),
+    ("chuaman", "carmen2020"),
+]
+
+TERMINOS_BUSQUEDA = ["toyota", "honda", "2025", "cr", "kia rio", "mazda", "bmw x3", "nissan 2024", "ford"]
+
+
+def prepare_workdir(prefix: str = "automotriz_bench_") -> str:
+    """
+    Aísla el benchmark en un directorio temporal
+
+    La base SQLite y el log se crean con rutas relativas, por lo que basta con
+    cambiar de directorio antes de importar la aplicación.
+    """
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    os.chdir(workdir)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-no-usar-en-produccion")
+    # Todos los clientes del benchmark comparten IP: sin límite de intentos de login
+    os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+    # bcrypt al costo mínimo: los benchmarks miden la aplicación, no bcrypt
+    # (bench_login fija el costo de producción)
+    os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    return workdir
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, min(len(sorted_samples) - 1, int(round(pct / 100.0 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Resume latencias (segundos) en throughput y percentiles en milisegundos"""
+    ordered = sorted(samples)
+    return {
+        "requests": len(ordered),
+        "throughput": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+    }
+
+
+def reponer_stock(unidades: int = 1_000_000, auto_id: int = None) -> None:
+    """
+    Fija el stock de todos los autos (o de uno) antes de un benchmark
+
+    Cada venta descuenta una unidad; con el stock sembrado (25 por auto) los
+    benchmarks de registro se quedarían sin unidades a mitad de la corrida.
+    """
+    from app.database import get_db_connection
+    from app.services.venta_service import invalidar_catalogo
+
+    conn = get_db_connection()
+    try:
+        if auto_id is None:
+            conn.execute("UPDATE autos_disponibles SET stock = ?", (unidades,))
+        else:
+            conn.execute("UPDATE autos_disponibles SET stock = ? WHERE id = ?", (unidades, auto_id))
+        conn.commit()
+    finally:
+        conn.close()
+    invalidar_catalogo()
@@ -0,0 +1,201 @@
+"""
+Prueba de carga en proceso de las rutas /auth y /venta
+
+Lanza N clientes concurrentes contra `app.main:app` (sin red) con una mezcla
+de login, búsqueda de autos, /auth/me, historial y registro de ventas, y
+reporta throughput y percentiles de latencia por nivel de concurrencia.
+
+La mezcla se elige con `--mezcla`: un perfil de MEZCLAS ("consulta", el
+tráfico habitual del día; "apertura", inicio de turno con muchos logins;
+"cierre", fin de mes con muchas ventas) o pesos explícitos como
+"buscar=60,historial=20,vender=20".
+
+Con `--db-delay-ms` se agrega una latencia artificial a cada checkout de
+conexión (simula una BD remota o una consulta lenta). Si alguna ruta bloquea
+el event loop, el p99 crece linealmente con los clientes; con la capa
+asíncrona se mantiene plano mientras haya hilos libres en el executor.
+
+Uso:
+    python -m benchmarks.load_test --clients 1,4,8,16 --requests 50 --db-delay-ms 20
+    python -m benchmarks.load_test --mezcla cierre --json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from benchmarks.common import TERMINOS_BUSQUEDA, VENDEDORES_DEMO, prepare_workdir, reponer_stock, summarize
+
+
+# Pesos relativos de cada operación por perfil de tráfico
+MEZCLAS: Dict[str, Dict[str, float]] = {
+    "consulta": {"buscar": 50, "historial": 20, "perfil": 20, "login": 5, "vender": 5},
+    "apertura": {"login": 30, "perfil": 30, "buscar": 30, "historial": 10},
+    "cierre": {"vender": 35, "buscar": 35, "historial": 20, "perfil": 5, "login": 5},
+}
+
+
+def parse_mezcla(valor: str) -> Dict[str, float]:
+    """Nombre de un perfil de MEZCLAS o pesos "operacion=peso,..." """
+    if valor in MEZCLAS:
+        return MEZCLAS[valor]
+    pesos = {}
+    for parte in valor.split(","):
+        operacion, _, peso = parte.partition("=")
+        if operacion.strip() not in OPERACIONES:
+            raise ValueError(f"Operación desconocida en la mezcla: {operacion!r} (válidas: {', '.join(OPERACIONES)})")
+        pesos[operacion.strip()] = float(peso)
+    return pesos
+
+
+def simulate_db_latency(delay: float) -> None:
+    """Envuelve el checkout de conexiones del primario con una espera bloqueante"""
+    from app import database
+
+    original = database.get_connection
+
+    @contextmanager
+    def slow_connection():
+        time.sleep(delay)
+        with original() as conn:
+            yield conn
+
+    # `leer` toma la conexión del primario por este nombre (el escritor único
+    # tiene su propia conexión: las escrituras no se retrasan)
+    database.get_connection = slow_connection
+
+
+async def login(client, username: str, password: str) -> str:
+    response = await client.post("/auth/login", form={"username": username, "password": password})
+    if response.status_code != 200:
+        raise RuntimeError(f"Login falló para {username}: {response.status_code}")
+    return response.json()["access_token"]
+
+
+async def _buscar(client, rng, headers, username, password):
+    return await client.get("/venta/autos", params={"search": rng.choice(TERMINOS_BUSQUEDA)}, headers=headers)
+
+
+async def _historial(client, rng, headers, username, password):
+    return await client.get("/venta/mis-ventas", params={"limit": 50}, headers=headers)
+
+
+async def _perfil(client, rng, headers, username, password):
+    return await client.get("/auth/me", headers=headers)
+
+
+async def _login(client, rng, headers, username, password):
+    return await client.post("/auth/login", form={"username": username, "password": password})
+
+
+async def _vender(client, rng, headers, username, password):
+    return await client.post("/venta/registrar", headers=headers, json_body={
+        "auto_id": rng.randint(1, 48),
+        "tipo_compra": rng.choice(["Cash", "Crédito"]),
+        "monto_fisco": "S/. 85,000.00",
+        "nombre_comprador": "Cliente Carga",
+        "dni_comprador": str(rng.randint(10000000, 99999999)),
+        "contacto_comprador": "999888777",
+    })
+
+
+OPERACIONES = {
+    "buscar": _buscar,
+    "historial": _historial,
+    "perfil": _perfil,
+    "login": _login,
+    "vender": _vender,
+}
+
+
+async def run_client(client, tokens, mezcla: Dict[str, float], num_requests: int, latencies: list, errors: list, rng: random.Random):
+    nombres = list(mezcla)
+    pesos = [mezcla[n] for n in nombres]
+    for _ in range(num_requests):
+        username, password = rng.choice(VENDEDORES_DEMO)
+        headers = {"Authorization": f"Bearer {tokens[username]}"}
+        operacion = OPERACIONES[rng.choices(nombres, pesos)[0]]
+
+        start = time.perf_counter()
+        response = await operacion(client, rng, headers, username, password)
+        latencies.append(time.perf_counter() - start)
+
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+
+async def run_level(client, tokens, mezcla: Dict[str, float], clients: int, num_requests: int, seed: int) -> dict:
+    latencies: list = []
+    errors: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        run_client(client, tokens, mezcla, num_requests, latencies, errors, random.Random(seed + i))
+        for i in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+
+    result = summarize(latencies, elapsed)
+    result["clients"] = clients
+    result["errors"] = len(errors)
+    return result
+
+
+async def main(args) -> list:
+    import logging
+
+    from benchmarks.asgi_client import ASGIClient
+    from app.main import app
+
+    logging.disable(logging.CRITICAL)
+
+    client = ASGIClient(app)
+    await client.startup()
+    reponer_stock()
+
+    tokens = {}
+    for username, password in VENDEDORES_DEMO:
+        tokens[username] = await login(client, username, password)
+
+    if args.db_delay_ms > 0:
+        simulate_db_latency(args.db_delay_ms / 1000.0)
+
+    mezcla = parse_mezcla(args.mezcla)
+    results = []
+    for clients in [int(c) for c in args.clients.split(",")]:
+        result = await run_level(client, tokens, mezcla, clients, args.requests, args.seed)
+        result["mezcla"] = args.mezcla
+        results.append(result)
+
+    await client.shutdown()
+    return results
+
+
+def print_table(results: list) -> None:
+    print(f"{'clientes':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for r in results:
+        print(
+            f"{r['clients']:>8} {r['requests']:>9} {r['throughput']:>9.1f} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga en proceso")
+    parser.add_argument("--clients", default="1,4,8,16", help="Niveles de concurrencia separados por coma")
+    parser.add_argument("--requests", type=int, default=50, help="Requests por cliente")
+    parser.add_argument("--db-delay-ms", type=float, default=0.0, help="Latencia artificial por consulta")
+    parser.add_argument("--mezcla", default="consulta", help=f"Perfil ({', '.join(MEZCLAS)}) o pesos op=peso,...")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", action="store_true", help="Imprimir resultados en JSON")
+    args = parser.parse_args()
+
+    prepare_workdir()
+    results = asyncio.run(main(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
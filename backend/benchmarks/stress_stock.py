@@ -0,0 +1,172 @@
+"""
+Prueba de concurrencia del descuento de stock
+
+Deja un solo auto con `--stock` unidades y lanza `--intentos` ventas de ese
+mismo modelo en paralelo:
+- por HTTP: clientes concurrentes contra POST /venta/registrar, repartidos
+  entre los 12 vendedores demo
+- con `--procesos N`: además, N procesos independientes que llaman a
+  `registrar_venta` directamente, cada uno con su propio escritor y sus
+  propias conexiones a la misma base (la atomicidad la da SQLite, no el
+  escritor único)
+
+Verifica que se vendieron exactamente `--stock` unidades, que el resto de
+intentos recibió conflicto (409 / StockAgotadoError), que el stock final es
+0 y que registro_venta creció en el número de ventas aceptadas.
+
+Uso:
+    python -m benchmarks.stress_stock --stock 50 --intentos 400 --clientes 64 --procesos 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+
+from benchmarks.common import VENDEDORES_DEMO, prepare_workdir, reponer_stock
+from benchmarks.load_test import login
+
+AUTO_ID = 1
+
+
+def venta_demo(i: int) -> dict:
+    return {
+        "auto_id": AUTO_ID,
+        "tipo_compra": "Cash",
+        "monto_fisco": "S/. 85,000.00",
+        "nombre_comprador": f"Cliente Stress {i}",
+        "dni_comprador": f"{10000000 + i}",
+        "contacto_comprador": "999888777",
+    }
+
+
+def contar(conn) -> tuple:
+    stock = conn.execute("SELECT stock FROM autos_disponibles WHERE id = ?", (AUTO_ID,)).fetchone()[0]
+    ventas = conn.execute("SELECT COUNT(*) FROM registro_venta WHERE auto_id = ?", (AUTO_ID,)).fetchone()[0]
+    return stock, ventas
+
+
+async def por_http(client, tokens: dict, intentos: int, clientes: int) -> Counter:
+    pendientes = list(range(intentos))
+    estados: Counter = Counter()
+    usuarios = list(tokens)
+
+    async def trabajador(n: int):
+        while pendientes:
+            i = pendientes.pop()
+            headers = {"Authorization": f"Bearer {tokens[usuarios[(n + i) % len(usuarios)]]}"}
+            response = await client.post("/venta/registrar", headers=headers, json_body=venta_demo(i))
+            estados[response.status_code] += 1
+
+    await asyncio.gather(*[trabajador(n) for n in range(clientes)])
+    return estados
+
+
+def _proceso(workdir: str, inicio: int, intentos: int, barrera, cola) -> None:
+    """Proceso hijo: vende el mismo auto con su propio escritor"""
+    import logging
+
+    os.chdir(workdir)
+    logging.disable(logging.CRITICAL)
+    from app.database import close_writer
+    from app.services.venta_service import StockAgotadoError, registrar_venta
+
+    estados: Counter = Counter()
+    barrera.wait()
+    for i in range(inicio, inicio + intentos):
+        try:
+            venta_id = registrar_venta(
+                vendedor_id=1, auto_id=AUTO_ID, tipo_compra="Cash", monto_centimos=8_500_000,
+                nombre_comprador=f"Cliente Proceso {i}", dni_comprador=f"{20000000 + i}",
+                contacto_comprador="999888777", sucursal_provincia="LIMA",
+                sucursal_distrito="Miraflores", nombre_vendedor="Stress"
+            )
+            estados["ok" if venta_id else "error"] += 1
+        except StockAgotadoError:
+            estados["sin_stock"] += 1
+    close_writer()
+    cola.put(dict(estados))
+
+
+def por_procesos(procesos: int, intentos: int) -> Counter:
+    ctx = multiprocessing.get_context("spawn")
+    barrera = ctx.Barrier(procesos)
+    cola = ctx.Queue()
+    por_proceso = intentos // procesos
+    hijos = [
+        ctx.Process(target=_proceso, args=(os.getcwd(), n * por_proceso, por_proceso, barrera, cola))
+        for n in range(procesos)
+    ]
+    for hijo in hijos:
+        hijo.start()
+    estados: Counter = Counter()
+    for _ in hijos:
+        estados.update(cola.get())
+    for hijo in hijos:
+        hijo.join()
+    return estados
+
+
+def verificar(nombre: str, conn, stock: int, aceptadas: int, rechazadas: int, ventas_antes: int) -> bool:
+    stock_final, ventas = contar(conn)
+    nuevas = ventas - ventas_antes
+    ok = aceptadas == stock and stock_final == 0 and nuevas == aceptadas
+    print(
+        f"{nombre:<10} aceptadas={aceptadas:<5} conflicto={rechazadas:<5} "
+        f"stock final={stock_final:<4} ventas nuevas={nuevas:<5} {'OK' if ok else 'SOBREVENTA / ERROR'}"
+    )
+    return ok
+
+
+async def main(args) -> bool:
+    import logging
+
+    from benchmarks.asgi_client import ASGIClient
+    from app.database import get_db_connection
+    from app.main import app
+
+    logging.disable(logging.CRITICAL)
+
+    client = ASGIClient(app)
+    await client.startup()
+    tokens = {username: await login(client, username, password) for username, password in VENDEDORES_DEMO}
+    conn = get_db_connection()
+
+    print(f"auto {AUTO_ID}: stock {args.stock}, {args.intentos} intentos\n")
+
+    reponer_stock(args.stock, AUTO_ID)
+    _, antes = contar(conn)
+    inicio = time.perf_counter()
+    estados = await por_http(client, tokens, args.intentos, args.clientes)
+    segundos = time.perf_counter() - inicio
+    otros = {k: v for k, v in estados.items() if k not in (200, 409)}
+    ok = verificar("http", conn, args.stock, estados[200], estados[409], antes) and not otros
+    print(f"{'':<10} {args.clientes} clientes, {args.intentos / segundos:,.0f} intentos/s{f', otros estados: {otros}' if otros else ''}")
+
+    if args.procesos:
+        reponer_stock(args.stock, AUTO_ID)
+        _, antes = contar(conn)
+        estados = por_procesos(args.procesos, args.intentos)
+        ok = verificar(
+            f"{args.procesos} procs", conn, args.stock, estados["ok"], estados["sin_stock"], antes
+        ) and not estados["error"] and ok
+        if estados["error"]:
+            print(f"{'':<10} errores: {estados['error']}")
+
+    conn.close()
+    await client.shutdown()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrencia del descuento de stock (sin sobreventa)")
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--intentos", type=int, default=400)
+    parser.add_argument("--clientes", type=int, default=64)
+    parser.add_argument("--procesos", type=int, default=4, help="Procesos con escritor propio (0 = omitir)")
+    args = parser.parse_args()
+
+    prepare_workdir()
+    sys.exit(0 if asyncio.run(main(args)) else 1)
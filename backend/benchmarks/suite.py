@@ -0,0 +1,187 @@
+"""
+Suite de rendimiento sin red con comparación contra una línea base
+
+Corre los microbenchmarks de servicios (benchmarks.bench_servicios) en cada
+escala y la prueba de carga en proceso (benchmarks.load_test) con cada
+perfil de MEZCLAS, y deja los resultados en un JSON plano:
+
+    {"meta": {...}, "resultados": {"servicios/10000/registrar_venta": {"throughput": ..., "p95_ms": ...}, ...}}
+
+Con `--baseline` compara cada resultado con el de la línea base guardada:
+es una regresión que el throughput caiga más de `--tolerancia` por ciento o
+que el p95 suba más de ese porcentaje (y más de `--umbral-ms`, para que el
+ruido en operaciones de microsegundos no cuente). Con regresiones, o con
+errores HTTP en la carga, el proceso termina con código 1.
+
+Cada métrica es la mediana de `--repeticiones` corridas completas: una sola
+corrida varía ±30% de una vez a otra en la misma máquina, lo que no deja
+distinguir una regresión real del ruido.
+
+La línea base depende de la máquina: se genera con `--guardar-baseline` en
+la misma máquina (o runner de CI) donde después se compara.
+
+Uso:
+    python -m benchmarks.suite --guardar-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --salida resultados.json
+    python -m benchmarks.suite --rapida --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_servicios import ejecutar as ejecutar_servicios
+from benchmarks.common import BACKEND_DIR
+from benchmarks.load_test import MEZCLAS
+
+METRICAS = ("requests", "throughput", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+# Configuración por perfil de la suite
+PERFILES = {
+    "completa": {"escalas": [1000, 10000, 100000], "iteraciones": 500, "clientes": "1,8,32", "requests": 100},
+    "rapida": {"escalas": [1000, 10000], "iteraciones": 300, "clientes": "1,8", "requests": 100},
+}
+
+
+def correr_carga(mezcla: str, clientes: str, requests: int) -> List[dict]:
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.load_test", "--json",
+         "--mezcla", mezcla, "--clients", clientes, "--requests", str(requests)],
+        cwd=BACKEND_DIR, env=dict(os.environ, PYTHONPATH=BACKEND_DIR), capture_output=True, text=True
+    )
+    if salida.returncode != 0:
+        raise RuntimeError(f"La prueba de carga '{mezcla}' falló:\n{salida.stderr}")
+    return json.loads(salida.stdout)
+
+
+def corrida(config: dict) -> Dict[str, dict]:
+    """Una corrida completa: servicios en cada escala y carga con cada mezcla"""
+    resultados: Dict[str, dict] = {}
+
+    for r in ejecutar_servicios(config["escalas"], config["iteraciones"]):
+        resultados[f"servicios/{r['escala']}/{r['operacion']}"] = {m: r[m] for m in METRICAS}
+
+    for mezcla in MEZCLAS:
+        for r in correr_carga(mezcla, config["clientes"], config["requests"]):
+            fila = {m: r[m] for m in METRICAS}
+            fila["errors"] = r["errors"]
+            resultados[f"carga/{mezcla}/{r['clients']}c"] = fila
+
+    return resultados
+
+
+def ejecutar(perfil: str, repeticiones: int) -> dict:
+    """Mediana por métrica de `repeticiones` corridas (los errores se suman)"""
+    corridas = [corrida(PERFILES[perfil]) for _ in range(repeticiones)]
+    resultados: Dict[str, dict] = {}
+    for clave in corridas[0]:
+        muestras = [c[clave] for c in corridas if clave in c]
+        resultados[clave] = {m: statistics.median(r[m] for r in muestras) for m in METRICAS}
+        if "errors" in muestras[0]:
+            resultados[clave]["errors"] = sum(r["errors"] for r in muestras)
+
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "perfil": perfil,
+            "repeticiones": repeticiones,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(actual: dict, base: dict, tolerancia: float, umbral_ms: float) -> Tuple[List[str], List[str]]:
+    """
+    Compara los resultados con la línea base
+
+    Returns:
+        (regresiones, filas): descripciones de las regresiones y la tabla
+        comparativa lista para imprimir
+    """
+    regresiones = []
+    filas = [f"{'resultado':<48} {'req/s base':>11} {'req/s':>11} {'Δ':>7} {'p95 base':>9} {'p95':>9} {'Δ':>7}"]
+    factor = tolerancia / 100.0
+
+    for clave, previo in base["resultados"].items():
+        nuevo = actual["resultados"].get(clave)
+        if nuevo is None:
+            filas.append(f"{clave:<48} (sin resultado en esta corrida)")
+            continue
+
+        delta_tp = nuevo["throughput"] / previo["throughput"] - 1 if previo["throughput"] else 0.0
+        delta_p95 = nuevo["p95_ms"] / previo["p95_ms"] - 1 if previo["p95_ms"] else 0.0
+        marca = ""
+        if delta_tp < -factor:
+            regresiones.append(f"{clave}: throughput {previo['throughput']:,.1f} → {nuevo['throughput']:,.1f} req/s ({delta_tp:+.0%})")
+            marca = " ❌"
+        if delta_p95 > factor and nuevo["p95_ms"] - previo["p95_ms"] > umbral_ms:
+            regresiones.append(f"{clave}: p95 {previo['p95_ms']:.3f} → {nuevo['p95_ms']:.3f} ms ({delta_p95:+.0%})")
+            marca = " ❌"
+        filas.append(
+            f"{clave:<48} {previo['throughput']:>11,.1f} {nuevo['throughput']:>11,.1f} {delta_tp:>+7.0%} "
+            f"{previo['p95_ms']:>9.3f} {nuevo['p95_ms']:>9.3f} {delta_p95:>+7.0%}{marca}"
+        )
+
+    return regresiones, filas
+
+
+def main(args) -> int:
+    actual = ejecutar("rapida" if args.rapida else "completa", args.repeticiones)
+    codigo = 0
+
+    errores = [f"{clave}: {r['errors']} respuestas con error" for clave, r in actual["resultados"].items() if r.get("errors")]
+    for error in errores:
+        print(f"❌ {error}")
+    if errores:
+        codigo = 1
+
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump(actual, f, indent=2)
+        print(f"💾 Resultados guardados en {args.salida}")
+
+    if args.guardar_baseline:
+        with open(args.guardar_baseline, "w") as f:
+            json.dump(actual, f, indent=2)
+        print(f"💾 Línea base guardada en {args.guardar_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)
+        if base["meta"].get("perfil") != actual["meta"]["perfil"]:
+            print(f"⚠️ La línea base es del perfil '{base['meta'].get('perfil')}': solo se comparan los resultados comunes")
+        regresiones, filas = comparar(actual, base, args.tolerancia, args.umbral_ms)
+        print("\n".join(filas))
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones (tolerancia {args.tolerancia:.0f}%):")
+            for regresion in regresiones:
+                print(f"   {regresion}")
+            codigo = 1
+        else:
+            print(f"\n✅ Sin regresiones frente a {args.baseline} (tolerancia {args.tolerancia:.0f}%)")
+    elif not args.salida and not args.guardar_baseline:
+        print(json.dumps(actual, indent=2))
+
+    return codigo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite de rendimiento con comparación contra línea base")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior contra el cual comparar")
+    parser.add_argument("--guardar-baseline", metavar="RUTA", help="Guardar esta corrida como línea base")
+    parser.add_argument("--salida", help="Guardar los resultados de esta corrida en JSON")
+    parser.add_argument("--tolerancia", type=float, default=25.0, help="Porcentaje de caída/subida tolerado")
+    parser.add_argument("--umbral-ms", type=float, default=0.05, help="Subida mínima del p95 (ms) para contar")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Corridas completas (se toma la mediana)")
+    parser.add_argument("--rapida", action="store_true", help="Escalas y carga reducidas (para CI)")
+    args = parser.parse_args()
+
+    sys.exit(main(args))
@@ -0,0 +1,89 @@
+"""
+Fixtures compartidas de las pruebas
+
+La base SQLite y el log se crean con rutas relativas: igual que los
+benchmarks (benchmarks/common.py), las pruebas corren en un directorio
+temporal y configuran el entorno antes de importar la aplicación.
+
+Uso (desde backend/):
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.chdir(tempfile.mkdtemp(prefix="automotriz_tests_"))
+os.environ.setdefault("SECRET_KEY", "pruebas-secret-key-no-usar-en-produccion")
+# El límite de login se prueba aparte (test_rate_limit.py): aquí todos los
+# requests comparten la IP del TestClient
+os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+VENTA = {
+    "tipo_compra": "Cash",
+    "monto_fisco": "S/. 85,000.00",
+    "nombre_comprador": "Juan Perez",
+    "dni_comprador": "12345678",
+    "contacto_comprador": "999999999",
+}
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient sobre la aplicación, con la base migrada y sembrada"""
+    from app.main import app
+
+    with TestClient(app) as c:
+        limite = time.monotonic() + 30
+        while c.get("/ready").status_code != 200:
+            assert time.monotonic() < limite, "/ready no respondió 200"
+            time.sleep(0.05)
+        yield c
+
+
+def login(client, username: str = "cmendoza", password: str = "carlos2020") -> dict:
+    respuesta = client.post("/auth/login", data={"username": username, "password": password})
+    assert respuesta.status_code == 200, respuesta.text
+    return {"Authorization": f"Bearer {respuesta.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def auth(client) -> dict:
+    """Cabeceras de un vendedor autenticado"""
+    return login(client)
+
+
+@pytest.fixture
+def auto_con_stock(client):
+    """Fija el stock de un auto activo y devuelve su id"""
+    from app.services.venta_service import actualizar_auto
+
+    def fijar(stock: int, auto_id: int = 1) -> int:
+        assert actualizar_auto(auto_id, stock=stock, is_active=True)
+        return auto_id
+
+    return fijar
+
+
+def contar_ventas(auto_id: int) -> int:
+    from app.database import get_connection
+
+    with get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM registro_venta WHERE auto_id = ?", (auto_id,)).fetchone()[0]
+
+
+def stock_de(auto_id: int) -> int:
+    from app.database import get_connection
+
+    with get_connection() as conn:
+        return conn.execute("SELECT stock FROM autos_disponibles WHERE id = ?", (auto_id,)).fetchone()[0]
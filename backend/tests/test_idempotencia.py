@@ -0,0 +1,80 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.idempotency import get_idempotencia_cache
+from tests.conftest import VENTA, contar_ventas, login, stock_de
+
+
+def _registrar(client, headers, clave, **cambios):
+    return client.post(
+        "/venta/registrar", json={**VENTA, **cambios}, headers={**headers, "Idempotency-Key": clave}
+    )
+
+
+def test_reintento_devuelve_la_misma_venta(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(5, auto_id=9)
+    antes = contar_ventas(auto_id)
+    clave = str(uuid.uuid4())
+
+    primera = _registrar(client, auth, clave, auto_id=auto_id)
+    assert primera.status_code == 200
+    assert "Idempotent-Replayed" not in primera.headers
+
+    reintento = _registrar(client, auth, clave, auto_id=auto_id)
+    assert reintento.status_code == 200
+    assert reintento.headers["Idempotent-Replayed"] == "true"
+    assert reintento.json()["venta_id"] == primera.json()["venta_id"]
+
+    # Sin la caché del proceso responde la tabla idempotencia
+    get_idempotencia_cache().clear()
+    desde_base = _registrar(client, auth, clave, auto_id=auto_id)
+    assert desde_base.headers["Idempotent-Replayed"] == "true"
+    assert desde_base.json()["venta_id"] == primera.json()["venta_id"]
+
+    assert contar_ventas(auto_id) == antes + 1
+    assert stock_de(auto_id) == 4
+
+
+def test_misma_clave_con_otros_datos(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(5, auto_id=10)
+    clave = str(uuid.uuid4())
+    assert _registrar(client, auth, clave, auto_id=auto_id).status_code == 200
+
+    respuesta = _registrar(client, auth, clave, auto_id=auto_id, dni_comprador="87654321")
+    assert respuesta.status_code == 422
+    assert respuesta.json()["detail"] == "La Idempotency-Key ya se usó con otros datos de venta"
+    assert stock_de(auto_id) == 4
+
+
+def test_duplicados_simultaneos_registran_una_venta(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(5, auto_id=11)
+    antes = contar_ventas(auto_id)
+    clave = str(uuid.uuid4())
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        respuestas = list(pool.map(lambda _: _registrar(client, auth, clave, auto_id=auto_id), range(8)))
+
+    assert {r.status_code for r in respuestas} == {200}
+    assert len({r.json()["venta_id"] for r in respuestas}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in respuestas) == 7
+    assert contar_ventas(auto_id) == antes + 1
+
+
+def test_claves_separadas_por_vendedor(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(5, auto_id=12)
+    clave = str(uuid.uuid4())
+
+    propia = _registrar(client, auth, clave, auto_id=auto_id)
+    ajena = _registrar(client, login(client, "svargas", "sofia2020"), clave, auto_id=auto_id)
+
+    assert ajena.status_code == 200
+    assert "Idempotent-Replayed" not in ajena.headers
+    assert ajena.json()["venta_id"] != propia.json()["venta_id"]
+    assert stock_de(auto_id) == 3
+
+
+def test_sin_clave_cada_envio_es_una_venta(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(5, auto_id=13)
+    ids = {client.post("/venta/registrar", json={**VENTA, "auto_id": auto_id}, headers=auth).json()["venta_id"]
+           for _ in range(2)}
+    assert len(ids) == 2
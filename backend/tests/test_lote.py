@@ -0,0 +1,54 @@
+from tests.conftest import VENTA, contar_ventas, stock_de
+
+
+def test_lote_resultado_por_fila(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(2, auto_id=2)
+    antes = contar_ventas(auto_id)
+
+    respuesta = client.post("/venta/registrar-lote", json=[
+        {**VENTA, "auto_id": auto_id},
+        {**VENTA, "auto_id": 999999},
+        {**VENTA, "auto_id": auto_id, "dni_comprador": "123"},
+        {**VENTA, "auto_id": auto_id, "monto_fisco": "abc"},
+        {**VENTA, "auto_id": auto_id},
+        {**VENTA, "auto_id": auto_id},
+    ], headers=auth)
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert (cuerpo["success"], cuerpo["total"], cuerpo["registradas"], cuerpo["fallidas"]) == (False, 6, 2, 4)
+
+    filas = cuerpo["resultados"]
+    assert [f["fila"] for f in filas] == [1, 2, 3, 4, 5, 6]
+    assert "venta_id" in filas[0] and "venta_id" in filas[4]
+    assert filas[1]["errores"] == ["Auto no encontrado"]
+    assert filas[2]["errores"][0].startswith("dni_comprador")
+    assert filas[3]["errores"][0].startswith("monto_fisco")
+    assert filas[5]["errores"] == ["Sin stock disponible"]
+
+    assert contar_ventas(auto_id) == antes + 2
+    assert stock_de(auto_id) == 0
+
+
+def test_lote_csv(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(5, auto_id=3)
+    cabecera = "auto_id,tipo_compra,monto_fisco,nombre_comprador,dni_comprador,contacto_comprador"
+    csv = "\n".join([
+        cabecera,
+        f'{auto_id},Cash,"S/. 85,000.00",Juan Perez,12345678,999999999',
+        f"{auto_id},Contado,85000,Ana Lopez,87654321,988888888",
+    ])
+
+    respuesta = client.post(
+        "/venta/registrar-lote/csv", files={"archivo": ("ventas.csv", csv.encode(), "text/csv")}, headers=auth
+    )
+
+    assert respuesta.status_code == 200
+    filas = respuesta.json()["resultados"]
+    assert "venta_id" in filas[0]
+    assert filas[1]["errores"][0].startswith("tipo_compra")
+    assert stock_de(auto_id) == 4
+
+
+def test_lote_vacio(client, auth):
+    assert client.post("/venta/registrar-lote", json=[], headers=auth).status_code == 400
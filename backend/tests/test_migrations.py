@@ -0,0 +1,115 @@
+import pytest
+
+from app.database import ESQUEMA_VERSION, MIGRACIONES, get_db_connection
+from app.migrations import Migracion, aplicar_migraciones, version_esquema
+
+# Esquema de las bases creadas antes del versionado: sin schema_version ni
+# monto_centimos, con una venta registrada
+_ESQUEMA_LEGADO = """
+    CREATE TABLE vendedores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        full_name TEXT NOT NULL,
+        email TEXT,
+        role TEXT DEFAULT 'vendedor',
+        codigo_vendedor TEXT UNIQUE NOT NULL,
+        sucursal_provincia TEXT NOT NULL,
+        sucursal_distrito TEXT NOT NULL,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE autos_disponibles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        marca TEXT NOT NULL,
+        modelo TEXT NOT NULL,
+        anio INTEGER NOT NULL,
+        precio_referencial REAL,
+        stock INTEGER DEFAULT 25,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE registro_venta (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fecha_venta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        vendedor_id INTEGER NOT NULL REFERENCES vendedores(id),
+        auto_id INTEGER NOT NULL REFERENCES autos_disponibles(id),
+        tipo_compra TEXT NOT NULL,
+        monto_fisco TEXT NOT NULL,
+        nombre_comprador TEXT NOT NULL,
+        dni_comprador TEXT NOT NULL,
+        contacto_comprador TEXT NOT NULL,
+        sucursal_provincia TEXT NOT NULL,
+        sucursal_distrito TEXT NOT NULL,
+        nombre_vendedor TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT INTO vendedores (username, password_hash, full_name, codigo_vendedor, sucursal_provincia, sucursal_distrito)
+        VALUES ('legado', 'x', 'Vendedor Legado', 'VEN999', 'LIMA', 'Miraflores');
+    INSERT INTO autos_disponibles (marca, modelo, anio, precio_referencial) VALUES ('Toyota', 'Yaris', 2024, 85000);
+    INSERT INTO registro_venta (vendedor_id, auto_id, tipo_compra, monto_fisco, nombre_comprador, dni_comprador,
+                                contacto_comprador, sucursal_provincia, sucursal_distrito, nombre_vendedor)
+        VALUES (1, 1, 'Cash', 'S/. 85,000.00', 'Juan Perez', '12345678', '999999999', 'LIMA', 'Miraflores',
+                'Vendedor Legado');
+"""
+
+
+@pytest.fixture
+def legado(tmp_path):
+    conn = get_db_connection(str(tmp_path / "legado.db"))
+    conn.executescript(_ESQUEMA_LEGADO)
+    yield conn
+    conn.close()
+
+
+def _tablas(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+
+def test_base_legada_migra_hasta_la_ultima_version(legado):
+    assert version_esquema(legado) == 0
+
+    assert aplicar_migraciones(legado, MIGRACIONES) == list(range(1, ESQUEMA_VERSION + 1))
+    assert version_esquema(legado) == ESQUEMA_VERSION
+
+    assert {"schema_version", "ventas_diarias", "autos_fts", "replica_heartbeat",
+            "idempotencia", "tokens_revocados"} <= _tablas(legado)
+    columnas = {row[1] for row in legado.execute("PRAGMA table_info(registro_venta)")}
+    assert "monto_centimos" in columnas
+
+    venta = legado.execute("SELECT monto_fisco, monto_centimos FROM registro_venta").fetchall()
+    assert [tuple(v) for v in venta] == [("S/. 85,000.00", None)]
+    assert legado.execute("SELECT SUM(num_ventas) FROM ventas_diarias").fetchone()[0] == 1
+
+
+def test_reaplicar_no_hace_nada(legado):
+    aplicar_migraciones(legado, MIGRACIONES)
+    assert aplicar_migraciones(legado, MIGRACIONES) == []
+    assert legado.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == ESQUEMA_VERSION
+
+
+def test_migracion_fallida_no_deja_pasos_aplicados(legado):
+    def romper(conn):
+        conn.execute("CREATE TABLE a_medias (id INTEGER)")
+        raise RuntimeError("paso roto")
+
+    with pytest.raises(RuntimeError):
+        aplicar_migraciones(legado, [*MIGRACIONES, Migracion(ESQUEMA_VERSION + 1, "Paso roto", romper)])
+
+    assert version_esquema(legado) == 0
+    assert "a_medias" not in _tablas(legado)
+    assert legado.execute("SELECT COUNT(*) FROM registro_venta").fetchone()[0] == 1
+
+
+def test_repositorio_migra_desde_cero(tmp_path):
+    from app.repository import ESQUEMA_VERSION as version_repositorio
+    from app.repository import Repositorio, create_engine_for
+
+    repositorio = Repositorio(create_engine_for(f"sqlite:///{tmp_path / 'repo.db'}"))
+    try:
+        assert repositorio.version_esquema() == 0
+        assert repositorio.migrar() == list(range(1, version_repositorio + 1))
+        assert repositorio.version_esquema() == version_repositorio
+        assert repositorio.migrar() == []
+    finally:
+        repositorio.close()
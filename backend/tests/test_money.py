@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+import pytest
+
+from app.utils.money import MAX_CENTIMOS, format_monto, parse_monto
+from tests.conftest import VENTA
+
+
+@pytest.mark.parametrize("valor, centimos", [
+    ("S/. 85,000.00", 8500000),
+    ("S/.85000", 8500000),
+    ("PEN 85,000.5", 8500050),
+    ("85000,50", 8500050),
+    ("1,234,567.89", 123456789),
+    (85000, 8500000),
+    (85000.005, 8500001),
+    (Decimal("0.005"), 1),
+    ("10000000000000", MAX_CENTIMOS),
+])
+def test_parse_monto_validos(valor, centimos):
+    assert parse_monto(valor) == centimos
+
+
+@pytest.mark.parametrize("valor", [
+    "", "abc", "S/.", "0", "-5", "0.001", "NaN", "Infinity", "1e40", "1e20",
+    "10000000000000.01", True, 1e40, float("nan"),
+])
+def test_parse_monto_invalidos(valor):
+    with pytest.raises(ValueError):
+        parse_monto(valor)
+
+
+def test_format_monto_ida_y_vuelta():
+    assert format_monto(8500050) == "S/. 85,000.50"
+    assert parse_monto(format_monto(123456789)) == 123456789
+
+
+@pytest.mark.parametrize("monto", ["1e40", "1e20", "abc"])
+def test_registrar_rechaza_monto_fuera_de_rango(client, auth, monto):
+    respuesta = client.post("/venta/registrar", json={**VENTA, "auto_id": 1, "monto_fisco": monto}, headers=auth)
+    assert respuesta.status_code == 422
+
+
+@pytest.mark.parametrize("monto_min", [1e40, 1e20])
+def test_filtro_monto_fuera_de_rango(client, auth, monto_min):
+    respuesta = client.get("/venta/mis-ventas", params={"monto_min": monto_min}, headers=auth)
+    assert respuesta.status_code == 400
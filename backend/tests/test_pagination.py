@@ -0,0 +1,58 @@
+import base64
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_ida_y_vuelta():
+    cursor = encode_cursor("2026-01-15 10:30:00", 1234)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2026-01-15 10:30:00", 1234)
+
+
+def _b64(texto: str) -> str:
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "no-es-base64!",
+    _b64("no es json"),
+    _b64('["2026-01-15 10:30:00"]'),
+    _b64('["2026-01-15 10:30:00", "1234"]'),
+    _b64('[20260115, 1234]'),
+    _b64('{"fecha": "2026-01-15", "id": 1}'),
+    encode_cursor("2026-01-15 10:30:00", 1234)[:-3],
+])
+def test_cursor_alterado(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_mis_ventas_recorre_todas_las_paginas(client, auth):
+    vistas = []
+    cursor = None
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        respuesta = client.get("/venta/mis-ventas", params=params, headers=auth)
+        assert respuesta.status_code == 200
+        pagina = respuesta.json()
+        vistas.extend((v["fecha_venta"], v["id"]) for v in pagina["ventas"])
+        cursor = pagina["next_cursor"]
+        if cursor is None:
+            break
+
+    completa = client.get("/venta/mis-ventas", params={"limit": 100}, headers=auth).json()["ventas"]
+    assert len(completa) < 100
+    assert vistas == [(v["fecha_venta"], v["id"]) for v in completa]
+    assert vistas == sorted(vistas, reverse=True)
+    assert len(set(vistas)) == len(vistas) > 7
+
+
+def test_mis_ventas_rechaza_cursor_alterado(client, auth):
+    respuesta = client.get("/venta/mis-ventas", params={"cursor": _b64('["x", "y"]')}, headers=auth)
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == "Cursor inválido"
@@ -0,0 +1,121 @@
+import pytest
+
+from app import rate_limit
+from app.config import settings
+from app.rate_limit import TokenBucketLimiter, limitar_login, login_exitoso, set_rate_limiter
+
+
+class Reloj:
+    """Sustituye a time.monotonic en app.rate_limit"""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def monotonic(self) -> float:
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(rate_limit, "time", reloj)
+    return reloj
+
+
+@pytest.fixture
+def limiter(reloj):
+    """Backend en memoria nuevo, restaurando el registrado al terminar"""
+    anterior = rate_limit._limiter
+    limiter = TokenBucketLimiter(intervalo_barrido=60.0)
+    set_rate_limiter(limiter)
+    yield limiter
+    set_rate_limiter(anterior)
+
+
+def test_rafaga_y_recarga(reloj):
+    limiter = TokenBucketLimiter()
+
+    assert [limiter.consumir("k", 3, 1.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.consumir("k", 3, 1.0) == pytest.approx(1.0)
+
+    reloj.ahora += 0.5
+    assert limiter.consumir("k", 3, 1.0) == pytest.approx(0.5)
+    reloj.ahora += 0.5
+    assert limiter.consumir("k", 3, 1.0) == 0.0
+    assert limiter.consumir("k", 3, 1.0) > 0
+
+    reloj.ahora += 100
+    assert [limiter.consumir("k", 3, 1.0) for _ in range(4)][-1] > 0
+    assert (limiter.permitidos, limiter.rechazados) == (7, 4)
+
+
+def test_intento_rechazado_no_consume(reloj):
+    limiter = TokenBucketLimiter()
+    limiter.consumir("k", 1, 0.5)
+
+    for _ in range(10):
+        assert limiter.consumir("k", 1, 0.5) > 0
+    reloj.ahora += 2
+    assert limiter.consumir("k", 1, 0.5) == 0.0
+
+
+def test_claves_independientes_y_reinicio(reloj):
+    limiter = TokenBucketLimiter()
+    limiter.consumir("a", 1, 1.0)
+
+    assert limiter.consumir("a", 1, 1.0) > 0
+    assert limiter.consumir("b", 1, 1.0) == 0.0
+    limiter.reiniciar("a")
+    assert limiter.consumir("a", 1, 1.0) == 0.0
+
+
+def test_barrido_y_max_entries(reloj):
+    limiter = TokenBucketLimiter(max_entries=2, intervalo_barrido=5.0)
+    for clave in ("a", "b", "c"):
+        limiter.consumir(clave, 2, 1.0)
+    assert limiter.stats()["baldes"] == 2
+    assert limiter.evictions == 1
+
+    reloj.ahora += 10
+    limiter.consumir("d", 2, 1.0)
+    assert limiter.stats()["baldes"] == 1
+    assert limiter.barridos == 2
+
+
+def test_limitar_login_por_usuario_y_por_ip(limiter, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_USER_BURST", 2)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_IP_BURST", 4)
+
+    assert limitar_login("10.0.0.1", "cmendoza") is None
+    assert limitar_login("10.0.0.2", " CMendoza ") is None
+    assert limitar_login("10.0.0.3", "cmendoza")["alcance"] == "usuario"
+
+    login_exitoso("cmendoza")
+    assert limitar_login("10.0.0.4", "cmendoza") is None
+
+    for username in ("a", "b", "c", "d"):
+        assert limitar_login("10.0.0.9", username) is None
+    rechazo = limitar_login("10.0.0.9", "e")
+    assert rechazo["alcance"] == "ip"
+    assert rechazo["retry_after"] == pytest.approx(60 / settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE)
+    # Con la IP agotada no se consume del usuario
+    assert limitar_login("10.0.0.10", "e") is None
+    assert limitar_login("10.0.0.10", "e") is None
+
+
+def test_login_responde_429_con_retry_after(client, limiter, reloj, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_USER_BURST", 2)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_USER_PER_MINUTE", 2.0)
+
+    datos = {"username": "cmendoza", "password": "incorrecta"}
+    assert [client.post("/auth/login", data=datos).status_code for _ in range(2)] == [401, 401]
+
+    respuesta = client.post("/auth/login", data={**datos, "password": "carlos2020"})
+    assert respuesta.status_code == 429
+    assert respuesta.headers["Retry-After"] == "30"
+
+    reloj.ahora += 30
+    assert client.post("/auth/login", data={**datos, "password": "carlos2020"}).status_code == 200
+    # El login correcto devuelve al usuario todos sus intentos
+    assert client.post("/auth/login", data=datos).status_code == 401
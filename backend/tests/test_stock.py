@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.errors import StockAgotadoError
+from app.services.venta_service import actualizar_auto, registrar_venta
+from tests.conftest import VENTA, contar_ventas, stock_de
+
+
+def test_ventas_concurrentes_no_sobrevenden(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(5, auto_id=4)
+    antes = contar_ventas(auto_id)
+
+    def vender(_):
+        return client.post("/venta/registrar", json={**VENTA, "auto_id": auto_id}, headers=auth).status_code
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        codigos = list(pool.map(vender, range(40)))
+
+    assert codigos.count(200) == 5
+    assert codigos.count(409) == 35
+    assert stock_de(auto_id) == 0
+    assert contar_ventas(auto_id) == antes + 5
+
+
+def test_reserva_en_el_escritor_no_sobrevende(client, auto_con_stock):
+    auto_id = auto_con_stock(3, auto_id=5)
+    datos = dict(
+        vendedor_id=1, auto_id=auto_id, tipo_compra="Cash", monto_centimos=8500000,
+        nombre_comprador="Juan Perez", dni_comprador="12345678", contacto_comprador="999999999",
+        sucursal_provincia="LIMA", sucursal_distrito="Miraflores", nombre_vendedor="Carlos Mendoza",
+    )
+
+    def vender(_):
+        try:
+            return registrar_venta(**datos)
+        except StockAgotadoError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = [venta_id for venta_id in pool.map(vender, range(20)) if venta_id]
+
+    assert len(ids) == len(set(ids)) == 3
+    assert stock_de(auto_id) == 0
+
+
+def test_lote_no_reserva_mas_que_el_stock(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(3, auto_id=6)
+    respuesta = client.post("/venta/registrar-lote", json=[{**VENTA, "auto_id": auto_id}] * 5, headers=auth)
+    assert respuesta.json()["registradas"] == 3
+    assert stock_de(auto_id) == 0
+
+
+@pytest.mark.parametrize("activo, codigo", [(False, 404), (True, 409)])
+def test_auto_inactivo_o_sin_stock(client, auth, auto_con_stock, activo, codigo):
+    auto_id = auto_con_stock(0, auto_id=7)
+    actualizar_auto(auto_id, is_active=activo)
+    respuesta = client.post("/venta/registrar", json={**VENTA, "auto_id": auto_id}, headers=auth)
+    assert respuesta.status_code == codigo
+
+
+def test_catalogo_refleja_cada_venta(client, auth, auto_con_stock):
+    auto_id = auto_con_stock(4, auto_id=8)
+
+    def stock_en_catalogo():
+        autos = client.get("/venta/autos", headers=auth).json()["autos"]
+        return next((a["stock"] for a in autos if a["id"] == auto_id), None)
+
+    assert stock_en_catalogo() == 4
+    client.post("/venta/registrar", json={**VENTA, "auto_id": auto_id}, headers=auth)
+    assert stock_en_catalogo() == 3
+    client.post("/venta/registrar-lote", json=[{**VENTA, "auto_id": auto_id}] * 3, headers=auth)
+    assert stock_en_catalogo() is None
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useAuth } from '../context/AuthContext'
 import Modal from '../components/Modal'
 import AutoSearchSelect from '../components/AutoSearchSelect'
@@ -24,6 +24,9 @@ const VentaAuto = () => {
     type: 'success'
   })
   const [loading, setLoading] = useState(false)
+  // Una clave por venta: si el registro falla por timeout y se reintenta
+  // sin cambiar el formulario, el backend no registra la venta dos veces
+  const idempotencyKey = useRef(null)
 
   useEffect(() => {
     const hoy = new Date()
@@ -33,6 +36,7 @@ const VentaAuto = () => {
 
   const handleChange = (e) => {
     const { name, value } = e.target
+    idempotencyKey.current = null
     setFormData(prev => ({
       ...prev,
       [name]: value
@@ -40,6 +44,7 @@ const VentaAuto = () => {
   }
 
   const handleAutoChange = (autoId, autoText) => {
+    idempotencyKey.current = null
     setFormData(prev => ({
       ...prev,
       auto_id: autoId,
@@ -98,7 +103,11 @@ const VentaAuto = () => {
         contacto_comprador: formData.contactoComprador
       }
 
-      const response = await registrarVenta(ventaData)
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = crypto.randomUUID()
+      }
+      const response = await registrarVenta(ventaData, idempotencyKey.current)
+      idempotencyKey.current = null
 
       setModalConfig({
         title: 'Gestor de Ventas',
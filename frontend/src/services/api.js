@@ -80,10 +80,12 @@ export const getAutosDisponibles = async (search = '') => {
   }
 }
 
-export const registrarVenta = async (ventaData) => {
+// idempotencyKey: la misma clave en un reintento devuelve la venta original
+export const registrarVenta = async (ventaData, idempotencyKey) => {
   try {
     console.log('📝 Registrando venta:', ventaData)
-    const response = await apiClient.post('/venta/registrar', ventaData)
+    const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}
+    const response = await apiClient.post('/venta/registrar', ventaData, { headers })
     console.log('✅ Venta registrada:', response.data)
     return response.data
   } catch (error) {